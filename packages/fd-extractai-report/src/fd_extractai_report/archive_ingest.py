@@ -0,0 +1,329 @@
+"""
+压缩包批量入口：直接遍历 zip / tar 成员，把成员 bytes 交给 ReportPipeline.run_bytes / load_bytes，
+不再先解压到磁盘。
+
+- 成员按包内顺序顺序读取（对存储是一次顺序 I/O），转换 / 抽取在线程池里并发执行
+- 同时在途的成员 bytes 总量受 max_inflight_bytes 约束；超过预算的单个大成员等其他成员完成后独占执行
+- 结果按完成顺序产出，ArchiveItem.member.index 保留包内顺序
+"""
+
+from __future__ import annotations
+
+import logging
+import shutil
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Any, Callable, Dict, Iterator, Literal, Optional, Sequence, Tuple, Union
+
+from fd_extractai_report.converters.input_stream import (
+    SPOOL_MAX_MEMORY,
+    BinarySource,
+    BufferReader,
+    is_buffer_source,
+)
+from fd_extractai_report.context import ReportContext
+from fd_extractai_report.pipeline import PipelineResult, ReportPipeline
+
+
+logger = logging.getLogger(__name__)
+
+ArchiveSource = Union[str, Path, BinarySource]
+IngestMode = Literal["run", "load"]
+
+SUPPORTED_SUFFIXES: Tuple[str, ...] = (".docx", ".doc", ".pdf")
+
+# zip 规范里的 UTF-8 文件名标志位；没有该标志时国内打包工具通常写的是 GBK
+_ZIP_UTF8_FLAG = 0x800
+
+
+@dataclass(frozen=True)
+class ArchiveMember:
+    name: str
+    size: int
+    index: int
+
+
+@dataclass
+class ArchiveItem:
+    member: ArchiveMember
+    result: Optional[PipelineResult] = None
+    context: Optional[ReportContext] = None
+    error: Optional[str] = None
+    cost: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _zip_member_name(info: zipfile.ZipInfo) -> str:
+    if info.flag_bits & _ZIP_UTF8_FLAG:
+        return info.filename
+    try:
+        return info.filename.encode("cp437").decode("gbk")
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return info.filename
+
+
+def _wanted(name: str, suffixes: Sequence[str]) -> bool:
+    p = PurePosixPath(name)
+    if any(part.startswith("__MACOSX") for part in p.parts):
+        return False
+    if p.name.startswith(("~$", "._")):
+        return False
+    return p.suffix.lower() in suffixes
+
+
+def _open_archive_stream(source: ArchiveSource) -> Tuple[Any, bool]:
+    """返回 (可读对象, 是否需要由本模块关闭)。"""
+    if isinstance(source, (str, Path)):
+        return open(source, "rb"), True
+    if is_buffer_source(source):
+        return BufferReader(source), True  # type: ignore[arg-type]
+    return source, False
+
+
+def iter_archive_members(
+    source: ArchiveSource,
+    *,
+    suffixes: Sequence[str] = SUPPORTED_SUFFIXES,
+) -> Iterator[Tuple[ArchiveMember, Callable[[], bytes]]]:
+    """
+    按包内顺序产出 (成员信息, read())。
+    read() 必须在迭代到下一个成员之前调用（tar 流式模式只能顺序读）；不调用即跳过该成员。
+    """
+    suffixes = tuple(s.lower() for s in suffixes)
+    fh, owned = _open_archive_stream(source)
+    try:
+        seekable = getattr(fh, "seekable", None)
+        if callable(seekable) and seekable():
+            if zipfile.is_zipfile(fh):
+                fh.seek(0)
+                yield from _iter_zip(fh, suffixes)
+                return
+            fh.seek(0)
+            try:
+                tar = tarfile.open(fileobj=fh, mode="r:*")
+            except tarfile.ReadError:
+                raise ValueError("unsupported archive: expected zip or tar") from None
+        else:
+            # socket / 管道：tar 可以流式读；zip 的目录在文件尾部，只能先 spool
+            head = fh.read(4)
+            if head.startswith(b"PK"):
+                spooled = _spool_with_head(head, fh)
+                try:
+                    yield from _iter_zip(spooled, suffixes)
+                finally:
+                    spooled.close()
+                return
+            try:
+                tar = tarfile.open(fileobj=_HeadReader(head, fh), mode="r|*")
+            except tarfile.ReadError:
+                raise ValueError("unsupported archive: expected zip or tar") from None
+
+        with tar:
+            yield from _iter_tar(tar, suffixes)
+    finally:
+        if owned:
+            fh.close()
+
+
+class _HeadReader:
+    """把已读出的文件头拼回流前面（tar 流式模式只需要 read）。"""
+
+    def __init__(self, head: bytes, inner: Any) -> None:
+        self._head = head
+        self._inner = inner
+
+    def read(self, size: int = -1) -> bytes:
+        if not self._head:
+            return self._inner.read(size)
+        if size is None or size < 0:
+            data, self._head = self._head + self._inner.read(), b""
+            return data
+        data, self._head = self._head[:size], self._head[size:]
+        if len(data) < size:
+            data += self._inner.read(size - len(data))
+        return data
+
+
+def _spool_with_head(head: bytes, inner: Any) -> Any:
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    spooled.write(head)
+    shutil.copyfileobj(inner, spooled, 1024 * 1024)
+    spooled.seek(0)
+    return spooled
+
+
+def _iter_zip(fh: Any, suffixes: Tuple[str, ...]) -> Iterator[Tuple[ArchiveMember, Callable[[], bytes]]]:
+    with zipfile.ZipFile(fh) as zf:
+        index = 0
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            name = _zip_member_name(info)
+            if not _wanted(name, suffixes):
+                continue
+            member = ArchiveMember(name=name, size=info.file_size, index=index)
+            index += 1
+            yield member, (lambda info=info: zf.read(info))
+
+
+def _iter_tar(tar: tarfile.TarFile, suffixes: Tuple[str, ...]) -> Iterator[Tuple[ArchiveMember, Callable[[], bytes]]]:
+    index = 0
+    for info in tar:
+        if not info.isfile() or not _wanted(info.name, suffixes):
+            continue
+
+        def _read(info: tarfile.TarInfo = info) -> bytes:
+            fh = tar.extractfile(info)
+            if fh is None:
+                return b""
+            with fh:
+                return fh.read()
+
+        member = ArchiveMember(name=info.name, size=info.size, index=index)
+        index += 1
+        yield member, _read
+
+
+class ArchiveIngestor:
+    """
+    把压缩包成员逐个交给 ReportPipeline。
+    - pipeline：所有 worker 线程共享同一个 pipeline 实例（推荐；ReportPipeline / RuleEngineSlicer 可重入，
+      单次运行的状态都走参数，共享实例只加载一次规则 / 模型，见 ReportPipeline 类说明）
+    - pipeline_factory：每个 worker 线程一个 pipeline，只在接入了非线程安全的自定义组件时使用
+    两者都不传时惰性构建一个共享的 ReportPipeline()。
+    """
+
+    def __init__(
+        self,
+        *,
+        pipeline: Optional[ReportPipeline] = None,
+        pipeline_factory: Optional[Callable[[], ReportPipeline]] = None,
+        max_workers: int = 1,
+        max_inflight_bytes: int = 256 * 1024 * 1024,
+        suffixes: Sequence[str] = SUPPORTED_SUFFIXES,
+        debug: bool = False,
+    ) -> None:
+        self.pipeline = pipeline
+        self.pipeline_factory = pipeline_factory
+        self.max_workers = max(1, int(max_workers or 1))
+        self.max_inflight_bytes = max(1, int(max_inflight_bytes or 1))
+        self.suffixes = tuple(suffixes)
+        self.debug = debug
+
+        self._local = threading.local()
+        self._pipeline_lock = threading.Lock()
+
+    def _get_pipeline(self) -> ReportPipeline:
+        if self.pipeline is not None:
+            return self.pipeline
+        if self.pipeline_factory is None:
+            with self._pipeline_lock:
+                if self.pipeline is None:
+                    self.pipeline = ReportPipeline()
+            return self.pipeline
+        pipe = getattr(self._local, "pipeline", None)
+        if pipe is None:
+            pipe = self.pipeline_factory()  # type: ignore[misc]
+            self._local.pipeline = pipe
+        return pipe
+
+    def _process(
+        self,
+        member: ArchiveMember,
+        data: bytes,
+        mode: IngestMode,
+        run_kwargs: Dict[str, Any],
+    ) -> ArchiveItem:
+        t0 = time.time()
+        item = ArchiveItem(member=member)
+        try:
+            pipe = self._get_pipeline()
+            if mode == "load":
+                item.context = pipe.load_bytes(data, filename=member.name, debug=self.debug)
+            else:
+                item.result = pipe.run_bytes(data, filename=member.name, **run_kwargs)
+                item.context = item.result.context
+        except Exception as e:
+            logger.warning("archive member failed: %s (%r)", member.name, e)
+            item.error = f"{type(e).__name__}: {e}"
+        item.cost = time.time() - t0
+        return item
+
+    def iter_results(
+        self,
+        archive: ArchiveSource,
+        *,
+        mode: IngestMode = "run",
+        **run_kwargs: Any,
+    ) -> Iterator[ArchiveItem]:
+        """按完成顺序产出每个成员的 ArchiveItem；run_kwargs 透传给 run_bytes。"""
+        pending: Dict[Future, int] = {}
+        inflight = 0
+
+        def _drain(block: bool) -> Iterator[ArchiveItem]:
+            nonlocal inflight
+            if not pending:
+                return
+            done, _ = wait(
+                set(pending), timeout=None if block else 0, return_when=FIRST_COMPLETED
+            )
+            for fut in done:
+                inflight -= pending.pop(fut)
+                yield fut.result()
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="archive-ingest"
+        ) as pool:
+            for member, read in iter_archive_members(archive, suffixes=self.suffixes):
+                cost = min(member.size, self.max_inflight_bytes)
+                # 背压：在途 bytes 超预算或 worker 已满时，先等已提交的成员完成
+                while pending and (
+                    inflight + cost > self.max_inflight_bytes
+                    or len(pending) >= self.max_workers
+                ):
+                    yield from _drain(block=True)
+
+                data = read()
+                if self.debug:
+                    print(f"📦 [ARCHIVE] #{member.index} {member.name} size={len(data)}")
+                fut = pool.submit(self._process, member, data, mode, run_kwargs)
+                pending[fut] = cost
+                inflight += cost
+                del data
+
+                yield from _drain(block=False)
+
+            while pending:
+                yield from _drain(block=True)
+
+
+def iter_archive_results(
+    archive: ArchiveSource,
+    *,
+    pipeline: Optional[ReportPipeline] = None,
+    pipeline_factory: Optional[Callable[[], ReportPipeline]] = None,
+    max_workers: int = 1,
+    max_inflight_bytes: int = 256 * 1024 * 1024,
+    suffixes: Sequence[str] = SUPPORTED_SUFFIXES,
+    mode: IngestMode = "run",
+    debug: bool = False,
+    **run_kwargs: Any,
+) -> Iterator[ArchiveItem]:
+    ingestor = ArchiveIngestor(
+        pipeline=pipeline,
+        pipeline_factory=pipeline_factory,
+        max_workers=max_workers,
+        max_inflight_bytes=max_inflight_bytes,
+        suffixes=suffixes,
+        debug=debug,
+    )
+    yield from ingestor.iter_results(archive, mode=mode, **run_kwargs)
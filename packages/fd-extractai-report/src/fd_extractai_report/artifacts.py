@@ -0,0 +1,326 @@
+"""
+阶段产物存储：把 load（markdown）/ detect（类型识别结果）/ slice（切片）三个阶段的输出按内容寻址落盘，
+ReportPipeline.run_from(stage, doc_id=...) 直接从产物重建 ReportContext，
+迭代抽取 prompt 时不再重复转换和切片。
+
+产物 key 逐级串联，任一上游输入或配置变化都会让下游 key 失效：
+    load   = H(源文件 sha256, converter 配置)
+    detect = H(load key, detector)
+    slice  = H(detect key, 报告类型, slicer + 切片 ruleset)
+
+目录结构：
+    <root>/objects/<key[:2]>/<key>.json.gz   产物（紧凑 JSON + gzip）
+    <root>/docs/<sha1(doc_id)>/<stage>.json  doc_id 某阶段的源哈希与 key（每阶段一个文件）
+
+索引按阶段分文件、整文件原子替换，不做读-改-写：多个 prefork worker 同时记录同一文档的
+不同阶段不会互相覆盖。读取时以最新写入的源哈希为准，旧源哈希下的阶段记录忽略。
+
+渐进式 load（load_progressive）可能只转换了文档前半部分，不会落盘；
+有切片 step 超时（metadata.slice_timeouts）的切片结果不完整，同样不落盘。
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from fd_extractai_report.codec import decode_slices, encode_slices
+from fd_extractai_report.context import ReportContext
+from fd_extractai_report.pipeline import StageObserver, StageScope
+
+if TYPE_CHECKING:
+    from fd_extractai_report.pipeline import ReportPipeline
+
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_STAGES = ("load", "detect", "slice")
+
+# detect 阶段写入 metadata 的字段
+_DETECT_FIELDS = ("report_type", "report_type_debug", "report_type_confidence")
+# load 阶段需要随 markdown 保存的字段
+_LOAD_FIELDS = ("ocr_applied", "ocr_missing_slices", "source_hash", "doc_id")
+# slice 产物格式（codec.encode_slices 的 offset 行），变更时旧产物自动失效
+_SLICE_FORMAT = "offsets-v1"
+
+
+class ArtifactMissing(KeyError):
+    """doc 没有可用的阶段产物（从未运行过，或上游输入 / 配置已变化）。"""
+
+
+def _key(*parts: Any) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def converter_fingerprint(pipeline: "ReportPipeline") -> str:
+    conv = pipeline.converter
+    return _key(type(conv).__qualname__, repr(getattr(conv, "opt", None)), pipeline.ocr_on_demand)
+
+
+def detector_fingerprint(pipeline: "ReportPipeline") -> str:
+    det = pipeline.type_detector
+    fp = getattr(det, "fingerprint", None)
+    # 没有 fingerprint() 的自定义 detector 至少带上 config，改阈值 / 关键词配置时产物失效
+    detail = fp() if callable(fp) else repr(getattr(det, "config", None))
+    return _key(type(det).__module__, type(det).__qualname__, detail)
+
+
+def slice_fingerprint(pipeline: "ReportPipeline", report_type: Optional[str]) -> str:
+    from fd_extractai_report.rules.slicing.registry import get_ruleset
+
+    parts: List[Any] = [report_type or ""]
+    for slicer in pipeline.slicers:
+        parts.append(type(slicer).__qualname__)
+        if not hasattr(slicer, "ruleset"):
+            continue
+        ruleset = slicer.ruleset
+        if ruleset is None and report_type:
+            try:
+                ruleset = get_ruleset(report_type)
+            except KeyError:
+                ruleset = None
+        parts.append(repr(ruleset))
+    return _key(*parts)
+
+
+@dataclass
+class DocumentArtifacts:
+    doc_id: str
+    source_hash: str
+    keys: Dict[str, str] = field(default_factory=dict)
+    updated: float = 0.0
+
+
+class ArtifactStore:
+    def __init__(self, root: str | Path, *, compress_level: int = 6) -> None:
+        self.root = Path(root).expanduser().resolve()
+        self.compress_level = compress_level
+        (self.root / "objects").mkdir(parents=True, exist_ok=True)
+        (self.root / "docs").mkdir(parents=True, exist_ok=True)
+
+    # -------------------------
+    # objects
+    # -------------------------
+    def _object_path(self, key: str) -> Path:
+        return self.root / "objects" / key[:2] / f"{key}.json.gz"
+
+    def _doc_dir(self, doc_id: str) -> Path:
+        return self.root / "docs" / hashlib.sha1(doc_id.encode("utf-8")).hexdigest()
+
+    def _legacy_doc_path(self, doc_id: str) -> Path:
+        # 旧版单文件索引（读-改-写），只读兼容
+        return self.root / "docs" / f"{hashlib.sha1(doc_id.encode('utf-8')).hexdigest()}.json"
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def put(self, key: str, payload: Dict[str, Any]) -> None:
+        raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str)
+        self._atomic_write(
+            self._object_path(key),
+            gzip.compress(raw.encode("utf-8"), compresslevel=self.compress_level, mtime=0),
+        )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            data = self._object_path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+        return json.loads(gzip.decompress(data).decode("utf-8"))
+
+    def has(self, key: str) -> bool:
+        return self._object_path(key).exists()
+
+    # -------------------------
+    # doc index
+    # -------------------------
+    def document(self, doc_id: str) -> Optional[DocumentArtifacts]:
+        # (updated, source_hash, stage, key)
+        entries: List[tuple] = []
+        try:
+            legacy = json.loads(self._legacy_doc_path(doc_id).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            pass
+        else:
+            for stage, key in (legacy.get("keys") or {}).items():
+                entries.append((legacy.get("updated") or 0.0, legacy["source_hash"], stage, key))
+
+        doc_dir = self._doc_dir(doc_id)
+        for stage in ARTIFACT_STAGES:
+            try:
+                raw = json.loads((doc_dir / f"{stage}.json").read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                continue
+            entries.append((raw.get("updated") or 0.0, raw["source_hash"], stage, raw["key"]))
+        if not entries:
+            return None
+
+        updated, source_hash = max(entries, key=lambda e: e[0])[:2]
+        keys: Dict[str, str] = {}
+        for _, h, stage, key in sorted(entries, key=lambda e: e[0]):
+            if h == source_hash:
+                keys[stage] = key
+        return DocumentArtifacts(doc_id=doc_id, source_hash=source_hash, keys=keys, updated=updated)
+
+    def _bind(self, doc_id: str, source_hash: str, stage: str, key: str) -> None:
+        entry = {"doc_id": doc_id, "source_hash": source_hash, "key": key, "updated": time.time()}
+        self._atomic_write(
+            self._doc_dir(doc_id) / f"{stage}.json",
+            json.dumps(entry, ensure_ascii=False).encode("utf-8"),
+        )
+
+    # -------------------------
+    # stage keys
+    # -------------------------
+    def stage_keys(
+        self,
+        pipeline: "ReportPipeline",
+        source_hash: str,
+        *,
+        report_type: Optional[str] = None,
+        upto: str = "slice",
+    ) -> Dict[str, str]:
+        """按当前 pipeline 配置计算各阶段 key；slice key 依赖报告类型。"""
+        keys = {"load": _key("load", source_hash, converter_fingerprint(pipeline))}
+        if upto == "load":
+            return keys
+        keys["detect"] = _key("detect", keys["load"], detector_fingerprint(pipeline))
+        if upto == "detect" or report_type is None:
+            return keys
+        keys["slice"] = _key(
+            "slice", keys["detect"], slice_fingerprint(pipeline, report_type), _SLICE_FORMAT
+        )
+        return keys
+
+    def record(self, pipeline: "ReportPipeline", context: ReportContext, stage: str) -> Optional[str]:
+        """持久化 context 在 stage 结束时的产物，返回 key；缺少源哈希时跳过。"""
+        meta = context.metadata or {}
+        source_hash = meta.get("source_hash")
+        doc_id = meta.get("doc_id")
+        if not source_hash or not doc_id:
+            return None
+
+        keys = self.stage_keys(
+            pipeline, source_hash, report_type=meta.get("report_type"), upto=stage
+        )
+        key = keys.get(stage)
+        if key is None:
+            return None
+        if stage == "slice" and meta.get("slice_timeouts"):
+            # 有 step 超时被作废：切片不完整，换更大的预算重跑时不能复用
+            steps = [t.get("step") for t in meta["slice_timeouts"]]
+            logger.info("skip partial slice artifact: doc=%s timeouts=%s", doc_id, steps)
+            return None
+
+        if stage == "load":
+            payload: Dict[str, Any] = {
+                "markdown": context.markdown_text or "",
+                "source_path": str(context.source_path) if context.source_path else None,
+                "metadata": {k: meta[k] for k in _LOAD_FIELDS if k in meta},
+            }
+        elif stage == "detect":
+            payload = {"metadata": {k: meta[k] for k in _DETECT_FIELDS if k in meta}}
+        elif stage == "slice":
+            # 正文能在 markdown 里找到时只记 offset，rehydrate 时对照 load 产物还原
+            payload = {"slices": encode_slices(context.slices, context.markdown_text)}
+        else:
+            raise ValueError(f"unknown artifact stage: {stage}")
+
+        self.put(key, payload)
+        self._bind(doc_id, source_hash, stage, key)
+        return key
+
+    def rehydrate(self, pipeline: "ReportPipeline", doc_id: str, *, upto: str) -> ReportContext:
+        """按当前配置重建 upto（含）为止的 ReportContext；产物缺失或已失效时抛 ArtifactMissing。"""
+        if upto not in ARTIFACT_STAGES:
+            raise ValueError(f"upto must be one of {ARTIFACT_STAGES}")
+        doc = self.document(doc_id)
+        if doc is None:
+            raise ArtifactMissing(f"no artifacts for doc_id={doc_id}")
+
+        load = self._require(self.stage_keys(pipeline, doc.source_hash, upto="load")["load"], doc_id, "load")
+        source_path = load.get("source_path")
+        ctx = ReportContext(source_path=Path(source_path) if source_path else None)
+        ctx.set_markdown(load.get("markdown") or "")
+        ctx.set_metadata(**(load.get("metadata") or {}))
+        ctx.set_metadata(source_hash=doc.source_hash, doc_id=doc_id)
+        if upto == "load":
+            return ctx
+
+        keys = self.stage_keys(pipeline, doc.source_hash, upto="detect")
+        detect = self._require(keys["detect"], doc_id, "detect")
+        ctx.set_metadata(**(detect.get("metadata") or {}))
+        if upto == "detect":
+            return ctx
+
+        keys = self.stage_keys(
+            pipeline, doc.source_hash, report_type=ctx.metadata.get("report_type"), upto="slice"
+        )
+        sliced = self._require(keys.get("slice", ""), doc_id, "slice")
+        for sections in decode_slices(sliced.get("slices") or [], ctx.markdown_text).values():
+            for section in sections:
+                ctx.add_slice(section)
+        return ctx
+
+    def _require(self, key: str, doc_id: str, stage: str) -> Dict[str, Any]:
+        payload = self.get(key) if key else None
+        if payload is None:
+            raise ArtifactMissing(
+                f"{stage} artifact missing or stale for doc_id={doc_id} (input or config changed)"
+            )
+        return payload
+
+    def stats(self) -> Dict[str, Any]:
+        objects = list((self.root / "objects").glob("*/*.json.gz"))
+        return {
+            "root": str(self.root),
+            "documents": len({p.stem for p in (self.root / "docs").iterdir()}),
+            "objects": len(objects),
+            "bytes": sum(p.stat().st_size for p in objects),
+        }
+
+
+class ArtifactRecorder(StageObserver):
+    """挂在 ReportPipeline.stage_observers 上，在 load / detect / slice / ocr_fallback 结束时落盘产物。"""
+
+    def __init__(self, store: ArtifactStore, pipeline: "ReportPipeline") -> None:
+        self.store = store
+        self.pipeline = pipeline
+
+    def on_stage_end(self, scope: StageScope, error: Optional[BaseException] = None) -> None:
+        ctx = scope.context
+        if error is not None or ctx is None or scope.skip:
+            return
+        try:
+            if scope.stage in ARTIFACT_STAGES:
+                self.store.record(self.pipeline, ctx, scope.stage)
+            elif scope.stage == "ocr_fallback" and (ctx.metadata or {}).get("ocr_applied"):
+                # OCR 重转后 markdown 与切片都变了：覆盖 load / slice 产物
+                self.store.record(self.pipeline, ctx, "load")
+                self.store.record(self.pipeline, ctx, "slice")
+        except OSError as e:
+            logger.warning("artifact record failed: stage=%s (%r)", scope.stage, e)
@@ -0,0 +1,576 @@
+"""
+批处理断点续跑：本地 SQLite 台账记录每篇文档、每个阶段的完成状态和输出哈希，
+以及每个抽取器（ExtractorSpec）的结果。
+
+    ledger = CheckpointLedger("runs/ledger.sqlite")
+    runner = CheckpointRunner(pipe, ledger, run_id="2026-10-19-night", resume=True)
+    for path in paths:
+        result = runner.run_document(docx_path=path)
+
+resume=True 时：
+- 源文件哈希未变且已完成的文档直接返回台账里的结果，不再转换 / 切片 / 调 LLM；
+  完成时 context（markdown + 切片 + metadata）按 codec 编码、连同 outputs / warnings / evaluations 存进台账，
+  恢复出的结果与首次运行一致
+- 中途失败的文档重新转换、切片，但输入未变的抽取器直接复用已记录的结果
+文件内容变化（源哈希不同）时该文档的全部记录作废重跑。
+
+CheckpointRunner 只是 ReportPipeline.run / run_bytes 加一个单次运行的 StageObserver：
+阶段结束时写台账，extract 阶段注入抽取器断点，已完成文档在各阶段开始时直接给出台账里的结果（StageScope.skip）。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from fd_extractai_report.codec import decode_context, encode_context
+from fd_extractai_report.context import ReportContext
+from fd_extractai_report.converters.input_stream import (
+    BinarySource,
+    ensure_seekable,
+    source_digest,
+)
+from fd_extractai_report.pipeline import PipelineResult, ReportPipeline, StageObserver, StageScope
+from fd_extractai_report.rules.extracting.schema import ExtractRuleSet
+
+
+logger = logging.getLogger(__name__)
+
+
+def content_digest(obj: Any) -> str:
+    """阶段输出的稳定哈希：str 直接哈希，其他对象按排序后的 JSON 哈希。"""
+    if isinstance(obj, str):
+        data = obj.encode("utf-8")
+    else:
+        data = json.dumps(obj, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def _slices_digest(ctx: ReportContext) -> str:
+    return content_digest(
+        {
+            key: [(s.title, s.text) for s in sections]
+            for key, sections in (ctx.slices or {}).items()
+        }
+    )
+
+
+@dataclass
+class DocumentCheckpoint:
+    run_id: str
+    doc_id: str
+    status: str
+    source_hash: str
+    report_type: Optional[str] = None
+    outputs: Dict[str, List[dict]] = field(default_factory=dict)
+    warnings: List[str] = field(default_factory=list)
+    failed_stage: Optional[str] = None
+    error: Optional[str] = None
+    updated: float = 0.0
+    stages: Dict[str, str] = field(default_factory=dict)
+    # codec.encode_context 的结果；旧台账或编码失败时为 None
+    context: Optional[bytes] = None
+    # 没跑 benchmark（或旧台账）时为 None
+    evaluations: Optional[List[dict]] = None
+
+
+class CheckpointLedger:
+    """
+    断点台账（SQLite，WAL）。多个 worker 进程可以同时写同一个文件；
+    fork 出的子进程不要复用父进程的实例，按 path 各自新建。
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = str(Path(path).expanduser().resolve())
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                " run_id TEXT NOT NULL,"
+                " doc_id TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " source_hash TEXT NOT NULL,"
+                " report_type TEXT,"
+                " outputs TEXT,"
+                " warnings TEXT,"
+                " failed_stage TEXT,"
+                " error TEXT,"
+                " updated REAL NOT NULL,"
+                " context BLOB,"
+                " evaluations TEXT,"
+                " PRIMARY KEY (run_id, doc_id))"
+            )
+            # 旧台账没有 context / evaluations 列
+            cols = {r[1] for r in conn.execute("PRAGMA table_info(documents)").fetchall()}
+            if "context" not in cols:
+                conn.execute("ALTER TABLE documents ADD COLUMN context BLOB")
+            if "evaluations" not in cols:
+                conn.execute("ALTER TABLE documents ADD COLUMN evaluations TEXT")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS stages ("
+                " run_id TEXT NOT NULL,"
+                " doc_id TEXT NOT NULL,"
+                " stage TEXT NOT NULL,"
+                " output_hash TEXT,"
+                " seconds REAL,"
+                " updated REAL NOT NULL,"
+                " PRIMARY KEY (run_id, doc_id, stage))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS extractors ("
+                " run_id TEXT NOT NULL,"
+                " doc_id TEXT NOT NULL,"
+                " slug TEXT NOT NULL,"
+                " input_hash TEXT NOT NULL,"
+                " output_hash TEXT NOT NULL,"
+                " rows TEXT NOT NULL,"
+                " updated REAL NOT NULL,"
+                " PRIMARY KEY (run_id, doc_id, slug))"
+            )
+            conn.commit()
+        return conn
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # -------------------------
+    # documents
+    # -------------------------
+    def document(self, run_id: str, doc_id: str) -> Optional[DocumentCheckpoint]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, source_hash, report_type, outputs, warnings, failed_stage, error, updated, context, evaluations"
+                " FROM documents WHERE run_id = ? AND doc_id = ?",
+                (run_id, doc_id),
+            ).fetchone()
+            if row is None:
+                return None
+            stages = dict(
+                self._conn.execute(
+                    "SELECT stage, output_hash FROM stages WHERE run_id = ? AND doc_id = ?",
+                    (run_id, doc_id),
+                ).fetchall()
+            )
+        return DocumentCheckpoint(
+            run_id=run_id,
+            doc_id=doc_id,
+            status=row[0],
+            source_hash=row[1],
+            report_type=row[2],
+            outputs=json.loads(row[3]) if row[3] else {},
+            warnings=json.loads(row[4]) if row[4] else [],
+            failed_stage=row[5],
+            error=row[6],
+            updated=row[7],
+            stages=stages,
+            context=bytes(row[8]) if row[8] is not None else None,
+            evaluations=json.loads(row[9]) if row[9] is not None else None,
+        )
+
+    def begin_document(self, run_id: str, doc_id: str, source_hash: str) -> None:
+        """登记开始处理；源哈希变化时清掉旧的阶段 / 抽取器记录。"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT source_hash FROM documents WHERE run_id = ? AND doc_id = ?",
+                (run_id, doc_id),
+            ).fetchone()
+            if row is not None and row[0] != source_hash:
+                self._delete_document(run_id, doc_id)
+            self._conn.execute(
+                "INSERT INTO documents(run_id, doc_id, status, source_hash, updated)"
+                " VALUES (?, ?, 'running', ?, ?)"
+                " ON CONFLICT(run_id, doc_id) DO UPDATE SET"
+                " status = 'running', source_hash = excluded.source_hash,"
+                " failed_stage = NULL, error = NULL, updated = excluded.updated",
+                (run_id, doc_id, source_hash, time.time()),
+            )
+            self._conn.commit()
+
+    def mark_stage(
+        self,
+        run_id: str,
+        doc_id: str,
+        stage: str,
+        output_hash: Optional[str],
+        *,
+        seconds: Optional[float] = None,
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO stages(run_id, doc_id, stage, output_hash, seconds, updated)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, doc_id, stage, output_hash, seconds, time.time()),
+            )
+            self._conn.commit()
+
+    def finish_document(
+        self,
+        run_id: str,
+        doc_id: str,
+        *,
+        report_type: Optional[str],
+        outputs: Dict[str, List[dict]],
+        warnings: List[str],
+        context: Optional[bytes] = None,
+        evaluations: Optional[List[dict]] = None,
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE documents SET status = 'done', report_type = ?, outputs = ?, warnings = ?,"
+                " context = ?, evaluations = ?, failed_stage = NULL, error = NULL, updated = ? WHERE run_id = ? AND doc_id = ?",
+                (
+                    report_type,
+                    json.dumps(outputs, ensure_ascii=False, default=str),
+                    json.dumps(warnings, ensure_ascii=False, default=str),
+                    sqlite3.Binary(context) if context is not None else None,
+                    json.dumps(evaluations, ensure_ascii=False, default=str) if evaluations is not None else None,
+                    time.time(),
+                    run_id,
+                    doc_id,
+                ),
+            )
+            self._conn.commit()
+
+    def fail_document(self, run_id: str, doc_id: str, *, stage: Optional[str], error: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE documents SET status = 'failed', failed_stage = ?, error = ?, updated = ?"
+                " WHERE run_id = ? AND doc_id = ?",
+                (stage, error, time.time(), run_id, doc_id),
+            )
+            self._conn.commit()
+
+    def reset_document(self, run_id: str, doc_id: str) -> None:
+        with self._lock:
+            self._delete_document(run_id, doc_id)
+            self._conn.commit()
+
+    def _delete_document(self, run_id: str, doc_id: str) -> None:
+        for table in ("documents", "stages", "extractors"):
+            self._conn.execute(
+                f"DELETE FROM {table} WHERE run_id = ? AND doc_id = ?", (run_id, doc_id)
+            )
+
+    def completed_ids(self, run_id: str) -> Set[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT doc_id FROM documents WHERE run_id = ? AND status = 'done'", (run_id,)
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    # -------------------------
+    # extractors
+    # -------------------------
+    def get_extractor(
+        self, run_id: str, doc_id: str, slug: str, input_hash: str
+    ) -> Optional[List[dict]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT input_hash, rows FROM extractors WHERE run_id = ? AND doc_id = ? AND slug = ?",
+                (run_id, doc_id, slug),
+            ).fetchone()
+        if row is None or row[0] != input_hash:
+            return None
+        return json.loads(row[1])
+
+    def put_extractor(
+        self, run_id: str, doc_id: str, slug: str, input_hash: str, rows: List[dict]
+    ) -> None:
+        payload = json.dumps(rows, ensure_ascii=False, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extractors(run_id, doc_id, slug, input_hash, output_hash, rows, updated)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run_id, doc_id, slug, input_hash, content_digest(payload), payload, time.time()),
+            )
+            self._conn.commit()
+
+    # -------------------------
+    # stats
+    # -------------------------
+    def summary(self, run_id: str) -> Dict[str, Any]:
+        with self._lock:
+            by_status = dict(
+                self._conn.execute(
+                    "SELECT status, COUNT(*) FROM documents WHERE run_id = ? GROUP BY status",
+                    (run_id,),
+                ).fetchall()
+            )
+            failed_stages = dict(
+                self._conn.execute(
+                    "SELECT failed_stage, COUNT(*) FROM documents"
+                    " WHERE run_id = ? AND status = 'failed' GROUP BY failed_stage",
+                    (run_id,),
+                ).fetchall()
+            )
+            (extractors,) = self._conn.execute(
+                "SELECT COUNT(*) FROM extractors WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        return {
+            "run_id": run_id,
+            "documents": by_status,
+            "failed_stages": failed_stages,
+            "extractor_results": int(extractors),
+        }
+
+
+class _DocumentExtractorCheckpoint:
+    """交给 RuleEngineExtractorRunner.run(checkpoint=...)：按 (slug, 输入哈希) 复用 / 记录抽取结果。"""
+
+    def __init__(self, ledger: CheckpointLedger, run_id: str, doc_id: str, *, reuse: bool) -> None:
+        self.ledger = ledger
+        self.run_id = run_id
+        self.doc_id = doc_id
+        self.reuse = reuse
+        self.reused: List[str] = []
+
+    def lookup(self, slug: str, input_hash: str) -> Optional[List[dict]]:
+        if not self.reuse:
+            return None
+        rows = self.ledger.get_extractor(self.run_id, self.doc_id, slug, input_hash)
+        if rows is not None:
+            self.reused.append(slug)
+        return rows
+
+    def record(self, slug: str, input_hash: str, rows: List[dict]) -> None:
+        self.ledger.put_extractor(self.run_id, self.doc_id, slug, input_hash, rows)
+
+
+class _CheckpointObserver(StageObserver):
+    """
+    单篇文档的台账钩子（经 run(observers=...) 传入，只作用于这一次运行）：
+    - 正常运行：记录当前阶段，阶段结束写输出哈希；extract 阶段注入抽取器断点
+    - 恢复已完成文档（done 不为 None）：每个阶段开始时置 skip，直接给出台账里的结果
+    """
+
+    def __init__(
+        self,
+        runner: "CheckpointRunner",
+        doc_id: str,
+        *,
+        done: Optional[DocumentCheckpoint] = None,
+        restored: Optional[ReportContext] = None,
+    ) -> None:
+        self.runner = runner
+        self.doc_id = doc_id
+        self.done = done
+        self.restored = restored
+        self.stage = "load"
+        self.evaluations: Optional[List[dict]] = None
+        self.extractors: Optional[_DocumentExtractorCheckpoint] = None
+        self._t0 = 0.0
+
+    def on_stage_start(self, scope: StageScope) -> None:
+        self.stage = scope.stage
+        self._t0 = time.time()
+        if self.done is not None:
+            self._restore_stage(scope)
+            return
+        if scope.stage == "extract":
+            self.extractors = _DocumentExtractorCheckpoint(
+                self.runner.ledger, self.runner.run_id, self.doc_id, reuse=self.runner.resume
+            )
+            scope.options["checkpoint"] = self.extractors
+
+    def _restore_stage(self, scope: StageScope) -> None:
+        done = self.done
+        assert done is not None
+        if scope.stage == "load":
+            scope.result = self.restored
+        elif scope.stage == "extract":
+            scope.result = done.outputs
+        elif scope.stage == "validate":
+            scope.result = done.warnings
+        elif scope.stage == "benchmark":
+            if done.evaluations is None:
+                return  # 首次运行没跑 benchmark：照常执行
+            scope.result = done.evaluations
+        scope.skip = True
+
+    def on_stage_end(self, scope: StageScope, error: Optional[BaseException] = None) -> None:
+        if error is not None or scope.skip:
+            return
+        ctx = scope.context
+        stage = scope.stage
+        if stage == "load":
+            output_hash: Optional[str] = content_digest((ctx.markdown_text if ctx else "") or "")
+        elif stage == "detect":
+            output_hash = content_digest(scope.result or "")
+        elif stage == "slice":
+            output_hash = _slices_digest(ctx) if ctx is not None else None
+        elif stage == "ocr_fallback":
+            output_hash = _slices_digest(ctx) if scope.result and ctx is not None else None
+        else:
+            output_hash = content_digest(scope.result)
+        if stage == "benchmark":
+            self.evaluations = list(scope.result or [])
+        self.runner.ledger.mark_stage(
+            self.runner.run_id, self.doc_id, stage, output_hash, seconds=time.time() - self._t0
+        )
+
+
+class CheckpointRunner:
+    """
+    带台账的 ReportPipeline.run / run_bytes：阶段顺序、stage_observers / stage_budgets 都与直接 run 一致，
+    run_kwargs（want_benchmark / override / progressive / debug ...）原样转给 pipeline。
+    """
+
+    def __init__(
+        self,
+        pipeline: ReportPipeline,
+        ledger: CheckpointLedger,
+        *,
+        run_id: str = "default",
+        resume: bool = True,
+        debug: bool = False,
+    ) -> None:
+        self.pipeline = pipeline
+        self.ledger = ledger
+        self.run_id = run_id
+        self.resume = resume
+        self.debug = debug
+        self.stats: Dict[str, int] = {"processed": 0, "skipped": 0, "failed": 0, "reused_extractors": 0}
+
+    def run_document(
+        self,
+        *,
+        docx_path: Optional[str | Path] = None,
+        file_bytes: Optional[BinarySource] = None,
+        filename: Optional[str] = None,
+        doc_id: Optional[str] = None,
+        **run_kwargs: Any,
+    ) -> PipelineResult:
+        """
+        跑一篇文档并记入台账。resume=True 且已完成时从台账恢复，不转换 / 切片 / 调 LLM：
+        context 由存下的编码还原（markdown / 切片 / metadata 齐全，metadata.checkpoint.resumed=True），
+        outputs / warnings / evaluations 取台账记录（首次没跑 benchmark 而本次要求时照常执行 benchmark）；
+        没有存 context 的旧记录只恢复 report_type，context 里没有 markdown 和切片。
+        """
+        if docx_path is None and file_bytes is None:
+            raise ValueError("run_document requires docx_path or file_bytes")
+        if file_bytes is not None:
+            file_bytes = ensure_seekable(file_bytes)
+
+        if doc_id is None:
+            doc_id = str(Path(docx_path).resolve()) if docx_path is not None else (filename or "")
+        if not doc_id:
+            raise ValueError("doc_id is required for byte inputs without filename")
+
+        source_hash = source_digest(docx_path if docx_path is not None else file_bytes)  # type: ignore[arg-type]
+
+        if self.resume:
+            done = self.ledger.document(self.run_id, doc_id)
+            if done is not None and done.status == "done" and done.source_hash == source_hash:
+                self.stats["skipped"] += 1
+                if self.debug:
+                    print(f"⏭️ [CHECKPOINT] skip done doc={doc_id}")
+                observer = _CheckpointObserver(
+                    self, doc_id, done=done, restored=self._restored_context(done, docx_path)
+                )
+                result = self._run(observer, docx_path, file_bytes, filename, run_kwargs)
+                result.context.set_metadata(
+                    checkpoint={"run_id": self.run_id, "doc_id": doc_id, "resumed": True}
+                )
+                return result
+        else:
+            self.ledger.reset_document(self.run_id, doc_id)
+
+        self.ledger.begin_document(self.run_id, doc_id, source_hash)
+        observer = _CheckpointObserver(self, doc_id)
+        try:
+            result = self._run(observer, docx_path, file_bytes, filename, run_kwargs)
+        except BaseException as e:
+            self.stats["failed"] += 1
+            self.ledger.fail_document(
+                self.run_id, doc_id, stage=observer.stage, error=f"{type(e).__name__}: {e}"
+            )
+            raise
+
+        ctx = result.context
+        reused = observer.extractors.reused if observer.extractors is not None else []
+        self.stats["reused_extractors"] += len(reused)
+        if reused:
+            ctx.set_metadata(checkpoint_reused_extractors=list(reused))
+            if self.debug:
+                print(f"♻️ [CHECKPOINT] reuse extractors doc={doc_id} slugs={reused}")
+        ctx.set_metadata(checkpoint={"run_id": self.run_id, "doc_id": doc_id, "resumed": False})
+
+        self.ledger.finish_document(
+            self.run_id,
+            doc_id,
+            report_type=ctx.metadata.get("report_type"),
+            outputs=result.outputs,
+            warnings=result.warnings,
+            context=self._encode_context(ctx, doc_id),
+            evaluations=observer.evaluations,
+        )
+        self.stats["processed"] += 1
+        return result
+
+    def _run(
+        self,
+        observer: _CheckpointObserver,
+        docx_path: Optional[str | Path],
+        file_bytes: Optional[BinarySource],
+        filename: Optional[str],
+        run_kwargs: Dict[str, Any],
+    ) -> PipelineResult:
+        if docx_path is not None:
+            return self.pipeline.run(docx_path=docx_path, observers=(observer,), **run_kwargs)
+        return self.pipeline.run_bytes(
+            file_bytes, filename=filename, observers=(observer,), **run_kwargs  # type: ignore[arg-type]
+        )
+
+    def _encode_context(self, ctx: ReportContext, doc_id: str) -> Optional[bytes]:
+        try:
+            return encode_context(ctx, compress=True)
+        except Exception as e:
+            # 存不下 context 不影响结果落账，恢复时退化为只有 outputs
+            logger.warning("checkpoint context encode failed: doc=%s (%r)", doc_id, e)
+            return None
+
+    def _restored_context(self, done: DocumentCheckpoint, docx_path: Optional[str | Path]) -> ReportContext:
+        ctx: Optional[ReportContext] = None
+        if done.context is not None:
+            try:
+                ctx = decode_context(done.context)
+            except Exception as e:
+                logger.warning("checkpoint context decode failed: doc=%s (%r)", done.doc_id, e)
+        if ctx is None:
+            ctx = ReportContext()
+        if docx_path is not None:
+            ctx.source_path = Path(docx_path).resolve()
+        ctx.set_metadata(report_type=done.report_type)
+        return ctx
+
+
+@dataclass(frozen=True)
+class CheckpointPolicy:
+    """PreforkWorkerPool 用：每个 worker 进程按 path 打开自己的台账连接。"""
+
+    path: str
+    run_id: str = "default"
+    resume: bool = True
+
+    def build_runner(self, pipeline: ReportPipeline, *, debug: bool = False) -> CheckpointRunner:
+        return CheckpointRunner(
+            pipeline,
+            CheckpointLedger(self.path),
+            run_id=self.run_id,
+            resume=self.resume,
+            debug=debug,
+        )
@@ -0,0 +1,359 @@
+"""
+ReportContext / PipelineResult 的紧凑二进制编码，用于进程间传递（prefork worker -> 父进程）和产物落盘。
+
+相比 to_dict() + json.dumps(indent=2)：
+- 切片正文能在 markdown 里找到时只记 (offset, length)，全文只存一份
+- 字符串驻留：dict key 和短字符串（切片 key、ruleset 名、命中类型等）首次出现时登记，之后只写编号
+- 整数用 zigzag varint，浮点 8 字节，无缩进 / 引号 / 转义
+- 可选 zlib 压缩（compress=True 或 1..9 的压缩级别）
+
+格式：b"FDRC" + 版本(1B) + 标志(1B, bit0=zlib) + 正文。正文是一个带类型标签的值（msgpack 风格）。
+无法识别的对象按 str() 编码，与 json.dumps(default=str) 的行为一致。
+"""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from fd_extractai_report.context import ReportContext, ReportSection
+
+
+MAGIC = b"FDRC"
+VERSION = 1
+_FLAG_ZLIB = 0x01
+
+# 长度不超过该值的 str 参与驻留
+INTERN_MAX_LEN = 64
+# 短于该值的切片正文直接内联，不查 offset
+SLICE_OFFSET_MIN_LEN = 64
+
+_T_NONE = 0x00
+_T_FALSE = 0x01
+_T_TRUE = 0x02
+_T_INT = 0x03
+_T_FLOAT = 0x04
+_T_STR = 0x05
+_T_STR_DEF = 0x06
+_T_STR_REF = 0x07
+_T_BYTES = 0x08
+_T_LIST = 0x09
+_T_TUPLE = 0x0A
+_T_DICT = 0x0B
+
+_F64 = struct.Struct("<d")
+
+
+class CodecError(ValueError):
+    pass
+
+
+# ============================================================
+# Value codec
+# ============================================================
+
+
+def _encode(obj: Any) -> bytes:
+    """单次遍历编码；闭包里绑定局部变量，减少热路径上的属性查找。"""
+    buf = bytearray()
+    append = buf.append
+    strings: Dict[str, int] = {}
+
+    def varint(n: int) -> None:
+        while n >= 0x80:
+            append((n & 0x7F) | 0x80)
+            n >>= 7
+        append(n)
+
+    def string(s: str) -> None:
+        if len(s) <= INTERN_MAX_LEN:
+            idx = strings.get(s)
+            if idx is not None:
+                append(_T_STR_REF)
+                if idx < 0x80:
+                    append(idx)
+                else:
+                    varint(idx)
+                return
+            strings[s] = len(strings)
+            append(_T_STR_DEF)
+            raw = s.encode("utf-8")
+            # UTF-8 最长 4 字节 / 字符，驻留串的字节长度可能超过 0x7F，统一按 varint 写
+            varint(len(raw))
+            buf.extend(raw)
+            return
+        append(_T_STR)
+        raw = s.encode("utf-8")
+        varint(len(raw))
+        buf.extend(raw)
+
+    def value(v: Any) -> None:
+        t = type(v)
+        if t is str:
+            string(v)
+        elif t is dict:
+            append(_T_DICT)
+            varint(len(v))
+            for k, item in v.items():
+                string(k if type(k) is str else str(k))
+                value(item)
+        elif t is int:
+            append(_T_INT)
+            z = (v << 1) if v >= 0 else ((-v << 1) - 1)
+            if z < 0x80:
+                append(z)
+            else:
+                varint(z)
+        elif t is list or t is tuple:
+            append(_T_LIST if t is list else _T_TUPLE)
+            varint(len(v))
+            for item in v:
+                value(item)
+        elif v is None:
+            append(_T_NONE)
+        elif v is True:
+            append(_T_TRUE)
+        elif v is False:
+            append(_T_FALSE)
+        elif t is float:
+            append(_T_FLOAT)
+            buf.extend(_F64.pack(v))
+        elif isinstance(v, (bytes, bytearray, memoryview)):
+            append(_T_BYTES)
+            raw = bytes(v)
+            varint(len(raw))
+            buf.extend(raw)
+        elif isinstance(v, str):
+            string(str(v))
+        elif isinstance(v, dict):
+            value(dict(v))
+        elif isinstance(v, (list, tuple)):
+            value(list(v))
+        elif isinstance(v, bool):
+            value(bool(v))
+        elif isinstance(v, int):
+            value(int(v))
+        elif isinstance(v, float):
+            value(float(v))
+        else:
+            string(str(v))
+
+    value(obj)
+    return bytes(buf)
+
+
+class _Decoder:
+    __slots__ = ("data", "pos", "strings")
+
+    def __init__(self, data: memoryview) -> None:
+        self.data = data
+        self.pos = 0
+        self.strings: List[str] = []
+
+    def varint(self) -> int:
+        data = self.data
+        shift = 0
+        n = 0
+        while True:
+            b = data[self.pos]
+            self.pos += 1
+            n |= (b & 0x7F) << shift
+            if b < 0x80:
+                return n
+            shift += 7
+
+    def _raw_str(self) -> str:
+        size = self.varint()
+        start = self.pos
+        self.pos += size
+        return str(self.data[start : self.pos], "utf-8")
+
+    def value(self) -> Any:
+        tag = self.data[self.pos]
+        self.pos += 1
+        if tag == _T_STR_REF:
+            return self.strings[self.varint()]
+        if tag == _T_STR_DEF:
+            s = self._raw_str()
+            self.strings.append(s)
+            return s
+        if tag == _T_DICT:
+            n = self.varint()
+            out: Dict[str, Any] = {}
+            for _ in range(n):
+                k = self.value()
+                out[k] = self.value()
+            return out
+        if tag == _T_LIST:
+            return [self.value() for _ in range(self.varint())]
+        if tag == _T_STR:
+            return self._raw_str()
+        if tag == _T_INT:
+            z = self.varint()
+            return (z >> 1) if not z & 1 else -((z + 1) >> 1)
+        if tag == _T_NONE:
+            return None
+        if tag == _T_TRUE:
+            return True
+        if tag == _T_FALSE:
+            return False
+        if tag == _T_FLOAT:
+            (f,) = _F64.unpack_from(self.data, self.pos)
+            self.pos += 8
+            return f
+        if tag == _T_TUPLE:
+            return tuple(self.value() for _ in range(self.varint()))
+        if tag == _T_BYTES:
+            size = self.varint()
+            start = self.pos
+            self.pos += size
+            return bytes(self.data[start : self.pos])
+        raise CodecError(f"unknown type tag 0x{tag:02x} at {self.pos - 1}")
+
+
+def _compress_level(compress: Union[bool, int]) -> int:
+    if compress is True:
+        return 6
+    if not compress:
+        return 0
+    return max(1, min(9, int(compress)))
+
+
+def dumps(obj: Any, *, compress: Union[bool, int] = False) -> bytes:
+    """编码 JSON 风格的值（dict / list / tuple / str / int / float / bool / None / bytes）。"""
+    body = _encode(obj)
+    level = _compress_level(compress)
+    flags = 0
+    if level:
+        body = zlib.compress(body, level)
+        flags |= _FLAG_ZLIB
+    return MAGIC + bytes((VERSION, flags)) + body
+
+
+def loads(data: Union[bytes, bytearray, memoryview]) -> Any:
+    view = memoryview(data)
+    if len(view) < 6 or bytes(view[:4]) != MAGIC:
+        raise CodecError("not an FDRC payload")
+    version, flags = view[4], view[5]
+    if version != VERSION:
+        raise CodecError(f"unsupported FDRC version {version}")
+    body = view[6:]
+    if flags & _FLAG_ZLIB:
+        body = memoryview(zlib.decompress(body))
+    dec = _Decoder(body)
+    out = dec.value()
+    if dec.pos != len(body):
+        raise CodecError("trailing bytes after FDRC value")
+    return out
+
+
+# ============================================================
+# Slices as offsets
+# ============================================================
+
+
+def encode_slices(
+    slices: Dict[str, List[ReportSection]], markdown: Optional[str]
+) -> List[list]:
+    """
+    [[key, [[title, offset, length, metadata], ...]], ...]
+    正文不在 markdown 里时 offset = -1，length 位置直接放正文。
+    按文档顺序切出的片段通常依次出现，先从上一片的结尾往后找。
+    """
+    md = markdown or ""
+    out: List[list] = []
+    cursor = 0
+    for key, sections in (slices or {}).items():
+        rows: List[list] = []
+        for s in sections:
+            text = s.text or ""
+            pos = -1
+            if md and len(text) >= SLICE_OFFSET_MIN_LEN:
+                # 相邻切片常常首尾相接：先试上一片的结尾，再往后找，最后全文找
+                if md.startswith(text, cursor):
+                    pos = cursor
+                else:
+                    pos = md.find(text, cursor)
+                    if pos < 0:
+                        pos = md.find(text)
+            if pos >= 0:
+                cursor = pos + len(text)
+                rows.append([s.title, pos, len(text), s.metadata])
+            else:
+                rows.append([s.title, -1, text, s.metadata])
+        out.append([key, rows])
+    return out
+
+
+def decode_slices(rows: List[list], markdown: Optional[str]) -> Dict[str, List[ReportSection]]:
+    md = markdown or ""
+    slices: Dict[str, List[ReportSection]] = {}
+    for key, items in rows or []:
+        sections = slices.setdefault(key, [])
+        for title, offset, length_or_text, metadata in items:
+            text = md[offset : offset + length_or_text] if offset >= 0 else length_or_text
+            sections.append(
+                ReportSection(key=key, title=title, text=text, metadata=metadata or {})
+            )
+    return slices
+
+
+# ============================================================
+# ReportContext / PipelineResult
+# ============================================================
+
+
+def _context_payload(ctx: ReportContext) -> Dict[str, Any]:
+    return {
+        "source_path": str(ctx.source_path) if ctx.source_path else None,
+        "markdown": ctx.markdown_text,
+        "slices": encode_slices(ctx.slices, ctx.markdown_text),
+        "metadata": ctx.metadata,
+    }
+
+
+def _context_from_payload(payload: Dict[str, Any]) -> ReportContext:
+    source_path = payload.get("source_path")
+    markdown = payload.get("markdown")
+    return ReportContext(
+        source_path=Path(source_path) if source_path else None,
+        markdown_text=markdown,
+        slices=decode_slices(payload.get("slices") or [], markdown),
+        metadata=payload.get("metadata") or {},
+    )
+
+
+def encode_context(ctx: ReportContext, *, compress: Union[bool, int] = False) -> bytes:
+    return dumps(_context_payload(ctx), compress=compress)
+
+
+def decode_context(data: Union[bytes, bytearray, memoryview]) -> ReportContext:
+    return _context_from_payload(loads(data))
+
+
+def encode_result(result: Any, *, compress: Union[bool, int] = False) -> bytes:
+    """PipelineResult -> bytes（context 与 outputs 共用一张驻留表）。"""
+    return dumps(
+        {
+            "context": _context_payload(result.context),
+            "outputs": result.outputs,
+            "evaluations": result.evaluations,
+            "warnings": result.warnings,
+        },
+        compress=compress,
+    )
+
+
+def decode_result(data: Union[bytes, bytearray, memoryview]) -> Any:
+    from fd_extractai_report.pipeline import PipelineResult
+
+    payload = loads(data)
+    return PipelineResult(
+        context=_context_from_payload(payload["context"]),
+        outputs=payload.get("outputs") or {},
+        evaluations=payload.get("evaluations") or [],
+        warnings=payload.get("warnings") or [],
+    )
+
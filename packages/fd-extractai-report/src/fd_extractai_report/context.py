@@ -114,6 +114,18 @@ class ReportContext:
             for section in arr:
                 yield section
 
+    def to_bytes(self, *, compress: bool | int = False) -> bytes:
+        """紧凑二进制编码（切片记为 markdown 内的 offset），见 codec.encode_context。"""
+        from fd_extractai_report.codec import encode_context
+
+        return encode_context(self, compress=compress)
+
+    @classmethod
+    def from_bytes(cls, data: bytes | bytearray | memoryview) -> "ReportContext":
+        from fd_extractai_report.codec import decode_context
+
+        return decode_context(data)
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             "source_path": str(self.source_path) if self.source_path else None,
@@ -1,3 +1,20 @@
+from .admission import AdmissionController, ConversionMemoryModel, get_admission_controller
+from .docx_reader import docx_to_markdown, iter_docx_blocks
 from .markdown_converter import MarkdownFileConverter
+from .ocr_cache import CachedOCRService, OCRResultCache, get_ocr_cache
+from .ocr_preprocess import OCRImagePreprocessor, OCRPreprocessConfig, PreprocessedOCRService
 
-__all__ = ["MarkdownFileConverter"]
\ No newline at end of file
+__all__ = [
+    "AdmissionController",
+    "CachedOCRService",
+    "ConversionMemoryModel",
+    "MarkdownFileConverter",
+    "OCRImagePreprocessor",
+    "OCRPreprocessConfig",
+    "OCRResultCache",
+    "PreprocessedOCRService",
+    "docx_to_markdown",
+    "get_admission_controller",
+    "get_ocr_cache",
+    "iter_docx_blocks",
+]
@@ -0,0 +1,165 @@
+"""
+并发转换的内存准入控制：按文件类型 / 大小 / 是否 OCR 估算单次转换的内存占用，
+只有在途估算总量不超过预算时才开始转换，其余按到达顺序排队。
+单个估算超过预算的大文件在没有其他转换时独占执行，不会被饿死。
+预算是进程内的：多进程（PreforkWorkerPool）时由池在父进程里统一准入（见 prefork.py），
+fork 出的 worker 各自的 controller 只约束 worker 内的并发转换。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterator, Optional
+
+
+logger = logging.getLogger(__name__)
+
+_MB = 1024 * 1024
+
+_CONTROLLERS: Dict[int, "AdmissionController"] = {}
+_CONTROLLERS_LOCK = threading.Lock()
+
+
+def _reset_controllers_after_fork() -> None:
+    # 子进程是独立的内存空间：不继承父进程的在途额度与锁状态
+    global _CONTROLLERS_LOCK
+    _CONTROLLERS_LOCK = threading.Lock()
+    _CONTROLLERS.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_controllers_after_fork)
+
+
+@dataclass(frozen=True)
+class ConversionMemoryModel:
+    """
+    估算 = base + 文件大小 * factor（OCR 时再加 ocr_factor）。
+    倍数按经验取：PDF 布局分析对象膨胀最大；DOCX 经 mammoth 生成完整 XML/HTML DOM；
+    OCR 需要把内嵌图片全部解码。
+    """
+
+    base_bytes: int = 60 * _MB
+    pdf_factor: float = 12.0
+    docx_factor: float = 10.0
+    doc_factor: float = 10.0
+    other_factor: float = 6.0
+    ocr_factor: float = 4.0
+
+    def estimate(self, size: Optional[int], suffix: str, *, ocr: bool = False) -> int:
+        size = max(0, int(size or 0))
+        suffix = (suffix or "").lower()
+        if suffix == ".pdf":
+            factor = self.pdf_factor
+        elif suffix == ".docx":
+            factor = self.docx_factor
+        elif suffix == ".doc":
+            factor = self.doc_factor
+        else:
+            factor = self.other_factor
+        if ocr:
+            factor += self.ocr_factor
+        return int(self.base_bytes + size * factor)
+
+
+class AdmissionController:
+    def __init__(self, budget_bytes: int) -> None:
+        self.budget_bytes = max(1, int(budget_bytes))
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.admitted = 0
+        self.queued = 0
+        self.wait_seconds = 0.0
+
+        self._cond = threading.Condition()
+        self._waiting: Deque[int] = deque()
+        self._tickets = 0
+        self._running = 0
+
+    def _can_admit(self, ticket: int, cost: int) -> bool:
+        # 严格按到达顺序：只有队首可以进入，避免大任务被小任务持续插队
+        if not self._waiting or self._waiting[0] != ticket:
+            return False
+        if self._running == 0:
+            return True
+        return self.in_flight + cost <= self.budget_bytes
+
+    def acquire(self, cost: int, *, timeout: Optional[float] = None) -> bool:
+        cost = max(0, int(cost))
+        t0 = time.monotonic()
+        with self._cond:
+            ticket = self._tickets
+            self._tickets += 1
+            self._waiting.append(ticket)
+            waited = False
+            try:
+                while not self._can_admit(ticket, cost):
+                    waited = True
+                    remaining = None if timeout is None else timeout - (time.monotonic() - t0)
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting.remove(ticket)
+                # 队首变化：唤醒下一个
+                self._cond.notify_all()
+
+            self.in_flight += cost
+            self._running += 1
+            self.admitted += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            if waited:
+                self.queued += 1
+                self.wait_seconds += time.monotonic() - t0
+                logger.debug(
+                    "conversion admitted after %.2fs cost=%dMB in_flight=%dMB",
+                    time.monotonic() - t0,
+                    cost // _MB,
+                    self.in_flight // _MB,
+                )
+            return True
+
+    def release(self, cost: int) -> None:
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - max(0, int(cost)))
+            self._running = max(0, self._running - 1)
+            self._cond.notify_all()
+
+    @contextmanager
+    def admit(self, cost: int) -> Iterator[None]:
+        self.acquire(cost)
+        try:
+            yield
+        finally:
+            self.release(cost)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "budget_mb": self.budget_bytes // _MB,
+                "in_flight_mb": self.in_flight // _MB,
+                "peak_in_flight_mb": self.peak_in_flight // _MB,
+                "running": self._running,
+                "waiting": len(self._waiting),
+                "admitted": self.admitted,
+                "queued": self.queued,
+                "wait_seconds": round(self.wait_seconds, 3),
+            }
+
+
+def get_admission_controller(budget_mb: int) -> Optional[AdmissionController]:
+    """按预算返回进程内共享的 controller，保证同进程所有 converter 共用一份预算；budget_mb<=0 返回 None。"""
+    if not budget_mb or budget_mb <= 0:
+        return None
+    with _CONTROLLERS_LOCK:
+        ctrl = _CONTROLLERS.get(budget_mb)
+        if ctrl is None:
+            ctrl = AdmissionController(budget_mb * _MB)
+            _CONTROLLERS[budget_mb] = ctrl
+        return ctrl
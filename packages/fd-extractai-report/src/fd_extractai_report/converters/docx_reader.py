@@ -0,0 +1,233 @@
+"""
+轻量 DOCX -> markdown 快速通道：
+直接增量解析 word/document.xml，只输出切片器真正消费的内容（标题、段落、pipe 表格），
+跳过 MarkItDown 的 mammoth -> HTML -> markdown 双重转换。
+不处理图片 / OCR、脚注、批注、文本框，以及列表编号和行内样式。
+"""
+
+from __future__ import annotations
+
+import re
+import zipfile
+from io import BytesIO
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Optional, Union
+from xml.etree.ElementTree import Element, iterparse
+
+
+DocxSource = Union[bytes, bytearray, memoryview, str, Path, IO[bytes]]
+
+_W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_W = "{" + _W_NS + "}"
+
+# 段落内可以包住 w:r 的行内容器（超链接、修订插入、智能标记、简单域、自定义 XML、行内内容控件）
+_RUN_CONTAINERS = frozenset(
+    _W + tag for tag in ("hyperlink", "ins", "smartTag", "fldSimple", "customXml", "sdt", "sdtContent")
+)
+# 单元格内可以包住段落的块级容器（嵌套表格、块级内容控件、自定义 XML）
+_CELL_CONTAINERS = frozenset(
+    _W + tag for tag in ("tbl", "tr", "tc", "sdt", "sdtContent", "customXml")
+)
+
+_HEADING_STYLE_RE = re.compile(r"^(?:heading|标题)\s*(\d)$", re.I)
+
+
+def _open_zip(source: DocxSource) -> zipfile.ZipFile:
+    if isinstance(source, (str, Path)):
+        return zipfile.ZipFile(str(source))
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return zipfile.ZipFile(BytesIO(source))
+    return zipfile.ZipFile(source)
+
+
+def _load_heading_styles(zf: zipfile.ZipFile) -> Dict[str, int]:
+    """styleId -> 标题级别（按样式名 heading N / 标题 N 或 outlineLvl 判断）。"""
+    try:
+        data = zf.read("word/styles.xml")
+    except KeyError:
+        return {}
+
+    levels: Dict[str, int] = {}
+    for _, el in iterparse(BytesIO(data), events=("end",)):
+        if el.tag != _W + "style":
+            continue
+        style_id = el.get(_W + "styleId") or ""
+        name_el = el.find(_W + "name")
+        name = (name_el.get(_W + "val") if name_el is not None else "") or ""
+
+        level: Optional[int] = None
+        m = _HEADING_STYLE_RE.match(name.strip())
+        if m:
+            level = int(m.group(1))
+        else:
+            outline = el.find(f"{_W}pPr/{_W}outlineLvl")
+            if outline is not None:
+                try:
+                    level = int(outline.get(_W + "val") or "9") + 1
+                except ValueError:
+                    level = None
+
+        if style_id and level and 1 <= level <= 6:
+            levels[style_id] = level
+        el.clear()
+    return levels
+
+
+def _iter_runs(el: Element) -> Iterator[Element]:
+    """段落自身的 w:r（含行内容器里的）；不进入 w:drawing / mc:AlternateContent / w:txbxContent 等文本框子树。"""
+    for child in el:
+        if child.tag == _W + "r":
+            yield child
+        elif child.tag in _RUN_CONTAINERS:
+            yield from _iter_runs(child)
+
+
+def _paragraph_text(p: Element, *, line_break: str = "\n") -> str:
+    parts: List[str] = []
+    for r in _iter_runs(p):
+        # 只看 run 的直接子节点：文本框挂在 run 下的 drawing / pict / AlternateContent 里
+        for el in r:
+            tag = el.tag
+            if tag == _W + "t":
+                parts.append(el.text or "")
+            elif tag == _W + "tab":
+                parts.append("\t")
+            elif tag in (_W + "br", _W + "cr"):
+                parts.append(line_break)
+            elif tag == _W + "noBreakHyphen":
+                parts.append("-")
+    return "".join(parts)
+
+
+def _paragraph_level(p: Element, heading_styles: Dict[str, int]) -> Optional[int]:
+    ppr = p.find(_W + "pPr")
+    if ppr is None:
+        return None
+    style = ppr.find(_W + "pStyle")
+    if style is not None:
+        level = heading_styles.get(style.get(_W + "val") or "")
+        if level:
+            return level
+    outline = ppr.find(_W + "outlineLvl")
+    if outline is not None:
+        try:
+            level = int(outline.get(_W + "val") or "9") + 1
+        except ValueError:
+            return None
+        if 1 <= level <= 6:
+            return level
+    return None
+
+
+def _paragraph_to_markdown(p: Element, heading_styles: Dict[str, int]) -> str:
+    text = _paragraph_text(p).strip()
+    if not text:
+        return ""
+    level = _paragraph_level(p, heading_styles)
+    if level:
+        return "#" * level + " " + " ".join(text.split())
+    return text
+
+
+def _iter_cell_paragraphs(el: Element) -> Iterator[Element]:
+    """单元格里的段落（含嵌套表格）；不进入段落内部，文本框里的段落不会再被访问。"""
+    for child in el:
+        if child.tag == _W + "p":
+            yield child
+        elif child.tag in _CELL_CONTAINERS:
+            yield from _iter_cell_paragraphs(child)
+
+
+def _cell_text(tc: Element) -> str:
+    lines: List[str] = []
+    for p in _iter_cell_paragraphs(tc):
+        t = _paragraph_text(p, line_break=" ").strip()
+        if t:
+            lines.append(t)
+    text = " ".join(lines)
+    return " ".join(text.split()).replace("|", "\\|")
+
+
+def _table_to_markdown(tbl: Element) -> str:
+    rows: List[List[str]] = []
+    for tr in tbl.findall(_W + "tr"):
+        row: List[str] = []
+        for tc in tr.findall(_W + "tc"):
+            tcpr = tc.find(_W + "tcPr")
+            span = 1
+            vmerge_continue = False
+            if tcpr is not None:
+                gs = tcpr.find(_W + "gridSpan")
+                if gs is not None:
+                    try:
+                        span = max(1, int(gs.get(_W + "val") or "1"))
+                    except ValueError:
+                        span = 1
+                vm = tcpr.find(_W + "vMerge")
+                if vm is not None and (vm.get(_W + "val") or "continue") == "continue":
+                    vmerge_continue = True
+
+            text = "" if vmerge_continue else _cell_text(tc)
+            row.append(text)
+            row.extend([""] * (span - 1))
+        if row:
+            rows.append(row)
+
+    if not rows:
+        return ""
+
+    width = max(len(r) for r in rows)
+    rows = [r + [""] * (width - len(r)) for r in rows]
+
+    out = ["| " + " | ".join(rows[0]) + " |", "| " + " | ".join(["---"] * width) + " |"]
+    out.extend("| " + " | ".join(r) + " |" for r in rows[1:])
+    return "\n".join(out)
+
+
+def iter_docx_blocks(source: DocxSource) -> Iterator[str]:
+    """
+    按 body 顺序逐块产出 markdown（标题 / 段落 / 表格），
+    每个 body 级元素处理完即释放，内存占用与文档长度无关。
+    """
+    with _open_zip(source) as zf:
+        heading_styles = _load_heading_styles(zf)
+
+        with zf.open("word/document.xml") as fh:
+            depth = 0
+            body_depth = -1
+            body: Optional[Element] = None
+            for event, el in iterparse(fh, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    if el.tag == _W + "body":
+                        body_depth = depth
+                        body = el
+                    continue
+
+                # end
+                if body_depth > 0 and depth == body_depth + 1:
+                    block = ""
+                    if el.tag == _W + "p":
+                        block = _paragraph_to_markdown(el, heading_styles)
+                    elif el.tag == _W + "tbl":
+                        block = _table_to_markdown(el)
+                    elif el.tag == _W + "sdt":
+                        # 内容控件（目录等）：展开其中的段落 / 表格
+                        content = el.find(_W + "sdtContent")
+                        parts: List[str] = []
+                        for child in list(content) if content is not None else []:
+                            if child.tag == _W + "p":
+                                parts.append(_paragraph_to_markdown(child, heading_styles))
+                            elif child.tag == _W + "tbl":
+                                parts.append(_table_to_markdown(child))
+                        block = "\n\n".join(x for x in parts if x)
+                    el.clear()
+                    if body is not None:
+                        body.remove(el)
+                    if block:
+                        yield block
+                depth -= 1
+
+
+def docx_to_markdown(source: DocxSource) -> str:
+    return "\n\n".join(iter_docx_blocks(source))
@@ -0,0 +1,187 @@
+"""
+converter 的二进制输入归一化：
+bytes / bytearray / memoryview / mmap / file-like 统一成可 seek 的只读流交给 MarkItDown，
+缓冲区类输入不再额外复制，不可 seek 的流（socket、管道上传）先落到 SpooledTemporaryFile。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import mmap
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, BinaryIO, Optional, Union
+
+
+BinarySource = Union[bytes, bytearray, memoryview, mmap.mmap, BinaryIO]
+
+# 不可 seek 的流落盘前在内存中保留的上限
+SPOOL_MAX_MEMORY = 16 * 1024 * 1024
+
+
+class BufferReader(io.BufferedIOBase):
+    """memoryview 上的零拷贝只读流：只有 read() 返回的片段才会被复制。"""
+
+    def __init__(self, buffer: Union[bytes, bytearray, memoryview, mmap.mmap]) -> None:
+        super().__init__()
+        self._view = memoryview(buffer).cast("B")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = len(self._view) + offset
+        else:
+            raise ValueError(f"invalid whence: {whence}")
+        if pos < 0:
+            raise ValueError(f"negative seek position {pos}")
+        self._pos = pos
+        return pos
+
+    def readinto(self, b) -> int:
+        chunk = self._view[self._pos : self._pos + len(b)]
+        n = len(chunk)
+        memoryview(b).cast("B")[:n] = chunk
+        self._pos += n
+        return n
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        end = len(self._view) if size is None or size < 0 else self._pos + size
+        chunk = self._view[self._pos : end].tobytes()
+        self._pos += len(chunk)
+        return chunk
+
+    def read1(self, size: Optional[int] = -1) -> bytes:
+        return self.read(size)
+
+    def getbuffer(self) -> memoryview:
+        return self._view
+
+    def close(self) -> None:
+        # 释放导出的 buffer，否则底层 mmap 无法 close
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+
+class StreamAdapter(io.BufferedIOBase):
+    """
+    把任意 read/seek 对象（SpooledTemporaryFile、框架上传对象、RawIOBase）
+    适配成 BufferedIOBase：MarkItDown 的类型识别只接受 BufferedIOBase。
+    """
+
+    def __init__(self, inner: Any) -> None:
+        super().__init__()
+        self._inner = inner
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._inner.tell()
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._inner.seek(offset, whence)
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        return self._inner.read(-1 if size is None else size)
+
+    def read1(self, size: Optional[int] = -1) -> bytes:
+        return self.read(size)
+
+    def readinto(self, b) -> int:
+        data = self.read(len(b))
+        n = len(data)
+        memoryview(b).cast("B")[:n] = data
+        return n
+
+
+def is_buffer_source(source: object) -> bool:
+    return isinstance(source, (bytes, bytearray, memoryview, mmap.mmap))
+
+
+def is_stream_source(source: object) -> bool:
+    return hasattr(source, "read") and not is_buffer_source(source)
+
+
+def spool_stream(stream: BinaryIO, *, max_memory: int = SPOOL_MAX_MEMORY) -> BinaryIO:
+    """把不可 seek 的流复制到 SpooledTemporaryFile（超过 max_memory 自动落盘）。"""
+    spooled = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    shutil.copyfileobj(stream, spooled, 1024 * 1024)
+    spooled.seek(0)
+    return spooled  # type: ignore[return-value]
+
+
+def ensure_seekable(source: BinarySource) -> BinarySource:
+    """缓冲区原样返回；不可 seek 的流先 spool，保证后续可以多次转换（如按需 OCR）。"""
+    if is_stream_source(source):
+        seekable = getattr(source, "seekable", None)
+        if not (callable(seekable) and seekable()):
+            return spool_stream(source)  # type: ignore[arg-type]
+    return source
+
+
+def open_source_stream(source: BinarySource) -> BinaryIO:
+    """缓冲区包成零拷贝 reader（bytes 直接用 BytesIO，CPython 下与原对象共享内存）。"""
+    if isinstance(source, bytes):
+        return io.BytesIO(source)
+    if is_buffer_source(source):
+        return BufferReader(source)  # type: ignore[arg-type, return-value]
+    stream = ensure_seekable(source)
+    if isinstance(stream, io.BufferedIOBase):
+        return stream  # type: ignore[return-value]
+    return StreamAdapter(stream)  # type: ignore[return-value]
+
+
+def source_size(source: object) -> Optional[int]:
+    if is_buffer_source(source):
+        return memoryview(source).nbytes  # type: ignore[arg-type]
+    if is_stream_source(source):
+        try:
+            pos = source.tell()  # type: ignore[attr-defined]
+            end = source.seek(0, io.SEEK_END)  # type: ignore[attr-defined]
+            source.seek(pos)  # type: ignore[attr-defined]
+            return end - pos
+        except (AttributeError, OSError, ValueError):
+            return None
+    return None
+
+
+_DIGEST_CHUNK = 1024 * 1024
+
+
+def source_digest(source: Union[BinarySource, str, Path]) -> str:
+    """输入文件内容的 sha256：路径按块读取；缓冲区直接哈希；流读完后复原位置。"""
+    h = hashlib.sha256()
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as fh:
+            for chunk in iter(lambda: fh.read(_DIGEST_CHUNK), b""):
+                h.update(chunk)
+        return h.hexdigest()
+    if is_buffer_source(source):
+        h.update(memoryview(source))  # type: ignore[arg-type]
+        return h.hexdigest()
+    start = source.tell()  # type: ignore[union-attr]
+    try:
+        for chunk in iter(lambda: source.read(_DIGEST_CHUNK), b""):  # type: ignore[union-attr]
+            h.update(chunk)
+    finally:
+        source.seek(start)  # type: ignore[union-attr]
+    return h.hexdigest()
@@ -2,25 +2,85 @@ from __future__ import annotations
 
 import importlib.util
 import logging
+import os
 import shutil
 import subprocess
 import tempfile
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, replace
 from io import BytesIO
 from pathlib import Path
-from typing import Any, Optional, Union
-
-from markitdown import MarkItDown
-
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, Iterator, Optional, Tuple, Union
+
+from fd_extractai_report.converters.admission import (
+    AdmissionController,
+    ConversionMemoryModel,
+    get_admission_controller,
+)
+from fd_extractai_report.converters.ocr_cache import CachedOCRService, get_ocr_cache
+from fd_extractai_report.converters.docx_reader import docx_to_markdown, iter_docx_blocks
+from fd_extractai_report.converters.input_stream import (
+    BinarySource,
+    is_buffer_source,
+    is_stream_source,
+    open_source_stream,
+    source_size,
+)
+from fd_extractai_report.converters.pdf_parallel import (
+    convert_pdf_parallel,
+    iter_pdf_chunks,
+)
+from fd_extractai_report.converters.ocr_preprocess import (
+    OCRImagePreprocessor,
+    OCRPreprocessConfig,
+    PreprocessedOCRService,
+)
 from fd_extractai_report.settings import CONFIG, LLMConfig
 
+if TYPE_CHECKING:
+    from markitdown import MarkItDown
 
-ConverterSource = Union[bytes, str, Path]
+
+ConverterSource = Union[BinarySource, str, Path]
 _DOCX_OCR_ORDER_PATCHED = False
 
+# 进程级 MarkItDown 池：key = (resolved options, OCR client timeout)
+# value = (MarkItDown, OCR service)；插件发现 / OCR client 只在首次构建
+# options 含 ocr_api_key / base_url / prompt，按租户 / 请求变化时 key 会不断增长，因此按 LRU 限制条数
+_MARKITDOWN_POOL: "OrderedDict[Tuple[Any, int], Tuple[MarkItDown, Any]]" = OrderedDict()
+_MARKITDOWN_POOL_LOCK = threading.Lock()
+# 每个 key 一把构建锁（single-flight）：构建在全局锁之外进行，慢的初始化不阻塞其他 options 的 converter
+_MARKITDOWN_BUILDING: Dict[Tuple[Any, int], threading.Lock] = {}
+
+
+def _reset_pool_lock_after_fork() -> None:
+    # fork 时锁可能被其他线程持有，子进程里重建
+    global _MARKITDOWN_POOL_LOCK, _MARKITDOWN_BUILDING
+    _MARKITDOWN_POOL_LOCK = threading.Lock()
+    _MARKITDOWN_BUILDING = {}
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pool_lock_after_fork)
+
 logger = logging.getLogger(__name__)
 
 
+def _read_all(source: Any) -> bytes:
+    if isinstance(source, bytes):
+        return source
+    if is_buffer_source(source):
+        return memoryview(source).tobytes()
+    if not source.seekable():
+        return source.read()
+    start = source.tell()
+    try:
+        return source.read()
+    finally:
+        source.seek(start)
+
+
 class OCRDependencyError(RuntimeError):
     pass
 
@@ -41,6 +101,21 @@ class MarkdownConvertOptions:
     ocr_base_url: Optional[str] = None
     ocr_api_key: Optional[str] = None
     ocr_prompt: Optional[str] = None
+    # 跨文档 OCR 缓存：enable_ocr_cache=False 时每张图都重新走 VLM
+    enable_ocr_cache: bool = True
+    ocr_cache_path: Optional[str] = None
+    ocr_cache_max_entries: Optional[int] = None
+    # VLM 前的本地预处理：过滤小图/空白图，缩放并重编码大图
+    enable_ocr_preprocess: bool = True
+    ocr_preprocess: Optional[OCRPreprocessConfig] = None
+    # PDF 按页并行转换（仅在未启用 OCR 时生效；OCR 需要 markitdown-ocr 的图文交错）
+    pdf_parallel: bool = False
+    pdf_backend: str = "markitdown"
+    pdf_pages_per_chunk: int = 20
+    pdf_max_workers: int = 0
+    pdf_parallel_min_pages: int = 40
+    # DOCX 后端："markitdown"（mammoth，默认）| "native"（流式 XML 快速通道，未启用 OCR 时生效）
+    docx_backend: str = "markitdown"
 
 
 class MarkdownFileConverter:
@@ -49,10 +124,55 @@ class MarkdownFileConverter:
         options: Optional[MarkdownConvertOptions] = None,
         *,
         llm_config: Optional[LLMConfig] = None,
+        use_pool: bool = True,
+        admission: Optional[AdmissionController] = None,
+        memory_model: Optional[ConversionMemoryModel] = None,
     ) -> None:
         self.llm_config = llm_config or CONFIG
         self.opt = self._resolve_options(options)
-        self.md = self._build_markitdown()
+        self.use_pool = use_pool
+        # 内存准入：默认按 LLM_CONVERT_MEMORY_BUDGET_MB 取进程共享的 controller，未配置时不限流
+        self.admission = admission or get_admission_controller(
+            self.llm_config.convert_memory_budget_mb
+        )
+        self.memory_model = memory_model or ConversionMemoryModel()
+        self.ocr_service: Any = None
+        self._md: Optional[MarkItDown] = None
+
+    @property
+    def md(self) -> MarkItDown:
+        # MarkItDown（pandas / openpyxl / pptx 等转换器依赖）首次转换时才导入并初始化
+        if self._md is None:
+            self._md = self._acquire_markitdown()
+        return self._md
+
+    def _acquire_markitdown(self) -> MarkItDown:
+        """
+        从进程级池中取已初始化的 MarkItDown（及 OCR service），
+        相同 options 的 pipeline / 线程共享同一实例；use_pool=False 时独立构建。
+        """
+        if not self.use_pool:
+            return self._build_markitdown()
+
+        pool_key = (self.opt, self.llm_config.timeout)
+        entry = _pool_get(pool_key)
+        if entry is None:
+            with _MARKITDOWN_POOL_LOCK:
+                build_lock = _MARKITDOWN_BUILDING.setdefault(pool_key, threading.Lock())
+            with build_lock:
+                # 等锁期间同 key 的其他线程可能已构建完成
+                entry = _pool_get(pool_key)
+                if entry is None:
+                    try:
+                        md = self._build_markitdown()
+                        entry = (md, self.ocr_service)
+                        _pool_put(pool_key, entry, max(1, self.llm_config.markitdown_pool_max))
+                    finally:
+                        with _MARKITDOWN_POOL_LOCK:
+                            _MARKITDOWN_BUILDING.pop(pool_key, None)
+
+        self.ocr_service = entry[1]
+        return entry[0]
 
     def _resolve_options(
         self,
@@ -64,6 +184,8 @@ class MarkdownFileConverter:
             ocr_base_url=self.llm_config.ocr_base_url or self.llm_config.base_url,
             ocr_api_key=self.llm_config.ocr_api_key or self.llm_config.api_key,
             ocr_prompt=self.llm_config.ocr_prompt or None,
+            ocr_cache_path=self.llm_config.ocr_cache_path or None,
+            ocr_cache_max_entries=self.llm_config.ocr_cache_max_entries,
         )
         if options is None:
             return default_options
@@ -79,15 +201,24 @@ class MarkdownFileConverter:
             resolved = replace(resolved, ocr_api_key=default_options.ocr_api_key)
         if not resolved.ocr_prompt:
             resolved = replace(resolved, ocr_prompt=default_options.ocr_prompt)
+        if not resolved.ocr_cache_path:
+            resolved = replace(resolved, ocr_cache_path=default_options.ocr_cache_path)
+        if resolved.ocr_cache_max_entries is None:
+            resolved = replace(
+                resolved, ocr_cache_max_entries=default_options.ocr_cache_max_entries
+            )
         return resolved
 
     def _build_markitdown(self) -> MarkItDown:
+        from markitdown import MarkItDown
+
         if not self.opt.enable_ocr:
             return MarkItDown()
 
         self._ensure_ocr_dependencies()
         self._patch_docx_ocr_image_order()
         llm_client = self._build_ocr_client()
+        self.ocr_service = self._build_ocr_service(llm_client)
 
         kwargs: dict[str, Any] = {
             "enable_plugins": True,
@@ -100,6 +231,46 @@ class MarkdownFileConverter:
         logger.info("Initialize MarkItDown with OCR plugin enabled.")
         return MarkItDown(**kwargs)
 
+    def _build_ocr_service(self, llm_client: Any) -> Any:
+        """
+        自建 OCR service 并通过 convert kwargs 注入各 OCR converter：
+        缓存（按原图 hash）-> 本地预处理 -> VLM。
+        """
+        if not (self.opt.enable_ocr_cache or self.opt.enable_ocr_preprocess):
+            return None
+
+        try:
+            from markitdown_ocr._ocr_service import LLMVisionOCRService
+        except ImportError:
+            return None
+
+        model = self.opt.ocr_model_id or ""
+        service: Any = LLMVisionOCRService(
+            client=llm_client,
+            model=model,
+            default_prompt=self.opt.ocr_prompt,
+        )
+
+        cache_model = model
+        if self.opt.enable_ocr_preprocess:
+            preprocessor = OCRImagePreprocessor(self.opt.ocr_preprocess)
+            service = PreprocessedOCRService(service, preprocessor)
+            cache_model = f"{model}|{preprocessor.config.fingerprint()}"
+
+        if self.opt.enable_ocr_cache:
+            cache = get_ocr_cache(
+                self.opt.ocr_cache_path,
+                max_entries=self.opt.ocr_cache_max_entries or 0,
+            )
+            service = CachedOCRService(service, cache, model=cache_model)
+
+        return service
+
+    def _convert_kwargs(self) -> dict[str, Any]:
+        if self.ocr_service is None:
+            return {}
+        return {"ocr_service": self.ocr_service}
+
     def _patch_docx_ocr_image_order(self) -> None:
         global _DOCX_OCR_ORDER_PATCHED
 
@@ -189,15 +360,122 @@ class MarkdownFileConverter:
             timeout=self.llm_config.timeout,
         )
 
+    def estimate_memory(self, source: ConverterSource, *, filename: str | None = None) -> int:
+        """按文件类型 / 大小 / 是否 OCR 估算本次转换的内存占用（bytes）。"""
+        if isinstance(source, (str, Path)):
+            path = Path(source)
+            try:
+                size: Optional[int] = path.stat().st_size
+            except OSError:
+                size = None
+            suffix = path.suffix
+        else:
+            size = source_size(source)
+            suffix = Path(filename).suffix if filename else ""
+        return self.memory_model.estimate(size, suffix, ocr=bool(self.opt.enable_ocr))
+
     def convert(self, source: ConverterSource, *, filename: str | None = None) -> str:
+        if self.admission is None:
+            return self._convert_source(source, filename=filename)
+        with self.admission.admit(self.estimate_memory(source, filename=filename)):
+            return self._convert_source(source, filename=filename)
+
+    def _convert_source(self, source: ConverterSource, *, filename: str | None = None) -> str:
         if isinstance(source, (str, Path)):
             return self._convert_path(Path(source))
 
-        if isinstance(source, (bytes, bytearray)):
-            return self._convert_bytes(bytes(source), filename=filename)
+        if is_buffer_source(source) or is_stream_source(source):
+            return self._convert_binary(source, filename=filename)
 
         raise TypeError(f"Unsupported source type: {type(source)}")
 
+    def iter_convert(
+        self,
+        source: ConverterSource,
+        *,
+        filename: str | None = None,
+        pages_per_chunk: int = 5,
+        blocks_per_chunk: int = 50,
+    ) -> Iterator[str]:
+        """
+        渐进式转换：按文档顺序逐块产出 markdown，调用方可随时停止迭代。
+        - PDF（未启用 OCR）：按页块产出
+        - DOCX（docx_backend="native"）：按 body 块产出
+        - 其他格式：整篇转换后一次产出
+        准入额度在整个迭代期间保持占用，调用方提前停止迭代时释放。
+        """
+        if self.admission is None:
+            yield from self._iter_convert(
+                source,
+                filename=filename,
+                pages_per_chunk=pages_per_chunk,
+                blocks_per_chunk=blocks_per_chunk,
+            )
+            return
+        with self.admission.admit(self.estimate_memory(source, filename=filename)):
+            yield from self._iter_convert(
+                source,
+                filename=filename,
+                pages_per_chunk=pages_per_chunk,
+                blocks_per_chunk=blocks_per_chunk,
+            )
+
+    def _iter_convert(
+        self,
+        source: ConverterSource,
+        *,
+        filename: str | None,
+        pages_per_chunk: int,
+        blocks_per_chunk: int,
+    ) -> Iterator[str]:
+        if isinstance(source, (str, Path)):
+            path = Path(source)
+            suffix = path.suffix.lower()
+            if suffix in (".pdf", ".docx") and not path.exists():
+                raise FileNotFoundError(path)
+            if suffix == ".pdf" and not self.opt.enable_ocr:
+                yield from self._iter_pdf(path.read_bytes(), pages_per_chunk)
+                return
+            if suffix == ".docx" and self._use_native_docx():
+                yield from self._iter_docx(path, blocks_per_chunk)
+                return
+        elif is_buffer_source(source) or is_stream_source(source):
+            suffix = Path(filename).suffix.lower() if filename else ""
+            if suffix == ".pdf" and not self.opt.enable_ocr:
+                yield from self._iter_pdf(_read_all(source), pages_per_chunk)
+                return
+            if suffix == ".docx" and self._use_native_docx():
+                stream = open_source_stream(source)
+                start = stream.tell()
+                try:
+                    yield from self._iter_docx(stream, blocks_per_chunk)
+                finally:
+                    stream.seek(start)
+                    if is_buffer_source(source):
+                        stream.close()
+                return
+
+        yield self._convert_source(source, filename=filename)
+
+    def _iter_docx(self, source: Union[BinaryIO, Path], blocks_per_chunk: int) -> Iterator[str]:
+        buf: list[str] = []
+        for block in iter_docx_blocks(source):
+            buf.append(block)
+            if len(buf) >= max(1, blocks_per_chunk):
+                yield "\n\n".join(buf)
+                buf = []
+        if buf:
+            yield "\n\n".join(buf)
+
+    def _iter_pdf(self, pdf_bytes: bytes, pages_per_chunk: int) -> Iterator[str]:
+        for chunk in iter_pdf_chunks(
+            pdf_bytes, backend=self.opt.pdf_backend, pages_per_chunk=pages_per_chunk
+        ):
+            if self.opt.strip:
+                chunk = (chunk or "").strip()
+            if chunk:
+                yield chunk
+
     def _convert_path(self, path: Path) -> str:
         if not path.exists():
             raise FileNotFoundError(path)
@@ -210,7 +488,7 @@ class MarkdownFileConverter:
                 shutil.copy2(path, tmp_doc)
 
                 docx = self._convert_doc_to_docx(tmp_doc, outdir=tmpdir_p)
-                text = self._markitdown_file(docx)
+                text = self._convert_file(docx)
 
                 if self.opt.keep_converted_docx:
                     keep_path = path.with_suffix(".__converted__.docx")
@@ -218,22 +496,44 @@ class MarkdownFileConverter:
 
                 return self._post(text)
 
-        text = self._markitdown_file(path)
+        if suffix == ".pdf" and self._use_pdf_parallel():
+            return self._post(self._convert_pdf_parallel(path.read_bytes()))
+
+        text = self._convert_file(path)
         return self._post(text)
 
-    def _convert_bytes(self, file_bytes: bytes, *, filename: str | None = None) -> str:
-        if not file_bytes:
+    def _convert_binary(self, source: BinarySource, *, filename: str | None = None) -> str:
+        """
+        bytes / bytearray / memoryview / mmap / file-like：
+        缓冲区零拷贝包成只读流，直接交给 MarkItDown；转换后流位置复原，便于按需 OCR 再次转换。
+        """
+        if is_buffer_source(source) and memoryview(source).nbytes == 0:
             return ""
 
+        stream = open_source_stream(source)
+        start = stream.tell()
+        try:
+            if not stream.read(1):
+                return ""
+            stream.seek(start)
+            return self._convert_stream(stream, filename=filename)
+        finally:
+            stream.seek(start)
+            if is_buffer_source(source):
+                # 只关闭自己包的 reader（释放 memoryview，调用方才能 close mmap）
+                stream.close()
+
+    def _convert_stream(self, stream: BinaryIO, *, filename: str | None = None) -> str:
         suffix = Path(filename).suffix.lower() if filename else ""
         if suffix == ".doc":
             with tempfile.TemporaryDirectory() as tmpdir:
                 tmpdir_p = Path(tmpdir)
                 tmp_doc = tmpdir_p / "input.doc"
-                tmp_doc.write_bytes(file_bytes)
+                with tmp_doc.open("wb") as fh:
+                    shutil.copyfileobj(stream, fh, 1024 * 1024)
 
                 docx = self._convert_doc_to_docx(tmp_doc, outdir=tmpdir_p)
-                text = self._markitdown_file(docx)
+                text = self._convert_file(docx)
 
                 if self.opt.keep_converted_docx:
                     keep_path = tmpdir_p / "input.__converted__.docx"
@@ -241,12 +541,40 @@ class MarkdownFileConverter:
 
                 return self._post(text)
 
-        bio = BytesIO(file_bytes)
-        result = self.md.convert_stream(bio, file_extension=suffix or None)
+        if suffix == ".pdf" and self._use_pdf_parallel():
+            # 页块要分发到子进程，这里需要一份完整 bytes
+            return self._post(self._convert_pdf_parallel(_read_all(stream)))
+
+        if suffix == ".docx" and self._use_native_docx():
+            return self._post(docx_to_markdown(stream))
+
+        result = self.md.convert_stream(
+            stream, file_extension=suffix or None, **self._convert_kwargs()
+        )
         return self._post(self._extract_text(result))
 
+    def _use_pdf_parallel(self) -> bool:
+        return bool(self.opt.pdf_parallel) and not self.opt.enable_ocr
+
+    def _convert_pdf_parallel(self, pdf_bytes: bytes) -> str:
+        return convert_pdf_parallel(
+            pdf_bytes,
+            backend=self.opt.pdf_backend,
+            pages_per_chunk=self.opt.pdf_pages_per_chunk,
+            max_workers=self.opt.pdf_max_workers,
+            min_pages=self.opt.pdf_parallel_min_pages,
+        )
+
+    def _use_native_docx(self) -> bool:
+        return self.opt.docx_backend == "native" and not self.opt.enable_ocr
+
+    def _convert_file(self, path: Path) -> str:
+        if path.suffix.lower() == ".docx" and self._use_native_docx():
+            return docx_to_markdown(path)
+        return self._markitdown_file(path)
+
     def _markitdown_file(self, path: Path) -> str:
-        result = self.md.convert(str(path))
+        result = self.md.convert(str(path), **self._convert_kwargs())
         return self._extract_text(result)
 
     @staticmethod
@@ -286,3 +614,32 @@ class MarkdownFileConverter:
             raise FileNotFoundError(f"LibreOffice 未生成 docx 文件: {generated}")
 
         return generated
+
+
+def _pool_get(key: Tuple[Any, int]) -> Optional[Tuple[MarkItDown, Any]]:
+    with _MARKITDOWN_POOL_LOCK:
+        entry = _MARKITDOWN_POOL.get(key)
+        if entry is not None:
+            _MARKITDOWN_POOL.move_to_end(key)
+        return entry
+
+
+def _pool_put(key: Tuple[Any, int], entry: Tuple[MarkItDown, Any], max_entries: int) -> None:
+    with _MARKITDOWN_POOL_LOCK:
+        _MARKITDOWN_POOL[key] = entry
+        _MARKITDOWN_POOL.move_to_end(key)
+        # 被淘汰的实例不主动关闭：仍持有它的 converter 可继续使用，释放引用后随 GC 回收
+        while len(_MARKITDOWN_POOL) > max_entries:
+            _MARKITDOWN_POOL.popitem(last=False)
+        logger.debug("MarkItDown pool miss, size=%d", len(_MARKITDOWN_POOL))
+
+
+def converter_pool_size() -> int:
+    with _MARKITDOWN_POOL_LOCK:
+        return len(_MARKITDOWN_POOL)
+
+
+def clear_converter_pool() -> None:
+    """清空进程级 MarkItDown 池（配置热更新 / 测试隔离时使用）。"""
+    with _MARKITDOWN_POOL_LOCK:
+        _MARKITDOWN_POOL.clear()
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+_CACHES: Dict[str, "OCRResultCache"] = {}
+_CACHES_LOCK = threading.Lock()
+
+MEMORY_CACHE_PATH = ":memory:"
+
+
+def default_ocr_cache_path() -> Path:
+    """默认缓存文件：$XDG_CACHE_HOME（未设置时 ~/.cache）/fd_extractai/ocr.sqlite，跨进程 / 跨批次共享。"""
+    base = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base).expanduser() / "fd_extractai" / "ocr.sqlite"
+
+
+def make_ocr_result(text: str, *, backend: Optional[str] = None) -> Any:
+    """构造与 markitdown-ocr 兼容的 OCRResult（未安装时退化为 SimpleNamespace）。"""
+    try:
+        from markitdown_ocr._ocr_service import OCRResult
+    except ImportError:
+        from types import SimpleNamespace
+
+        return SimpleNamespace(text=text, confidence=None, backend_used=backend, error=None)
+    return OCRResult(text=text, backend_used=backend)
+
+
+class OCRResultCache:
+    """
+    跨文档 OCR 结果缓存（SQLite，LRU 淘汰）。
+    - key = sha256(图片内容) + OCR 模型 + prompt
+    - 同一 path 在进程内共享一个实例（见 get_ocr_cache），多进程通过同一 SQLite 文件共享
+    - path 为空时使用 default_ocr_cache_path()；显式传 ":memory:" 时只在当前进程内生效
+    """
+
+    def __init__(self, path: Optional[str | Path] = None, *, max_entries: int = 5000) -> None:
+        self.path = str(path) if path else str(default_ocr_cache_path())
+        self.max_entries = max(0, int(max_entries or 0))
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.RLock()
+        self._inflight: Dict[str, threading.Lock] = {}
+
+        if self.path != MEMORY_CACHE_PATH:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock:
+            if self.path != MEMORY_CACHE_PATH:
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_cache ("
+                " key TEXT PRIMARY KEY,"
+                " text TEXT NOT NULL,"
+                " backend TEXT,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_ocr_cache_last_access ON ocr_cache(last_access)"
+            )
+            conn.commit()
+        return conn
+
+    def _after_fork(self) -> None:
+        # fork 出的子进程不能复用父进程的锁 / SQLite 文件连接；:memory: 缓存随进程内存一起复制，保留即可
+        self._lock = threading.RLock()
+        self._inflight = {}
+        if self.path != MEMORY_CACHE_PATH:
+            self._conn = self._connect()
+
+    @staticmethod
+    def make_key(image_bytes: bytes, *, model: str = "", prompt: str = "") -> str:
+        h = hashlib.sha256()
+        h.update((model or "").encode("utf-8"))
+        h.update(b"\0")
+        h.update((prompt or "").encode("utf-8"))
+        h.update(b"\0")
+        h.update(hashlib.sha256(image_bytes).digest())
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, backend FROM ocr_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE ocr_cache SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return {"text": row[0], "backend": row[1]}
+
+    def put(self, key: str, text: str, *, backend: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr_cache(key, text, backend, last_access) VALUES (?, ?, ?, ?)",
+                (key, text or "", backend, time.time()),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        if not self.max_entries:
+            return
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM ocr_cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM ocr_cache WHERE key IN ("
+            " SELECT key FROM ocr_cache ORDER BY last_access ASC LIMIT ?)",
+            (overflow,),
+        )
+
+    def key_lock(self, key: str) -> threading.Lock:
+        """同一 key 的并发 OCR 串行化：后到的线程等待并直接读缓存。"""
+        with self._lock:
+            lock = self._inflight.get(key)
+            if lock is None:
+                lock = threading.Lock()
+                self._inflight[key] = lock
+            return lock
+
+    def release_key(self, key: str) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM ocr_cache").fetchone()
+            return int(count)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM ocr_cache")
+            self._conn.commit()
+
+
+def get_ocr_cache(path: Optional[str | Path] = None, *, max_entries: int = 5000) -> OCRResultCache:
+    """
+    按 path 返回进程内共享的 OCRResultCache，保证所有 converter 命中同一份缓存。
+    path 为空时用 default_ocr_cache_path()；默认目录不可写（只读容器等）时退回 ":memory:"。
+    """
+    cache_path = str(path) if path else str(default_ocr_cache_path())
+    if cache_path != MEMORY_CACHE_PATH:
+        cache_path = str(Path(cache_path).expanduser().resolve())
+
+    with _CACHES_LOCK:
+        cache = _CACHES.get(cache_path)
+        if cache is None:
+            try:
+                cache = OCRResultCache(cache_path, max_entries=max_entries)
+            except (OSError, sqlite3.Error) as e:
+                if path:
+                    raise
+                logger.warning("OCR cache %s unavailable, fallback to :memory: (%r)", cache_path, e)
+                cache = _CACHES.get(MEMORY_CACHE_PATH) or OCRResultCache(
+                    MEMORY_CACHE_PATH, max_entries=max_entries
+                )
+                _CACHES[MEMORY_CACHE_PATH] = cache
+            _CACHES[cache_path] = cache
+        elif max_entries and max_entries > cache.max_entries:
+            cache.max_entries = max_entries
+        return cache
+
+
+def _reset_caches_after_fork() -> None:
+    global _CACHES_LOCK
+    _CACHES_LOCK = threading.Lock()
+    for cache in list(_CACHES.values()):
+        cache._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_caches_after_fork)
+
+
+class CachedOCRService:
+    """
+    包装 markitdown-ocr 的 OCR service：
+    先按图片 hash 查缓存，未命中才真正调用 VLM；出错的结果不入缓存。
+    """
+
+    def __init__(
+        self,
+        inner: Any,
+        cache: OCRResultCache,
+        *,
+        model: str = "",
+        prompt: str = "",
+    ) -> None:
+        self.inner = inner
+        self.cache = cache
+        self.model = model or getattr(inner, "model", "") or ""
+        self.prompt = prompt or getattr(inner, "default_prompt", "") or ""
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.inner, name)
+
+    def extract_text(
+        self,
+        image_stream: BinaryIO,
+        prompt: Optional[str] = None,
+        stream_info: Any = None,
+        **kwargs: Any,
+    ) -> Any:
+        image_stream.seek(0)
+        image_bytes = image_stream.read()
+        image_stream.seek(0)
+
+        key = self.cache.make_key(image_bytes, model=self.model, prompt=prompt or self.prompt)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            return make_ocr_result(cached["text"], backend=cached.get("backend"))
+
+        lock = self.cache.key_lock(key)
+        with lock:
+            # 等锁期间可能已有其他线程写入
+            cached = self.cache.get(key)
+            if cached is not None:
+                return make_ocr_result(cached["text"], backend=cached.get("backend"))
+
+            try:
+                if stream_info is not None:
+                    result = self.inner.extract_text(
+                        image_stream, prompt=prompt, stream_info=stream_info, **kwargs
+                    )
+                else:
+                    result = self.inner.extract_text(image_stream, prompt=prompt, **kwargs)
+
+                if not getattr(result, "error", None):
+                    self.cache.put(
+                        key,
+                        (getattr(result, "text", "") or "").strip(),
+                        backend=getattr(result, "backend_used", None),
+                    )
+                else:
+                    logger.debug("OCR result not cached due to error: %s", result.error)
+                return result
+            finally:
+                self.cache.release_key(key)
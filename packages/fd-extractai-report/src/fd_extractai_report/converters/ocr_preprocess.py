@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Any, BinaryIO, Dict, Optional
+
+from fd_extractai_report.converters.ocr_cache import make_ocr_result
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OCRPreprocessConfig:
+    """
+    VLM 调用前的本地图片预处理参数：
+    - 过小 / 低熵 / 近空白的图片直接跳过（图标、分隔线、纯色底图）
+    - 过大的图片按模型有效输入分辨率缩放，并重新编码成更紧凑的格式
+    min_bytes 只对像素尺寸也小（长边 <= small_max_side）的图片生效：PNG / CCITT 压缩的高分辨率扫描件可能只有几 KB；
+    低熵判断不作用于 1-bit / 只有两种灰度的图片：黑白文字扫描件（证照、证书）熵天然很低。
+    """
+
+    min_bytes: int = 2048
+    small_max_side: int = 256
+    min_side: int = 32
+    min_entropy: float = 1.0
+    blank_stddev: float = 4.0
+    max_side: int = 1600
+    output_format: str = "JPEG"
+    jpeg_quality: int = 85
+
+    def fingerprint(self) -> str:
+        return (
+            f"pre:{self.min_bytes}:{self.small_max_side}:{self.min_side}:{self.min_entropy}:{self.blank_stddev}:"
+            f"{self.max_side}:{self.output_format}:{self.jpeg_quality}"
+        )
+
+
+@dataclass
+class PreparedImage:
+    data: Optional[bytes]
+    skipped: bool = False
+    reason: str = ""
+    resized: bool = False
+    reencoded: bool = False
+
+
+class OCRImagePreprocessor:
+    def __init__(self, config: Optional[OCRPreprocessConfig] = None) -> None:
+        self.config = config or OCRPreprocessConfig()
+        # 同一个 preprocessor 挂在池化的 OCR service 上，被多个转换线程共用
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "seen": 0,
+            "skipped": 0,
+            "resized": 0,
+            "reencoded": 0,
+            "bytes_in": 0,
+            "bytes_out": 0,
+        }
+
+    def prepare(self, image_bytes: bytes) -> PreparedImage:
+        cfg = self.config
+        self._count(seen=1, bytes_in=len(image_bytes or b""))
+
+        if not image_bytes:
+            return self._skip("too_small_bytes")
+
+        try:
+            from PIL import Image, ImageStat
+        except ImportError:
+            # 没有 Pillow 时无法判断像素尺寸，不做过滤，原图直接送 OCR
+            return self._keep(image_bytes)
+
+        try:
+            img = Image.open(BytesIO(image_bytes))
+            img.load()
+        except Exception as exc:
+            logger.debug("OCR preprocess: cannot decode image (%s), keep original", exc)
+            return self._keep(image_bytes)
+
+        width, height = img.size
+        if len(image_bytes) < cfg.min_bytes and max(width, height) <= cfg.small_max_side:
+            return self._skip("too_small_bytes")
+        if min(width, height) < cfg.min_side:
+            return self._skip("too_small_side")
+
+        gray = img.convert("L")
+        if cfg.blank_stddev > 0:
+            stddev = ImageStat.Stat(gray).stddev[0]
+            if stddev < cfg.blank_stddev:
+                return self._skip("near_blank")
+        bilevel = img.mode == "1" or sum(1 for n in gray.histogram() if n) <= 2
+        if cfg.min_entropy > 0 and not bilevel and gray.entropy() < cfg.min_entropy:
+            return self._skip("low_entropy")
+
+        resized = False
+        if cfg.max_side and max(width, height) > cfg.max_side:
+            # 1-bit 图先转灰度再缩放，保留笔画的抗锯齿
+            img = gray if img.mode == "1" else img.copy()
+            img.thumbnail((cfg.max_side, cfg.max_side), Image.LANCZOS)
+            resized = True
+
+        out = self._encode(img)
+        if not resized and len(out) >= len(image_bytes):
+            return self._keep(image_bytes)
+
+        self._count(resized=int(resized), reencoded=1, bytes_out=len(out))
+        return PreparedImage(data=out, resized=resized, reencoded=True)
+
+    def _encode(self, img: Any) -> bytes:
+        cfg = self.config
+        fmt = (cfg.output_format or "JPEG").upper()
+        buf = BytesIO()
+        if fmt in ("JPEG", "JPG"):
+            if img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            img.save(buf, format="JPEG", quality=cfg.jpeg_quality, optimize=True)
+        else:
+            img.save(buf, format=fmt, optimize=True)
+        return buf.getvalue()
+
+    def _count(self, **deltas: int) -> None:
+        with self._lock:
+            for k, v in deltas.items():
+                self.stats[k] += v
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+    def _skip(self, reason: str) -> PreparedImage:
+        self._count(skipped=1)
+        return PreparedImage(data=None, skipped=True, reason=reason)
+
+    def _keep(self, image_bytes: bytes) -> PreparedImage:
+        self._count(bytes_out=len(image_bytes))
+        return PreparedImage(data=image_bytes)
+
+
+class PreprocessedOCRService:
+    """
+    OCR service 包装：调用 VLM 前先做本地过滤 / 缩放 / 重编码。
+    被跳过的图片返回空文本（不带 error），各 OCR converter 会保留原图占位。
+    """
+
+    def __init__(self, inner: Any, preprocessor: OCRImagePreprocessor) -> None:
+        self.inner = inner
+        self.preprocessor = preprocessor
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.inner, name)
+
+    def fingerprint(self) -> str:
+        return self.preprocessor.config.fingerprint()
+
+    def extract_text(
+        self,
+        image_stream: BinaryIO,
+        prompt: Optional[str] = None,
+        stream_info: Any = None,
+        **kwargs: Any,
+    ) -> Any:
+        image_stream.seek(0)
+        image_bytes = image_stream.read()
+        image_stream.seek(0)
+
+        prepared = self.preprocessor.prepare(image_bytes)
+        if prepared.skipped:
+            logger.debug("OCR preprocess skip image: %s", prepared.reason)
+            return make_ocr_result("", backend="prefilter")
+
+        stream: BinaryIO = image_stream
+        if prepared.reencoded:
+            stream = BytesIO(prepared.data or b"")
+            # 原 mimetype 已不准确，交给 OCR service 重新识别
+            stream_info = None
+
+        if stream_info is not None:
+            return self.inner.extract_text(stream, prompt=prompt, stream_info=stream_info, **kwargs)
+        return self.inner.extract_text(stream, prompt=prompt, **kwargs)
+
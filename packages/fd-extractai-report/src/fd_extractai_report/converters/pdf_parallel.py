@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+_EXECUTORS: Dict[int, ProcessPoolExecutor] = {}
+_EXECUTORS_LOCK = threading.Lock()
+
+
+def _reset_executors_after_fork() -> None:
+    # 子进程不能复用父进程的进程池（管道与管理线程都不属于它）
+    global _EXECUTORS_LOCK, _WORKER_PDF
+    _EXECUTORS_LOCK = threading.Lock()
+    _EXECUTORS.clear()
+    _WORKER_PDF = (None, b"")
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_executors_after_fork)
+
+
+def catalog_page_count(document: Any) -> Optional[int]:
+    """读 pdfminer PDFDocument 的 catalog /Pages /Count，不遍历页树；缺失或损坏时返回 None。"""
+    from pdfminer.pdftypes import resolve1
+
+    try:
+        count = resolve1(resolve1(document.catalog["Pages"])["Count"])
+    except Exception:
+        return None
+    return count if isinstance(count, int) and count >= 0 else None
+
+
+class PdfTextBackend(ABC):
+    """PDF 文本抽取后端：按页范围 [start, end) 输出 markdown。"""
+
+    name: str = ""
+
+    def page_count(self, pdf_bytes: bytes) -> int:
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdfparser import PDFParser
+
+        count = catalog_page_count(PDFDocument(PDFParser(BytesIO(pdf_bytes))))
+        if count is not None:
+            return count
+        return sum(1 for _ in PDFPage.get_pages(BytesIO(pdf_bytes)))
+
+    @abstractmethod
+    def convert_pages(self, pdf_bytes: bytes, start: int, end: int) -> str:
+        ...
+
+
+class MarkItDownPdfBackend(PdfTextBackend):
+    """
+    与 MarkItDown 内置 PdfConverter 同口径：pdfplumber 识别表单/表格页，
+    纯文本页走 pdfminer；只是作用范围缩小到单个页块。
+    """
+
+    name = "markitdown"
+
+    def convert_pages(self, pdf_bytes: bytes, start: int, end: int) -> str:
+        import pdfminer.high_level
+        import pdfplumber
+        from markitdown.converters._pdf_converter import (
+            _extract_form_content_from_words,
+            _merge_partial_numbering_lines,
+        )
+
+        page_numbers = list(range(start, end))
+        chunks: List[str] = []
+        form_page_count = 0
+        try:
+            with pdfplumber.open(BytesIO(pdf_bytes), pages=[i + 1 for i in page_numbers]) as pdf:
+                for page in pdf.pages:
+                    content = _extract_form_content_from_words(page)
+                    if content is not None:
+                        form_page_count += 1
+                        if content.strip():
+                            chunks.append(content)
+                    else:
+                        text = page.extract_text()
+                        if text and text.strip():
+                            chunks.append(text.strip())
+                    page.close()
+
+            if form_page_count == 0:
+                markdown = pdfminer.high_level.extract_text(
+                    BytesIO(pdf_bytes), page_numbers=page_numbers
+                )
+            else:
+                markdown = "\n\n".join(chunks).strip()
+        except Exception:
+            markdown = pdfminer.high_level.extract_text(BytesIO(pdf_bytes), page_numbers=page_numbers)
+
+        return _merge_partial_numbering_lines(markdown or "")
+
+
+class PdfMinerBackend(PdfTextBackend):
+    name = "pdfminer"
+
+    def convert_pages(self, pdf_bytes: bytes, start: int, end: int) -> str:
+        import pdfminer.high_level
+
+        return pdfminer.high_level.extract_text(
+            BytesIO(pdf_bytes), page_numbers=list(range(start, end))
+        )
+
+
+class PyMuPDFBackend(PdfTextBackend):
+    """可选的快速后端（需要 pymupdf），用于和默认后端做基准对比。"""
+
+    name = "pymupdf"
+
+    @staticmethod
+    def _module():
+        try:
+            import pymupdf
+        except ImportError:
+            import fitz as pymupdf  # 旧版本只有 fitz 命名
+        return pymupdf
+
+    def page_count(self, pdf_bytes: bytes) -> int:
+        with self._module().open(stream=pdf_bytes, filetype="pdf") as doc:
+            return doc.page_count
+
+    def convert_pages(self, pdf_bytes: bytes, start: int, end: int) -> str:
+        parts: List[str] = []
+        with self._module().open(stream=pdf_bytes, filetype="pdf") as doc:
+            for i in range(start, min(end, doc.page_count)):
+                text = doc[i].get_text("text") or ""
+                if text.strip():
+                    parts.append(text.strip())
+        return "\n\n".join(parts)
+
+
+PDF_TEXT_BACKENDS: Dict[str, Callable[[], PdfTextBackend]] = {
+    MarkItDownPdfBackend.name: MarkItDownPdfBackend,
+    PdfMinerBackend.name: PdfMinerBackend,
+    PyMuPDFBackend.name: PyMuPDFBackend,
+}
+
+
+def register_pdf_backend(name: str, factory: Callable[[], PdfTextBackend]) -> None:
+    """注册自定义后端；factory 需可在子进程中按名字重建（模块级可 import）。"""
+    PDF_TEXT_BACKENDS[name] = factory
+
+
+def get_pdf_backend(name: str) -> PdfTextBackend:
+    factory = PDF_TEXT_BACKENDS.get(name)
+    if factory is None:
+        raise KeyError(f"Unknown PDF text backend: {name} (available={sorted(PDF_TEXT_BACKENDS)})")
+    return factory()
+
+
+# -------------------------
+# process pool
+# -------------------------
+# worker 侧：最近一次附加的共享 PDF（shm 名, bytes）；同一文档的后续页块不再读共享内存
+_WORKER_PDF: Tuple[Optional[str], bytes] = (None, b"")
+
+
+def get_pdf_executor(workers: int) -> ProcessPoolExecutor:
+    """进程内按 workers 共享的 PDF 转换进程池，首次使用时创建（进程启动只付一次）。"""
+    with _EXECUTORS_LOCK:
+        ex = _EXECUTORS.get(workers)
+        if ex is None:
+            # 先拉起 resource tracker，worker 继承同一个 tracker：worker 附加 shm 时不会把段提前 unlink
+            resource_tracker.ensure_running()
+            ex = ProcessPoolExecutor(max_workers=workers)
+            _EXECUTORS[workers] = ex
+        return ex
+
+
+def _discard_pdf_executor(workers: int, ex: ProcessPoolExecutor) -> None:
+    with _EXECUTORS_LOCK:
+        if _EXECUTORS.get(workers) is ex:
+            del _EXECUTORS[workers]
+    ex.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pdf_executors() -> None:
+    with _EXECUTORS_LOCK:
+        executors = list(_EXECUTORS.values())
+        _EXECUTORS.clear()
+    for ex in executors:
+        ex.shutdown(wait=True, cancel_futures=True)
+
+
+def _attach_pdf(name: str, size: int) -> bytes:
+    global _WORKER_PDF
+    cached_name, data = _WORKER_PDF
+    if cached_name == name:
+        return data
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        data = bytes(shm.buf[:size])
+    finally:
+        shm.close()
+    _WORKER_PDF = (name, data)
+    return data
+
+
+def _convert_chunk(backend_name: str, shm_name: str, size: int, start: int, end: int) -> Tuple[int, str]:
+    backend = get_pdf_backend(backend_name)
+    return start, backend.convert_pages(_attach_pdf(shm_name, size), start, end)
+
+
+def split_page_ranges(page_count: int, pages_per_chunk: int) -> List[Tuple[int, int]]:
+    size = max(1, int(pages_per_chunk or 1))
+    return [(s, min(page_count, s + size)) for s in range(0, page_count, size)]
+
+
+def convert_pdf_parallel(
+    pdf_bytes: bytes,
+    *,
+    backend: str = MarkItDownPdfBackend.name,
+    pages_per_chunk: int = 20,
+    max_workers: int = 0,
+    min_pages: int = 0,
+) -> str:
+    """
+    按页范围切块、进程池并行抽取，再按页序拼回 markdown。
+    页数 < min_pages 或只有一个页块时在当前进程内串行执行；daemonic 进程（如 prefork worker）不能创建子进程，也走串行。
+    进程池按 workers 在进程内复用；PDF bytes 放进共享内存，每个 worker 每个文档只读一次，不随任务 pickle。
+    进程池损坏（worker 被杀）时丢弃该池并退回串行。
+    """
+    if not pdf_bytes:
+        return ""
+
+    impl = get_pdf_backend(backend)
+    page_count = impl.page_count(pdf_bytes)
+    if page_count <= 0:
+        return ""
+
+    ranges = split_page_ranges(page_count, pages_per_chunk)
+    # 池大小不随页块数变化，保证不同文档复用同一个进程池
+    workers = max_workers or os.cpu_count() or 1
+
+    if (
+        len(ranges) == 1
+        or workers <= 1
+        or page_count < min_pages
+        or multiprocessing.current_process().daemon
+    ):
+        parts = [impl.convert_pages(pdf_bytes, s, e) for s, e in ranges]
+    else:
+        logger.debug(
+            "PDF parallel convert pages=%d chunks=%d workers=%d backend=%s",
+            page_count,
+            len(ranges),
+            workers,
+            backend,
+        )
+        parts = _convert_ranges_parallel(pdf_bytes, impl, backend, ranges, workers)
+
+    return "\n\n".join(p.strip() for p in parts if p and p.strip())
+
+
+def _convert_ranges_parallel(
+    pdf_bytes: bytes,
+    impl: PdfTextBackend,
+    backend: str,
+    ranges: List[Tuple[int, int]],
+    workers: int,
+) -> List[str]:
+    ex = get_pdf_executor(workers)
+    shm = shared_memory.SharedMemory(create=True, size=len(pdf_bytes))
+    try:
+        shm.buf[: len(pdf_bytes)] = pdf_bytes
+        try:
+            futures = [ex.submit(_convert_chunk, backend, shm.name, len(pdf_bytes), s, e) for s, e in ranges]
+            by_start = dict(f.result() for f in futures)
+        except BrokenProcessPool as exc:
+            logger.warning("PDF process pool broken, fallback to serial (%r)", exc)
+            _discard_pdf_executor(workers, ex)
+            return [impl.convert_pages(pdf_bytes, s, e) for s, e in ranges]
+    finally:
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+    return [by_start[s] for s, _ in ranges]
+
+
+def iter_pdf_chunks(
+    pdf_bytes: bytes,
+    *,
+    backend: str = MarkItDownPdfBackend.name,
+    pages_per_chunk: int = 5,
+) -> Iterator[str]:
+    """按页块串行产出 markdown，供渐进式转换在满足条件后提前停止。"""
+    if not pdf_bytes:
+        return
+
+    impl = get_pdf_backend(backend)
+    for start, end in split_page_ranges(impl.page_count(pdf_bytes), pages_per_chunk):
+        yield impl.convert_pages(pdf_bytes, start, end)
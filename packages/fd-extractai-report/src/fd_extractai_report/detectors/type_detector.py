@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 import re
 from dataclasses import dataclass
 from typing import Dict, List, Tuple
@@ -142,6 +143,17 @@ class ReportTypeDetector(BaseDetector):
     def __init__(self, config: ReportTypeDetectorConfig | None = None) -> None:
         self.config = config or ReportTypeDetectorConfig()
 
+    def fingerprint(self) -> str:
+        """配置 + 强特征正则 + 关键词权重表的指纹；任一变化识别结果都可能不同（产物缓存据此失效）。"""
+        raw = repr(
+            (
+                self.config,
+                [(rt, pat.pattern, w) for rt, pat, w in _STRONG_PATTERNS],
+                sorted((rt, tuple(hints)) for rt, hints in _HINTS.items()),
+            )
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
     def detect(self, text: str, **kwargs) -> DetectionResult:
         head_chars = int(kwargs.get("head_chars") or self.config.head_chars)
         head = _normalize_head((text or "")[:head_chars])
@@ -1,16 +1,16 @@
 from __future__ import annotations
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence
-
-import langextract as lx
-from langextract.core import data
-from langextract.providers.openai import OpenAILanguageModel
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
 
 from fd_extractai_report.settings import CONFIG, LLMConfig
 from fd_extractai_report.context import ReportContext
 from fd_extractai_report.rules.extracting.schema import ExtractorSpec
 
+if TYPE_CHECKING:
+    from langextract.core import data
+    from langextract.providers.openai import OpenAILanguageModel
+
 
 PROMPTS_DIR = Path(__file__).resolve().parents[1] / "prompts"
 
@@ -88,6 +88,8 @@ class Extractor:
         return (PROMPTS_DIR / self.prompt_filename).read_text(encoding="utf-8")
 
     def build_language_model(self) -> OpenAILanguageModel:
+        from langextract.providers.openai import OpenAILanguageModel
+
         return OpenAILanguageModel(
             base_url=self.base_url,
             api_key=self.api_key,
@@ -95,6 +97,10 @@ class Extractor:
         )
 
     def run_langextract(self, text: str, *, context: ReportContext):
+        # langextract（及 pandas / IPython 等依赖）只在真正抽取时导入
+        import langextract as lx
+        from langextract.providers.openai import OpenAILanguageModel
+
         prompt = self.load_prompt()
         language_model = self.build_language_model()
         isolated_text = f"<actual_document>\n{text}\n</actual_document>"
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-from dataclasses import replace
-from typing import Dict, List, Optional
+import hashlib
+import json
+from dataclasses import asdict, is_dataclass, replace
+from typing import Any, Dict, List, Optional
 
-from langextract.core import data as lxdata
 from fd_extractai_report.context import ReportContext
 from fd_extractai_report.extractors.base import Extractor
 from fd_extractai_report.rules.extracting.registry import get_ruleset
@@ -18,11 +19,25 @@ class RuleEngineExtractorRunner:
         self.base_url = base_url
         self.api_key = api_key  
 
-    def run(self, context: ReportContext, *, override: Optional[ExtractRuleSet] = None) -> Dict[str, List[dict]]:
+    def run(
+        self,
+        context: ReportContext,
+        *,
+        override: Optional[ExtractRuleSet] = None,
+        checkpoint: Optional[Any] = None,
+    ) -> Dict[str, List[dict]]:
+        """
+        checkpoint：可选的断点对象（lookup(slug, input_hash) / record(slug, input_hash, rows)），
+        输入未变的 spec 直接复用已记录的结果，不再调用 LLM。
+        """
         rt = (context.metadata or {}).get("report_type") or "house"
         rs = get_ruleset(rt, override=override)
 
         results: Dict[str, List[dict]] = {}
+        if not rs.extractors:
+            return results
+
+        from langextract.core import data as lxdata
 
         for i, spec in enumerate(rs.extractors):
             if not spec.enabled:
@@ -55,16 +70,58 @@ class RuleEngineExtractorRunner:
                     f"chars={len(text)} policy={merged.missing_slice_policy}"
                 )
 
+            out_key = merged.output_key or merged.slug
+            input_hash = None
+            if checkpoint is not None:
+                input_hash = self._input_hash(merged, ex, context)
+                cached = checkpoint.lookup(merged.slug, input_hash)
+                if cached is not None:
+                    if self.debug:
+                        print(f"[Extract][RESUME] slug={merged.slug} rows={len(cached)}")
+                    results[out_key] = cached
+                    continue
+
             rows = ex(context) or []
 
             if self.debug:
                 print(f"[Extract][DONE]  slug={merged.slug} rows={len(rows)}")
 
-            out_key = merged.output_key or merged.slug
+            if checkpoint is not None:
+                checkpoint.record(merged.slug, input_hash, rows)
             results[out_key] = rows
 
         return results
 
+    def _input_hash(self, spec: ExtractorSpec, ex: Extractor, context: ReportContext) -> str:
+        """
+        spec 的输入指纹：模型 + prompt 内容 + 合并后的 spec（few-shot 示例、默认值、输入切片 / 截断 / 标题设置）
+        + 分块参数 + 注入字段 + 输入文本，任一变化都视为需要重跑。
+        """
+        meta = context.metadata or {}
+        payload = json.dumps(
+            [
+                spec.slug,
+                self.model_id,
+                ex.load_prompt(),
+                {
+                    "input_slice_keys": list(spec.input_slice_keys or []),
+                    "missing_slice_policy": spec.missing_slice_policy,
+                    "add_titles": spec.add_titles,
+                    "max_input_chars": spec.max_input_chars,
+                    "defaults": _plain(spec.defaults),
+                    "examples": _plain(spec.examples),
+                },
+                _plain(ex.examples),
+                [ex.max_char_buffer, ex.num_ctx],
+                {f: meta.get(f) for f in (spec.inject_context_fields or [])},
+                ex.get_input_text(context),
+            ],
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
     def _inherit_ruleset_defaults(self, spec: ExtractorSpec, rs: ExtractRuleSet) -> ExtractorSpec:
         inject = list(rs.inject_context_fields or [])
         for f in (spec.inject_context_fields or []):
@@ -75,4 +132,15 @@ class RuleEngineExtractorRunner:
         if rs.max_input_chars is not None:
             max_chars = rs.max_input_chars
 
-        return replace(spec, inject_context_fields=inject, max_input_chars=max_chars)
\ No newline at end of file
+        return replace(spec, inject_context_fields=inject, max_input_chars=max_chars)
+
+
+def _plain(obj: Any) -> Any:
+    """把 ExampleData 等 dataclass 展开成可稳定序列化的 dict / list。"""
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+    if isinstance(obj, dict):
+        return {str(k): _plain(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_plain(v) for v in obj]
+    return obj
@@ -0,0 +1,224 @@
+"""
+按文档 / 按阶段的内存统计：
+- RSS：阶段前后的常驻内存，以及阶段内峰值（Linux 下通过 /proc/self/clear_refs 重置 VmHWM）
+- tracemalloc（可选）：每个阶段新增分配最多的代码位置
+用于长跑 worker 定位“哪个阶段在涨内存”，也作为 worker 回收的依据。
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tracemalloc
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from fd_extractai_report.pipeline import StageObserver, StageScope
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+
+_PROC_STATUS = "/proc/self/status"
+_PROC_CLEAR_REFS = "/proc/self/clear_refs"
+
+
+def _read_status_kb(field_name: str) -> Optional[int]:
+    try:
+        with open(_PROC_STATUS, "r", encoding="ascii") as fh:
+            for line in fh:
+                if line.startswith(field_name + ":"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return None
+
+
+def current_rss() -> Optional[int]:
+    """当前 RSS（bytes）；非 Linux 返回 None。"""
+    kb = _read_status_kb("VmRSS")
+    return kb * 1024 if kb is not None else None
+
+
+def peak_rss() -> int:
+    """峰值 RSS（bytes）：优先 VmHWM（可被 reset_peak_rss 重置），否则进程生命周期峰值。"""
+    kb = _read_status_kb("VmHWM")
+    if kb is not None:
+        return kb * 1024
+    if resource is None:
+        return 0
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 单位是 bytes，Linux 是 KB
+    return int(maxrss if sys.platform == "darwin" else maxrss * 1024)
+
+
+def reset_peak_rss() -> bool:
+    """重置 VmHWM（Linux >= 4.0）；不支持时返回 False，峰值退化为进程生命周期峰值。"""
+    try:
+        with open(_PROC_CLEAR_REFS, "w", encoding="ascii") as fh:
+            fh.write("5")
+        return True
+    except OSError:
+        return False
+
+
+@dataclass
+class StageMemory:
+    stage: str
+    rss_before: Optional[int] = None
+    rss_after: Optional[int] = None
+    peak_rss: Optional[int] = None
+    # tracemalloc：(位置, 新增 bytes, 新增块数)
+    top_allocations: List[tuple] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def rss_delta(self) -> Optional[int]:
+        if self.rss_before is None or self.rss_after is None:
+            return None
+        return self.rss_after - self.rss_before
+
+
+@dataclass
+class DocumentMemoryRecord:
+    doc_id: str
+    pid: int = field(default_factory=os.getpid)
+    rss_start: Optional[int] = None
+    rss_end: Optional[int] = None
+    peak_rss: Optional[int] = None
+    stages: List[StageMemory] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        for st, raw in zip(self.stages, data["stages"]):
+            raw["rss_delta"] = st.rss_delta
+        return data
+
+
+class MemoryStageObserver(StageObserver):
+    """
+    挂到 ReportPipeline.stage_observers 上：
+        obs.begin_document(doc_id); pipe.run(...); record = obs.end_document()
+    tracemalloc_top > 0 时开启 tracemalloc（有明显开销，建议只在排查时打开）。
+    """
+
+    def __init__(
+        self,
+        *,
+        tracemalloc_top: int = 0,
+        tracemalloc_frames: int = 1,
+        keep_records: bool = True,
+    ) -> None:
+        self.tracemalloc_top = max(0, int(tracemalloc_top or 0))
+        self.tracemalloc_frames = max(1, int(tracemalloc_frames or 1))
+        self.keep_records = keep_records
+        self.records: List[DocumentMemoryRecord] = []
+
+        self._current: Optional[DocumentMemoryRecord] = None
+        self._stage: Optional[StageMemory] = None
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._peak_resettable = True
+
+        if self.tracemalloc_top and not tracemalloc.is_tracing():
+            tracemalloc.start(self.tracemalloc_frames)
+
+    # -------------------------
+    # document boundary
+    # -------------------------
+    def begin_document(self, doc_id: str) -> None:
+        self._peak_resettable = reset_peak_rss()
+        self._current = DocumentMemoryRecord(doc_id=str(doc_id), rss_start=current_rss())
+
+    def end_document(self) -> Optional[DocumentMemoryRecord]:
+        rec = self._current
+        self._current = None
+        if rec is None:
+            return None
+        rec.rss_end = current_rss()
+        peaks = [s.peak_rss for s in rec.stages if s.peak_rss is not None]
+        rec.peak_rss = max(peaks) if peaks else peak_rss()
+        if self.keep_records:
+            self.records.append(rec)
+        return rec
+
+    # -------------------------
+    # StageObserver
+    # -------------------------
+    def on_stage_start(self, scope: StageScope) -> None:
+        if self._current is None:
+            return
+        if self._peak_resettable:
+            self._peak_resettable = reset_peak_rss()
+        self._stage = StageMemory(stage=scope.stage, rss_before=current_rss())
+        if self.tracemalloc_top and tracemalloc.is_tracing():
+            self._snapshot = tracemalloc.take_snapshot()
+
+    def on_stage_end(self, scope: StageScope, error: Optional[BaseException] = None) -> None:
+        st = self._stage
+        if self._current is None or st is None:
+            return
+        st.rss_after = current_rss()
+        st.peak_rss = peak_rss()
+        if error is not None:
+            st.error = f"{type(error).__name__}: {error}"
+
+        if self._snapshot is not None and tracemalloc.is_tracing():
+            after = tracemalloc.take_snapshot()
+            diff = after.compare_to(self._snapshot, "lineno")
+            st.top_allocations = [
+                (str(d.traceback[0]), d.size_diff, d.count_diff)
+                for d in diff[: self.tracemalloc_top]
+                if d.size_diff > 0
+            ]
+            self._snapshot = None
+
+        self._current.stages.append(st)
+        self._stage = None
+
+
+def summarize_records(records: List[DocumentMemoryRecord], *, top: int = 10) -> Dict[str, Any]:
+    """
+    按阶段汇总：平均 / 最大 RSS 增量、最大峰值，以及跨文档累计增长最多的分配位置。
+    rss_delta 持续为正的阶段通常就是泄漏点。
+    """
+    deltas: Dict[str, List[int]] = defaultdict(list)
+    peaks: Dict[str, int] = defaultdict(int)
+    allocs: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    for rec in records:
+        for st in rec.stages:
+            if st.rss_delta is not None:
+                deltas[st.stage].append(st.rss_delta)
+            if st.peak_rss is not None:
+                peaks[st.stage] = max(peaks[st.stage], st.peak_rss)
+            for where, size, _count in st.top_allocations:
+                allocs[st.stage][where] += size
+
+    stages: Dict[str, Any] = {}
+    for stage in sorted(set(deltas) | set(peaks) | set(allocs)):
+        ds = deltas.get(stage) or []
+        stages[stage] = {
+            "docs": len(ds),
+            "rss_delta_total": sum(ds),
+            "rss_delta_mean": (sum(ds) / len(ds)) if ds else 0,
+            "rss_delta_max": max(ds) if ds else 0,
+            "peak_rss_max": peaks.get(stage, 0),
+            "top_allocations": sorted(
+                allocs.get(stage, {}).items(), key=lambda kv: kv[1], reverse=True
+            )[:top],
+        }
+
+    rss_growth = [
+        rec.rss_end - rec.rss_start
+        for rec in records
+        if rec.rss_start is not None and rec.rss_end is not None
+    ]
+    return {
+        "documents": len(records),
+        "rss_growth_total": sum(rss_growth),
+        "peak_rss_max": max((r.peak_rss or 0 for r in records), default=0),
+        "stages": stages,
+    }
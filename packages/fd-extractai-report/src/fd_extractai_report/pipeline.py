@@ -1,20 +1,44 @@
 from __future__ import annotations
 
 import json
+import logging
+import re
+import signal
+import threading
 import time
-from dataclasses import dataclass, field
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence, Literal
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Literal
 
+from fd_extractai_report.sections.parallel import ParallelSlicing
 from fd_extractai_report.sections.rule_engine_slicer import RuleEngineSlicer
 from fd_extractai_report.extractors.rule_engine_extractor import (
     RuleEngineExtractorRunner,
 )
 from fd_extractai_report.rules.extracting.schema import ExtractRuleSet
+from fd_extractai_report.rules.extracting.registry import (
+    get_ruleset as get_extract_ruleset,
+)
+from fd_extractai_report.rules.slicing.registry import get_ruleset as get_slice_ruleset
 from fd_extractai_report.context import ReportContext, ReportSection
 from fd_extractai_report.detectors import ReportTypeDetector, BaseDetector
-from fd_extractai_report.converters.markdown_converter import MarkdownFileConverter
+from fd_extractai_report.converters.input_stream import (
+    BinarySource,
+    ensure_seekable,
+    source_digest,
+    source_size,
+)
+from fd_extractai_report.converters.markdown_converter import (
+    MarkdownConvertOptions,
+    MarkdownFileConverter,
+)
 from fd_extractai_report.settings import CONFIG, LLMConfig
+
+if TYPE_CHECKING:
+    from fd_extractai_report.artifacts import ArtifactStore
+
+logger = logging.getLogger(__name__)
 # ⚠️ 注意：不要在这里 import 旧 slicer/extractor。
 # 你现在的主线是 ruleset + RuleEngineSlicer / RuleEngineExtractorRunner。
 # 旧类如果保留，也应该在 _build_default_components() 内部按需惰性 import。
@@ -32,6 +56,39 @@ class PipelineResult:
     warnings: List[str] = field(default_factory=list)
 
 
+@dataclass
+class _StopProbe:
+    """
+    load_progressive 的停止判定状态：类型只在累积到 head_chars 时识别一次；
+    之后只在新块命中所需切片的锚点、或累积长度比上次判定翻倍时才重新切片，且最多 max_checks 次，
+    总的重切成本是 O(文档长度)，而不是 O(块数 × 长度)。
+    """
+
+    report_type: Optional[str] = None
+    required: List[str] = field(default_factory=list)
+    anchors: List["re.Pattern[str]"] = field(default_factory=list)
+    enabled: bool = True
+    max_checks: int = 8
+    checks: int = 0
+    checked_len: int = 0
+
+    def should_check(self, chunk: str, total_len: int) -> bool:
+        if not self.enabled:
+            return False
+        if self.checks >= self.max_checks:
+            self.enabled = False
+            return False
+        return (
+            self.checks == 0
+            or total_len >= 2 * self.checked_len
+            or any(p.search(chunk) for p in self.anchors)
+        )
+
+    def mark_checked(self, total_len: int) -> None:
+        self.checks += 1
+        self.checked_len = total_len
+
+
 # ============================================================
 # Benchmark
 # ============================================================
@@ -42,7 +99,18 @@ class BenchmarkEvaluator:
         self.benchmark_dir = (
             benchmark_dir or Path(__file__).resolve().parents[1] / "benchmarks"
         )
-        self.benchmarks = self._load_benchmarks()
+        self._benchmarks: Optional[List[dict]] = None
+
+    @property
+    def benchmarks(self) -> List[dict]:
+        # 只有真正跑 benchmark 时才读取 JSON
+        if self._benchmarks is None:
+            self._benchmarks = self._load_benchmarks()
+        return self._benchmarks
+
+    @benchmarks.setter
+    def benchmarks(self, value: List[dict]) -> None:
+        self._benchmarks = list(value or [])
 
     def _load_benchmarks(self) -> List[dict]:
         benches: List[dict] = []
@@ -117,11 +185,114 @@ class BaseValidator:
         return []
 
 
+# ============================================================
+# Stage observers
+# ============================================================
+
+
+@dataclass
+class StageScope:
+    """
+    单个阶段的作用域。
+    - result：阶段产出（extract 的 outputs、validate 的 warnings 等），run* 在阶段结束前写入
+    - skip：observer 在 on_stage_start 里置 True 并给出 result，run* 直接采用 result、不执行该阶段
+    - options：observer 给该阶段 step_* 追加的关键字参数（如 extract 的 checkpoint）
+    """
+
+    stage: str
+    context: Optional[ReportContext] = None
+    result: Any = None
+    skip: bool = False
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+class StageBudgetExceeded(BaseException):
+    """
+    阶段耗时超过 ReportPipeline.stage_budgets 中的预算（仅在开启抢占时抛出）。
+    与 KeyboardInterrupt 一样继承 BaseException：抽取器 / converter 里的 except Exception 吞不掉它，
+    抢占能一直传到阶段边界。
+    """
+
+    def __init__(self, stage: str, budget: float, elapsed: float) -> None:
+        super().__init__(f"stage '{stage}' exceeded budget {budget:.1f}s (elapsed {elapsed:.1f}s)")
+        self.stage = stage
+        self.budget = budget
+        self.elapsed = elapsed
+
+    def __reduce__(self) -> Any:
+        # 跨进程（prefork worker -> 父进程）传递时保留字段
+        return (type(self), (self.stage, self.budget, self.elapsed))
+
+
+def _alarm_available() -> bool:
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+@contextmanager
+def _stage_deadline(
+    stage: str,
+    budget: Optional[float],
+    *,
+    preempt: bool = False,
+    context: Optional[ReportContext] = None,
+) -> Iterator[None]:
+    """
+    阶段预算：
+    - preempt=True 且在主线程（prefork worker 显式开启）：SIGALRM 到点抛 StageBudgetExceeded，
+      纯 Python 代码会被立即打断；会占用进程的 SIGALRM / ITIMER_REAL，所以默认关闭
+    - 其他情况不抢占：阶段照常跑完、结果保留，超时只记日志和 context.metadata["stage_overruns"]
+    """
+    if not budget or budget <= 0:
+        yield
+        return
+
+    t0 = time.monotonic()
+    armed = preempt and _alarm_available()
+    prev_handler: Any = None
+    if armed:
+
+        def _on_alarm(signum: int, frame: Any) -> None:
+            raise StageBudgetExceeded(stage, budget, time.monotonic() - t0)
+
+        prev_handler = signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, budget)
+    try:
+        yield
+    finally:
+        if armed:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, prev_handler)
+
+    elapsed = time.monotonic() - t0
+    if elapsed > budget and not armed:
+        logger.warning("stage '%s' exceeded budget %.1fs (elapsed %.1fs)", stage, budget, elapsed)
+        if context is not None:
+            overruns = list(context.metadata.get("stage_overruns") or [])
+            overruns.append({"stage": stage, "budget": budget, "elapsed": round(elapsed, 3)})
+            context.set_metadata(stage_overruns=overruns)
+
+
+class StageObserver:
+    """
+    阶段钩子：run* 在每个阶段（load / detect / slice / ocr_fallback / extract / validate / benchmark）
+    前后调用，用于内存 / 耗时统计、产物落盘、断点续跑等横切逻辑；默认实现什么都不做。
+    挂在 pipeline.stage_observers 上对所有运行生效；只属于单次运行的 observer 用 run(observers=...) 传入，
+    共享 pipeline 被多线程同时 run 时互不影响。
+    """
+
+    def on_stage_start(self, scope: StageScope) -> None:
+        pass
+
+    def on_stage_end(self, scope: StageScope, error: Optional[BaseException] = None) -> None:
+        pass
+
+
 # ============================================================
 # Pipeline
 # ============================================================
 
 RunStage = Literal["load", "detect", "slice", "extract", "validate", "benchmark", "all"]
+ResumeStage = Literal["detect", "slice", "extract"]
 
 
 class ReportPipeline:
@@ -133,6 +304,9 @@ class ReportPipeline:
       outputs = pipe.step_extract(...)  # 可空
 
     重要：如果你传 slicers=[] / extractors=[]，绝对不能因为默认 import 而崩。
+
+    线程安全：构造后实例只读，单次运行的 debug / override / context 都走参数，
+    同一个 pipeline 可被多个线程同时 run（惰性构建的 OCR converter 有锁保护）。
     """
 
     def __init__(
@@ -148,10 +322,25 @@ class ReportPipeline:
         model_id: Optional[str] = None,
         base_url: Optional[str] = None,
         api_key: Optional[str] = None,
+        ocr_on_demand: Optional[bool] = None,
+        stage_budgets: Optional[Dict[str, float]] = None,
+        artifact_store: Optional["ArtifactStore"] = None,
         debug: bool = False,
     ) -> None:
         cfg = llm_config or CONFIG
+        self.llm_config = cfg
 
+        # 按需 OCR：主 converter 只做纯文本转换，OCR converter 在切片缺失时才惰性构建
+        self.ocr_on_demand = (
+            cfg.ocr_on_demand if ocr_on_demand is None else ocr_on_demand
+        )
+        self._ocr_converter: Optional[MarkdownFileConverter] = None
+        self._ocr_converter_lock = threading.Lock()
+
+        if converter is None and self.ocr_on_demand:
+            converter = MarkdownFileConverter(
+                MarkdownConvertOptions(enable_ocr=False), llm_config=cfg
+            )
         self.converter = converter or MarkdownFileConverter(llm_config=cfg)
         self.type_detector = type_detector or ReportTypeDetector()
         self.evaluator = evaluator or BenchmarkEvaluator()
@@ -162,7 +351,18 @@ class ReportPipeline:
         self.api_key = api_key if api_key is not None else cfg.api_key
 
         self.default_debug = debug
-        self.debug = debug
+        self.stage_observers: List[StageObserver] = []
+        # 各阶段耗时预算（秒）；为空表示不限制。默认只记录超时（metadata.stage_overruns），
+        # stage_budget_preempt=True 时用 SIGALRM 抢占并抛 StageBudgetExceeded（只应由独占进程的调用方开启，如 prefork worker）
+        self.stage_budgets: Dict[str, float] = dict(stage_budgets or {})
+        self.stage_budget_preempt = False
+
+        # 阶段产物存储：load / detect / slice 结束时落盘，run_from 从产物恢复
+        self.artifact_store = artifact_store
+        if artifact_store is not None:
+            from fd_extractai_report.artifacts import ArtifactRecorder
+
+            self.stage_observers.append(ArtifactRecorder(artifact_store, self))
 
         self.slicers = list(slicers) if slicers is not None else []
         self.extractor_runner = extractor_runner
@@ -170,14 +370,58 @@ class ReportPipeline:
         if slicers is None and extractor_runner is None:
             self.slicers, self.extractor_runner = self._build_default_components()
 
+    @property
+    def debug(self) -> bool:
+        """构造时的默认 debug；单次运行用 run(debug=...) 覆盖，不修改实例。"""
+        return self.default_debug
+
     def _log(self, msg: str, debug) -> None:
         if debug:
             print(msg)
 
+    @contextmanager
+    def _stage(
+        self,
+        stage: str,
+        context: Optional[ReportContext] = None,
+        observers: Sequence[StageObserver] = (),
+    ) -> Iterator[StageScope]:
+        scope = StageScope(stage=stage, context=context)
+        budget = self.stage_budgets.get(stage) if self.stage_budgets else None
+        all_observers = [*self.stage_observers, *observers] if observers else self.stage_observers
+        if not all_observers and not budget:
+            yield scope
+            return
+
+        for obs in all_observers:
+            obs.on_stage_start(scope)
+        try:
+            if scope.skip:
+                yield scope
+            else:
+                with _stage_deadline(stage, budget, preempt=self.stage_budget_preempt, context=scope.context):
+                    yield scope
+        except BaseException as e:
+            for obs in all_observers:
+                obs.on_stage_end(scope, e)
+            raise
+        for obs in all_observers:
+            obs.on_stage_end(scope)
+
     def _build_default_components(self) -> tuple[list[Any], Optional[Any]]:
         try:
+            cfg = self.llm_config
+            parallel = (
+                ParallelSlicing(workers=cfg.slice_workers, min_chars=cfg.slice_parallel_min_chars)
+                if cfg.slice_workers > 1
+                else None
+            )
             slicers = [
-                RuleEngineSlicer(debug=self.default_debug),
+                RuleEngineSlicer(
+                    debug=self.default_debug,
+                    parallel=parallel,
+                    step_budget=cfg.slice_step_budget or None,
+                ),
             ]
 
             extractor_runner = RuleEngineExtractorRunner(
@@ -216,7 +460,11 @@ class ReportPipeline:
         ctx = ReportContext(source_path=path_obj)
 
         if path_obj is not None:
-            md_text = self.converter.convert(path_obj) or ""
+            if self.artifact_store is not None:
+                ctx.set_metadata(source_hash=source_digest(path_obj), doc_id=str(path_obj))
+            md_text, used_ocr = self._convert_source(path_obj, debug=debug)
+            if used_ocr:
+                ctx.set_metadata(ocr_applied=True)
             self._log(f"📄 DOCX->MD done chars={len(md_text)}", debug)
         else:
             md_text = markdown_text or ""
@@ -227,7 +475,7 @@ class ReportPipeline:
 
     def load_bytes(
         self,
-        file_bytes: bytes,
+        file_bytes: BinarySource,
         *,
         filename: Optional[str] = None,
         context: Optional[ReportContext] = None,
@@ -236,26 +484,209 @@ class ReportPipeline:
         """
         bytes -> markdown -> ReportContext
         用于 ExtractService / 节点：拿到文件 bytes 后直接交给 pipeline
+        也接受 memoryview / mmap / file-like（上传流、打开的文件），不会先整体读入内存
         """
         if context is not None:
             return context
 
         if debug:
             print(
-                f"🚀 [LOAD_BYTES] filename={filename or '-'} size={len(file_bytes) if file_bytes else 0}"
+                f"🚀 [LOAD_BYTES] filename={filename or '-'} size={source_size(file_bytes) if file_bytes is not None else 0}"
             )
 
         start_time = time.time()
 
         ctx = ReportContext(source_path=Path(filename).resolve() if filename else None)
 
-        md_text = self.converter.convert(file_bytes or b"", filename=filename)
+        source = ensure_seekable(file_bytes if file_bytes is not None else b"")
+        if self.artifact_store is not None:
+            # bytes 输入没有稳定路径，用内容哈希作为 doc_id
+            digest = source_digest(source)
+            ctx.set_metadata(source_hash=digest, doc_id=digest)
+        md_text, used_ocr = self._convert_source(source, filename=filename, debug=debug)
+        if used_ocr:
+            ctx.set_metadata(ocr_applied=True)
         self._log(f"📄 BYTES->MD done chars={len(md_text)}", debug)
 
         ctx.set_markdown(md_text or "")
         self._log(f"⏱ load_bytes cost={time.time() - start_time:.2f}s", debug)
         return ctx
 
+    def _convert_source(
+        self,
+        source: BinarySource | Path,
+        *,
+        filename: Optional[str] = None,
+        debug: bool = False,
+    ) -> tuple[str, bool]:
+        """返回 (markdown, 是否使用了 OCR converter)。"""
+        md_text = self.converter.convert(source, filename=filename) or ""
+        if md_text.strip() or not self.ocr_on_demand:
+            return md_text, False
+
+        # 纯文本转换为空（扫描件等）：没有 OCR 就无法识别/切片，直接走 OCR
+        self._log("🖼 text-only conversion empty -> convert with OCR", debug)
+        return self._get_ocr_converter().convert(source, filename=filename) or "", True
+
+    def _get_ocr_converter(self) -> MarkdownFileConverter:
+        with self._ocr_converter_lock:
+            if self._ocr_converter is None:
+                opt = replace(self.converter.opt, enable_ocr=True)
+                self._ocr_converter = MarkdownFileConverter(
+                    opt, llm_config=self.converter.llm_config
+                )
+            return self._ocr_converter
+
+    def load_progressive(
+        self,
+        *,
+        docx_path: Optional[str | Path] = None,
+        file_bytes: Optional[BinarySource] = None,
+        filename: Optional[str] = None,
+        head_chars: int = 2000,
+        max_stop_checks: int = 8,
+        debug: bool = False,
+    ) -> ReportContext:
+        """
+        渐进式 load：按块转换并累积 markdown，满足以下条件即停止转换：
+        - 已累积 head_chars 字符，类型识别结果不会再变化
+        - 该类型 extractor 需要的切片都已产出且 closed（起止锚点都已确定）
+        切片判定不是每块都做：见 _StopProbe，最多 max_stop_checks 次，用完后转换到文档末尾。
+        返回的 ctx.markdown_text 可能只是文档前部，metadata["partial_markdown"] 标记是否提前停止。
+        """
+        if docx_path is None and file_bytes is None:
+            raise ValueError("load_progressive requires docx_path or file_bytes")
+
+        start_time = time.time()
+        path_obj = Path(docx_path).resolve() if docx_path else None
+        source: BinarySource | Path = (
+            path_obj if path_obj is not None else ensure_seekable(file_bytes)  # type: ignore[arg-type]
+        )
+        if path_obj is None and filename:
+            path_for_ctx: Optional[Path] = Path(filename).resolve()
+        else:
+            path_for_ctx = path_obj
+        ctx = ReportContext(source_path=path_for_ctx)
+
+        parts: List[str] = []
+        total_len = 0
+        chunks = 0
+        stopped_early = False
+        probe: Optional[_StopProbe] = None
+        for chunk in self.converter.iter_convert(source, filename=filename):
+            chunks += 1
+            if not (chunk and chunk.strip()):
+                continue
+            total_len += len(chunk) + (2 if parts else 0)
+            parts.append(chunk)
+            # detector 只看前 head_chars：不足时结果还可能变化
+            if total_len < head_chars:
+                continue
+            if probe is None:
+                probe = self._stop_probe("\n\n".join(parts), head_chars=head_chars, max_checks=max_stop_checks)
+            if not probe.should_check(chunk, total_len):
+                continue
+            probe.mark_checked(total_len)
+            if self._can_stop_conversion("\n\n".join(parts), probe):
+                stopped_early = True
+                break
+
+        md_text = "\n\n".join(parts)
+        ctx.set_markdown(md_text)
+        ctx.set_metadata(
+            partial_markdown=stopped_early,
+            converted_chunks=chunks,
+            progressive_stop_checks=probe.checks if probe else 0,
+        )
+        self._log(
+            f"📄 progressive load chunks={chunks} chars={len(md_text)} stopped_early={stopped_early} "
+            f"stop_checks={probe.checks if probe else 0} cost={time.time() - start_time:.2f}s",
+            debug,
+        )
+        return ctx
+
+    def _stop_probe(self, head_text: str, *, head_chars: int, max_checks: int) -> _StopProbe:
+        rt = self.type_detector.detect(head_text, head_chars=head_chars).report_type
+        required = [] if self._needs_full_text(rt) else self.required_slice_keys(rt)
+        if not required:
+            # 需要全文 / 没有可判定的切片：不再尝试提前停止
+            return _StopProbe(report_type=rt, enabled=False)
+        return _StopProbe(
+            report_type=rt,
+            required=required,
+            anchors=self._closing_anchors(rt, required),
+            max_checks=max(1, max_checks),
+        )
+
+    def _closing_anchors(self, report_type: str, required: Sequence[str]) -> List["re.Pattern[str]"]:
+        """所需切片（及其 within 祖先）的起止锚点：新块命中其中之一时才值得提前重切。"""
+        try:
+            slice_rs = get_slice_ruleset(report_type)
+        except (KeyError, ValueError):
+            return []
+        steps = {s.key: s for s in slice_rs.steps}
+        keys: List[str] = []
+        for key in required:
+            depth = 0
+            while key in steps and key not in keys and depth <= len(steps):
+                keys.append(key)
+                key = steps[key].within or ""
+                depth += 1
+
+        anchors: List["re.Pattern[str]"] = []
+        for key in keys:
+            step = steps[key]
+            params = {**(slice_rs.defaults or {}), **(step.params or {})}
+            for pat in list(step.targets or []) + list(params.get("ends") or []):
+                if not isinstance(pat, str) or not pat.strip():
+                    continue
+                try:
+                    anchors.append(re.compile(pat))
+                except re.error:
+                    anchors.append(re.compile(re.escape(pat)))
+        return anchors
+
+    def _can_stop_conversion(self, md_text: str, probe: _StopProbe) -> bool:
+        scratch = ReportContext()
+        scratch.set_markdown(md_text)
+        scratch.set_metadata(report_type=probe.report_type)
+        for slicer in self.slicers:
+            slicer(scratch)
+        return self._required_slices_closed(scratch, probe.report_type or "", probe.required)
+
+    def _needs_full_text(self, report_type: Optional[str]) -> bool:
+        try:
+            extract_rs = get_extract_ruleset(report_type or "house")
+        except (KeyError, ValueError):
+            return True
+        return any(
+            "__full__" in (spec.input_slice_keys or ["__full__"])
+            for spec in extract_rs.extractors
+            if spec.enabled
+        )
+
+    def _required_slices_closed(
+        self, context: ReportContext, report_type: str, required: Sequence[str]
+    ) -> bool:
+        try:
+            steps = {s.key: s for s in get_slice_ruleset(report_type).steps}
+        except (KeyError, ValueError):
+            return False
+
+        def is_closed(key: str, depth: int = 0) -> bool:
+            step = steps.get(key)
+            if step is None or depth > len(steps):
+                return False
+            if step.within:
+                # 父切片已定稿，则子切片的输入也不会再变
+                return is_closed(step.within, depth + 1)
+            sections = context.get_slices(key)
+            return bool(sections) and all(
+                bool((s.metadata or {}).get("closed")) for s in sections
+            )
+
+        return all(context.has_slice(k) and is_closed(k) for k in required)
+
     # -------------------------
     # Detect
     # -------------------------
@@ -311,12 +742,82 @@ class ReportPipeline:
         )
         return context
 
+    def required_slice_keys(self, report_type: Optional[str]) -> List[str]:
+        """
+        当前类型下 extractor 实际消费、且由切片规则产出的 slice key。
+        """
+        if not report_type:
+            return []
+        try:
+            extract_rs = get_extract_ruleset(report_type)
+            slice_rs = get_slice_ruleset(report_type)
+        except (KeyError, ValueError):
+            return []
+
+        produced = {s.key for s in slice_rs.steps}
+        keys: List[str] = []
+        for spec in extract_rs.extractors:
+            if not spec.enabled:
+                continue
+            for k in spec.input_slice_keys or []:
+                if k in produced and k not in keys:
+                    keys.append(k)
+        return keys
+
+    def missing_slice_keys(self, context: ReportContext) -> List[str]:
+        rt = (context.metadata or {}).get("report_type")
+        return [k for k in self.required_slice_keys(rt) if not context.has_slice(k)]
+
+    def step_ocr_fallback(
+        self,
+        context: ReportContext,
+        *,
+        source: Optional[BinarySource | str | Path] = None,
+        filename: Optional[str] = None,
+        debug: bool = False,
+    ) -> bool:
+        """
+        按需 OCR 第二阶段：所需切片缺失时，带 OCR 重新转换并重新切片。
+        返回是否实际执行了 OCR。
+        """
+        if not self.ocr_on_demand or source is None:
+            return False
+        if (context.metadata or {}).get("ocr_applied"):
+            return False
+
+        missing = self.missing_slice_keys(context)
+        if not missing:
+            self._log("🖼 ocr on-demand: all required slices present, skip", debug)
+            return False
+
+        start_time = time.time()
+        self._log(f"🖼 ocr on-demand: missing slices={missing} -> convert with OCR", debug)
+
+        if isinstance(source, str):
+            source = Path(source).resolve()
+        md_text = self._get_ocr_converter().convert(source, filename=filename) or ""
+        context.set_metadata(ocr_applied=True, ocr_missing_slices=missing)
+        if not md_text.strip():
+            return False
+
+        context.set_markdown(md_text)
+        context.clear_slices()
+        self.step_slice(context, debug=debug)
+
+        self._log(
+            f"🖼 ocr on-demand done chars={len(md_text)} still_missing={self.missing_slice_keys(context)} "
+            f"cost={time.time() - start_time:.2f}s",
+            debug,
+        )
+        return True
+
     def step_extract(
         self,
         context: ReportContext,
         *,
         debug: bool = False,
         override: Optional[ExtractRuleSet] = None,
+        checkpoint: Optional[Any] = None,
     ) -> Dict[str, List[dict]]:
         if debug:
             print("🧠 [EXTRACT] start")
@@ -327,7 +828,10 @@ class ReportPipeline:
             self._log("⚠️ no extractor_runner configured, skip", debug)
             return {}
 
-        outputs = self.extractor_runner.run(context, override=override) or {}
+        if checkpoint is not None:
+            outputs = self.extractor_runner.run(context, override=override, checkpoint=checkpoint) or {}
+        else:
+            outputs = self.extractor_runner.run(context, override=override) or {}
         self._log(f"✨ runner extracted outputs={list(outputs.keys())}", debug)
         self._log(f"⏱ extract cost={time.time() - start_time:.2f}s", debug)
         return outputs
@@ -386,6 +890,8 @@ class ReportPipeline:
         want_benchmark: bool = False,
         debug: Optional[bool] = None,
         override: Optional[ExtractRuleSet] = None,
+        progressive: bool = False,
+        observers: Sequence[StageObserver] = (),
     ) -> PipelineResult:
         debug = self.default_debug if debug is None else debug
 
@@ -396,15 +902,23 @@ class ReportPipeline:
 
         t0 = time.time()
 
-        ctx = self.load(docx_path=docx_path, markdown_text=markdown_text, debug=debug)
-        self.step_detect_report_type(ctx, debug=debug)
-        self.step_slice(ctx, debug=debug)
-        outputs = self.step_extract(ctx, debug=debug, override=override)
-        warnings = self.validate(outputs, debug=debug)
-
-        evaluations: List[dict] = []
-        if want_benchmark:
-            evaluations = self.step_benchmark(override=override, debug=debug)
+        with self._stage("load", observers=observers) as scope:
+            if scope.skip:
+                ctx = scope.result
+            elif progressive and docx_path is not None:
+                ctx = self.load_progressive(docx_path=docx_path, debug=debug)
+            else:
+                ctx = self.load(docx_path=docx_path, markdown_text=markdown_text, debug=debug)
+            scope.context = scope.result = ctx
+        outputs, warnings, evaluations = self._run_after_load(
+            ctx,
+            source=docx_path,
+            filename=None,
+            want_benchmark=want_benchmark,
+            debug=debug,
+            override=override,
+            observers=observers,
+        )
 
         if debug:
             print("-" * 60)
@@ -419,12 +933,14 @@ class ReportPipeline:
 
     def run_bytes(
         self,
-        file_bytes: bytes,
+        file_bytes: BinarySource,
         filename: Optional[str] = None,
         *,
         want_benchmark: bool = False,
         debug: Optional[bool] = None,
         override: Optional[ExtractRuleSet] = None,
+        progressive: bool = False,
+        observers: Sequence[StageObserver] = (),
     ) -> PipelineResult:
         debug = self.default_debug if debug is None else debug
 
@@ -434,16 +950,26 @@ class ReportPipeline:
             print("=" * 60)
 
         t0 = time.time()
-
-        ctx = self.load_bytes(file_bytes, filename=filename, debug=debug)
-        self.step_detect_report_type(ctx, debug=debug)
-        self.step_slice(ctx, debug=debug)
-        outputs = self.step_extract(ctx, debug=debug, override=override)
-        warnings = self.validate(outputs, debug=debug)
-
-        evaluations: List[dict] = []
-        if want_benchmark:
-            evaluations = self.step_benchmark()
+        # 流式输入可能被转换多次（渐进 / 按需 OCR），先保证可 seek
+        file_bytes = ensure_seekable(file_bytes)
+
+        with self._stage("load", observers=observers) as scope:
+            if scope.skip:
+                ctx = scope.result
+            elif progressive:
+                ctx = self.load_progressive(file_bytes=file_bytes, filename=filename, debug=debug)
+            else:
+                ctx = self.load_bytes(file_bytes, filename=filename, debug=debug)
+            scope.context = scope.result = ctx
+        outputs, warnings, evaluations = self._run_after_load(
+            ctx,
+            source=file_bytes,
+            filename=filename,
+            want_benchmark=want_benchmark,
+            debug=debug,
+            override=override,
+            observers=observers,
+        )
 
         if debug:
             print("-" * 60)
@@ -456,6 +982,44 @@ class ReportPipeline:
             context=ctx, outputs=outputs, evaluations=evaluations, warnings=warnings
         )
 
+    def _run_after_load(
+        self,
+        ctx: ReportContext,
+        *,
+        source: Any,
+        filename: Optional[str],
+        want_benchmark: bool,
+        debug: bool,
+        override: Optional[ExtractRuleSet],
+        observers: Sequence[StageObserver],
+    ) -> tuple[Dict[str, List[dict]], List[str], List[dict]]:
+        """run / run_bytes 共用的 detect -> benchmark 段；observer 可按阶段跳过并给出结果（见 StageScope）。"""
+        with self._stage("detect", ctx, observers) as scope:
+            if not scope.skip:
+                scope.result = self.step_detect_report_type(ctx, debug=debug)
+        with self._stage("slice", ctx, observers) as scope:
+            if not scope.skip:
+                self.step_slice(ctx, debug=debug)
+        with self._stage("ocr_fallback", ctx, observers) as scope:
+            if not scope.skip:
+                scope.result = self.step_ocr_fallback(ctx, source=source, filename=filename, debug=debug)
+        with self._stage("extract", ctx, observers) as scope:
+            if not scope.skip:
+                scope.result = self.step_extract(ctx, debug=debug, override=override, **scope.options)
+            outputs: Dict[str, List[dict]] = scope.result or {}
+        with self._stage("validate", ctx, observers) as scope:
+            if not scope.skip:
+                scope.result = self.validate(outputs, debug=debug)
+            warnings: List[str] = scope.result or []
+
+        evaluations: List[dict] = []
+        if want_benchmark:
+            with self._stage("benchmark", ctx, observers) as scope:
+                if not scope.skip:
+                    scope.result = self.step_benchmark(override=override, debug=debug)
+                evaluations = scope.result or []
+        return outputs, warnings, evaluations
+
     def run_until(
         self,
         *,
@@ -466,29 +1030,96 @@ class ReportPipeline:
         debug: bool = False,
         override: Optional[ExtractRuleSet] = None,
     ):
-        ctx = self.load(docx_path=docx_path, markdown_text=markdown_text, debug=debug)
+        with self._stage("load") as scope:
+            ctx = self.load(docx_path=docx_path, markdown_text=markdown_text, debug=debug)
+            scope.context = ctx
         if until == "load":
             return ctx
 
-        self.step_detect_report_type(ctx, debug=debug)
+        with self._stage("detect", ctx):
+            self.step_detect_report_type(ctx, debug=debug)
         if until == "detect":
             return ctx
 
-        self.step_slice(ctx, debug=debug)
+        with self._stage("slice", ctx):
+            self.step_slice(ctx, debug=debug)
+        with self._stage("ocr_fallback", ctx):
+            self.step_ocr_fallback(ctx, source=docx_path, debug=debug)
         if until == "slice":
             return ctx
 
-        outputs = self.step_extract(ctx, debug=debug, override=override)
+        with self._stage("extract", ctx):
+            outputs = self.step_extract(ctx, debug=debug, override=override)
+        if until == "extract":
+            return ctx, outputs
+
+        with self._stage("validate", ctx):
+            warnings = self.validate(outputs, debug=debug)
+        if until == "validate":
+            return ctx, outputs, warnings
+
+        evaluations: List[dict] = []
+        if want_benchmark or until in ("benchmark", "all"):
+            with self._stage("benchmark", ctx):
+                evaluations = self.step_benchmark(override=override, debug=debug)
+
+        return PipelineResult(
+            context=ctx, outputs=outputs, evaluations=evaluations, warnings=warnings
+        )
+
+    def run_from(
+        self,
+        stage: ResumeStage,
+        *,
+        doc_id: str,
+        until: RunStage = "all",
+        want_benchmark: bool = False,
+        debug: bool = False,
+        override: Optional[ExtractRuleSet] = None,
+    ):
+        """
+        从 artifact_store 里的阶段产物恢复 ReportContext，从 stage 开始继续跑；返回值与 run_until 一致。
+        例：改 prompt 后 run_from("extract", doc_id=...) 只重跑 LLM 抽取。
+        doc_id：路径输入为解析后的绝对路径，bytes 输入为内容 sha256（见 ctx.metadata["doc_id"]）。
+        """
+        if self.artifact_store is None:
+            raise RuntimeError("run_from requires ReportPipeline(artifact_store=...)")
+        upto = {"detect": "load", "slice": "detect", "extract": "slice"}.get(stage)
+        if upto is None:
+            raise ValueError(f"run_from stage must be one of detect / slice / extract, got {stage!r}")
+
+        ctx = self.artifact_store.rehydrate(self, doc_id, upto=upto)
+        self._log(f"♻️ [RUN_FROM] doc_id={doc_id} stage={stage}", debug)
+
+        if stage == "detect":
+            with self._stage("detect", ctx):
+                self.step_detect_report_type(ctx, debug=debug)
+            if until == "detect":
+                return ctx
+
+        if stage in ("detect", "slice"):
+            source = ctx.source_path if ctx.source_path and ctx.source_path.exists() else None
+            with self._stage("slice", ctx):
+                self.step_slice(ctx, debug=debug)
+            with self._stage("ocr_fallback", ctx):
+                self.step_ocr_fallback(ctx, source=source, debug=debug)
+            if until == "slice":
+                return ctx
+
+        with self._stage("extract", ctx):
+            outputs = self.step_extract(ctx, debug=debug, override=override)
         if until == "extract":
             return ctx, outputs
 
-        warnings = self.validate(outputs, debug=debug)
+        with self._stage("validate", ctx):
+            warnings = self.validate(outputs, debug=debug)
         if until == "validate":
             return ctx, outputs, warnings
 
         evaluations: List[dict] = []
         if want_benchmark or until in ("benchmark", "all"):
-            evaluations = self.step_benchmark(override=override, debug=debug)
+            with self._stage("benchmark", ctx):
+                evaluations = self.step_benchmark(override=override, debug=debug)
 
         return PipelineResult(
             context=ctx, outputs=outputs, evaluations=evaluations, warnings=warnings
@@ -496,7 +1127,7 @@ class ReportPipeline:
 
     def run_until_bytes(
         self,
-        file_bytes: bytes,
+        file_bytes: BinarySource,
         *,
         filename: Optional[str] = None,
         until: RunStage = "all",
@@ -504,29 +1135,39 @@ class ReportPipeline:
         want_benchmark: bool = False,
         debug: bool = False,
     ):
-        ctx = self.load_bytes(file_bytes, filename=filename, debug=debug)
+        file_bytes = ensure_seekable(file_bytes)
+        with self._stage("load") as scope:
+            ctx = self.load_bytes(file_bytes, filename=filename, debug=debug)
+            scope.context = ctx
         if until == "load":
             return ctx
 
-        self.step_detect_report_type(ctx, debug=debug)
+        with self._stage("detect", ctx):
+            self.step_detect_report_type(ctx, debug=debug)
         if until == "detect":
             return ctx
 
-        self.step_slice(ctx, debug=debug)
+        with self._stage("slice", ctx):
+            self.step_slice(ctx, debug=debug)
+        with self._stage("ocr_fallback", ctx):
+            self.step_ocr_fallback(ctx, source=file_bytes, filename=filename, debug=debug)
         if until == "slice":
             return ctx
 
-        outputs = self.step_extract(ctx, debug=debug)
+        with self._stage("extract", ctx):
+            outputs = self.step_extract(ctx, debug=debug)
         if until == "extract":
             return ctx, outputs
 
-        warnings = self.validate(outputs, debug=debug)
+        with self._stage("validate", ctx):
+            warnings = self.validate(outputs, debug=debug)
         if until == "validate":
             return ctx, outputs, warnings
 
         evaluations: List[dict] = []
         if want_benchmark or until in ("benchmark", "all"):
-            evaluations = self.step_benchmark()
+            with self._stage("benchmark", ctx):
+                evaluations = self.step_benchmark()
 
         return PipelineResult(
             context=ctx, outputs=outputs, evaluations=evaluations, warnings=warnings
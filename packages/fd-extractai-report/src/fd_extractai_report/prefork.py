@@ -0,0 +1,979 @@
+"""
+Pre-fork worker 模式：父进程一次性 import 并预热 pipeline（rulesets / examples / 切片正则 /
+MarkItDown / langextract），gc.freeze() 后再按需 fork worker 处理文档。
+子进程通过 copy-on-write 共享预热好的状态，横向扩 worker 不会成倍增加启动时间和常驻内存。
+
+worker 处理满 max_documents 篇或 RSS 超过 max_rss_bytes 后自动退出，父进程再 fork 一个新的
+（重新从预热好的父进程状态开始），避免长跑 worker 的内存缓慢上涨；每篇文档的分阶段内存统计
+汇总在 PreforkWorkerPool.memory_records / memory_summary()。
+
+配置 QuarantinePolicy 后按阶段限时：快车道 worker 在阶段超预算时（SIGALRM 打断，或卡在 C 代码里
+超过 kill_grace 被父进程杀掉）放弃该文档，转入并发很低、预算放宽的隔离车道重跑，快车道继续消化队列；
+被隔离的文档记录在 PreforkWorkerPool.quarantined / batch_metrics()。
+
+内存准入在父进程里按池统一做（memory_budget_mb，默认取 LLM_CONVERT_MEMORY_BUDGET_MB）：
+每篇文档按 converter.estimate_memory 估算，在途估算总量超出预算时先留在父进程，不进入任务队列；
+文档结束（含失败 / worker 死亡）时释放。各 worker 进程内的 AdmissionController 只管本进程，
+不能代替池级预算（N 个 worker 会得到 N 份预算）。
+
+配置 CheckpointPolicy 后 worker 经 CheckpointRunner 处理文档：每个阶段写入 SQLite 台账，
+重跑同一 run_id 时已完成的文档和已完成的抽取器直接复用（见 checkpoint.py）。
+
+worker 是 daemonic 进程，不能再创建子进程：切片（ParallelSlicing）与 PDF 按页并行在 worker 内自动走串行，
+并行度由 worker 数提供。
+
+仅在支持 fork 的平台（Linux）上共享预热状态；其他平台退化为每个 worker 各自预热。
+"""
+
+from __future__ import annotations
+
+import gc
+import heapq
+import itertools
+import logging
+import multiprocessing
+import pickle
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Literal, Optional, Sequence, Tuple
+
+from fd_extractai_report.checkpoint import CheckpointLedger, CheckpointPolicy, CheckpointRunner
+from fd_extractai_report.codec import decode_result, encode_result
+from fd_extractai_report.context import ReportContext
+from fd_extractai_report.converters.admission import ConversionMemoryModel
+from fd_extractai_report.converters.input_stream import source_size
+from fd_extractai_report.memprof import (
+    DocumentMemoryRecord,
+    MemoryStageObserver,
+    current_rss,
+    summarize_records,
+)
+from fd_extractai_report.pipeline import (
+    PipelineResult,
+    ReportPipeline,
+    StageBudgetExceeded,
+    StageObserver,
+    StageScope,
+)
+from fd_extractai_report.settings import CONFIG
+from fd_extractai_report.scheduling import (
+    CostEstimate,
+    DocumentCostEstimator,
+    order_lpt,
+    simulate_makespan,
+)
+
+
+logger = logging.getLogger(__name__)
+
+_MB = 1024 * 1024
+
+# 父进程预热好的 pipeline；fork 后子进程直接继承
+_WARM_PIPELINE: Optional[ReportPipeline] = None
+
+# 用于触发各类型切片规则编译的最小 markdown
+_WARMUP_MARKDOWN = "# 估价结果\n\n| 项目 | 内容 |\n| --- | --- |\n| 总价 | 100 |\n"
+
+
+def warm_pipeline(
+    pipeline: ReportPipeline,
+    *,
+    report_types: Optional[Sequence[str]] = None,
+    debug: bool = False,
+) -> Dict[str, float]:
+    """
+    预热 pipeline 的惰性状态，返回各阶段耗时（秒）：
+    - rulesets：切片 / 抽取 ruleset（连带构造全部 ExampleData）
+    - slicing：每个类型跑一次切片，把规则正则编译进 re 缓存
+    - converter：初始化 MarkItDown（按需 OCR 时连同 OCR converter）
+    - extractor：import langextract 与 OpenAI provider
+    """
+    from fd_extractai_report.rules.extracting.registry import _default_rulesets as _extract_rulesets
+    from fd_extractai_report.rules.slicing.registry import _default_rulesets as _slice_rulesets
+    from fd_extractai_report.rules.extracting.registry import get_ruleset as get_extract_ruleset
+    from fd_extractai_report.rules.slicing.registry import get_ruleset as get_slice_ruleset
+
+    timings: Dict[str, float] = {}
+
+    t0 = time.perf_counter()
+    types = list(report_types or sorted(set(_slice_rulesets()) | set(_extract_rulesets())))
+    for rt in types:
+        for getter in (get_slice_ruleset, get_extract_ruleset):
+            try:
+                getter(rt)
+            except KeyError:
+                continue
+    timings["rulesets"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for rt in types:
+        ctx = ReportContext()
+        ctx.set_markdown(_WARMUP_MARKDOWN)
+        ctx.set_metadata(report_type=rt)
+        try:
+            pipeline.step_slice(ctx, debug=False)
+        except Exception as e:
+            logger.debug("warmup slice failed for %s: %r", rt, e)
+    timings["slicing"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    _ = pipeline.converter.md
+    if pipeline.ocr_on_demand:
+        _ = pipeline._get_ocr_converter().md
+    timings["converter"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    if pipeline.extractor_runner is not None:
+        import langextract  # noqa: F401
+        from langextract.providers.openai import OpenAILanguageModel  # noqa: F401
+    timings["extractor"] = time.perf_counter() - t0
+
+    if debug:
+        print("🔥 [PREFORK] warm " + " ".join(f"{k}={v:.2f}s" for k, v in timings.items()))
+    return timings
+
+
+def _fork_available() -> bool:
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+@dataclass(frozen=True)
+class WorkerLimits:
+    """worker 回收条件；0 表示不限制。"""
+
+    max_documents: int = 0
+    max_rss_bytes: int = 0
+    track_memory: bool = True
+    tracemalloc_top: int = 0
+
+
+Lane = Literal["fast", "slow"]
+
+
+@dataclass(frozen=True)
+class QuarantinePolicy:
+    """
+    stage_budgets：快车道各阶段预算（秒）
+    relaxed_factor：隔离车道预算 = 快车道预算 * relaxed_factor；<= 0 表示隔离车道不限时
+    workers：隔离车道 worker 数
+    kill_grace：阶段超出预算后再等多久仍未结束（卡在 C 扩展里收不到信号）就杀掉 worker
+    """
+
+    stage_budgets: Dict[str, float] = field(default_factory=dict)
+    relaxed_factor: float = 4.0
+    workers: int = 1
+    kill_grace: float = 10.0
+
+    def budgets_for(self, lane: Lane) -> Dict[str, float]:
+        if lane == "fast":
+            return dict(self.stage_budgets)
+        if self.relaxed_factor <= 0:
+            return {}
+        return {k: v * self.relaxed_factor for k, v in self.stage_budgets.items()}
+
+
+@dataclass
+class QuarantineRecord:
+    task_id: int
+    source: str
+    stage: str
+    budget: float
+    elapsed: float
+    killed: bool = False
+    # pending | ok | failed
+    outcome: str = "pending"
+    # 从转入隔离车道到结束的耗时（秒，含排队）
+    slow_lane_seconds: Optional[float] = None
+    error: Optional[str] = None
+    quarantined_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _WorkerSlot:
+    wid: int
+    process: Any
+    lane: Lane = "fast"
+    task_id: Optional[int] = None
+    done: int = 0
+    started_at: float = field(default_factory=time.time)
+    stage: Optional[str] = None
+    stage_started: float = 0.0
+    killed: Optional[StageBudgetExceeded] = None
+    # 首次发现进程已退出的时间：它退出前写入队列的 done / exit 可能还没读到，先等 _DEAD_GRACE 再判失败
+    dead_since: Optional[float] = None
+
+
+# 死亡 worker 的在途任务判失败前的等待时间（秒）
+_DEAD_GRACE = 2.0
+
+
+class _StageReporter(StageObserver):
+    """worker 内把阶段切换报给父进程，父进程据此对卡死的 worker 兜底限时。"""
+
+    def __init__(self, result_q: Any, wid: int) -> None:
+        self.result_q = result_q
+        self.wid = wid
+        self.task_id: Optional[int] = None
+
+    def on_stage_start(self, scope: StageScope) -> None:
+        if self.task_id is not None:
+            self.result_q.put(("stage", self.wid, self.task_id, scope.stage))
+
+
+def _run_document(
+    pipe: ReportPipeline,
+    docx_path: Optional[str],
+    file_bytes: Optional[bytes],
+    filename: Optional[str],
+    run_kwargs: Dict[str, Any],
+    runner: Optional[CheckpointRunner] = None,
+) -> PipelineResult:
+    if runner is not None:
+        return runner.run_document(
+            docx_path=docx_path, file_bytes=file_bytes, filename=filename, **run_kwargs
+        )
+    if docx_path is not None:
+        return pipe.run(docx_path=docx_path, **run_kwargs)
+    return pipe.run_bytes(file_bytes or b"", filename=filename, **run_kwargs)
+
+
+def _picklable_error(e: BaseException) -> BaseException:
+    try:
+        pickle.dumps(e)
+        return e
+    except Exception:
+        return RuntimeError(f"{type(e).__name__}: {e}")
+
+
+def _recycle_reason(done: int, limits: WorkerLimits) -> Optional[str]:
+    if limits.max_documents and done >= limits.max_documents:
+        return "max_documents"
+    if limits.max_rss_bytes:
+        rss = current_rss()
+        if rss is not None and rss > limits.max_rss_bytes:
+            return "max_rss"
+    return None
+
+
+def _worker_main(
+    wid: int,
+    task_q: Any,
+    result_q: Any,
+    limits: WorkerLimits,
+    pipeline_factory: Optional[Callable[[], ReportPipeline]],
+    report_stages: bool = False,
+    checkpoint: Optional[CheckpointPolicy] = None,
+) -> None:
+    global _WARM_PIPELINE
+    if _WARM_PIPELINE is None:
+        # 非 fork 平台：子进程里各自构建并预热
+        if pipeline_factory is None:
+            raise RuntimeError("prefork worker has no warmed pipeline")
+        _WARM_PIPELINE = pipeline_factory()
+        warm_pipeline(_WARM_PIPELINE)
+
+    pipe = _WARM_PIPELINE
+    observer: Optional[MemoryStageObserver] = None
+    if limits.track_memory:
+        observer = MemoryStageObserver(tracemalloc_top=limits.tracemalloc_top, keep_records=False)
+        pipe.stage_observers.append(observer)
+    reporter: Optional[_StageReporter] = None
+    if report_stages:
+        reporter = _StageReporter(result_q, wid)
+        pipe.stage_observers.append(reporter)
+
+    # worker 独占进程，阶段预算可以用 SIGALRM 抢占
+    pipe.stage_budget_preempt = True
+    # 台账连接在子进程里各自打开
+    runner = checkpoint.build_runner(pipe) if checkpoint is not None else None
+
+    done = 0
+    while True:
+        task = task_q.get()
+        if task is None:
+            break
+        task_id, docx_path, file_bytes, filename, run_kwargs, budgets = task
+        result_q.put(("start", wid, task_id))
+        pipe.stage_budgets = dict(budgets or {})
+        if reporter is not None:
+            reporter.task_id = task_id
+
+        if observer is not None:
+            observer.begin_document(docx_path or filename or str(task_id))
+        result: Optional[PipelineResult] = None
+        error: Optional[BaseException] = None
+        try:
+            result = _run_document(pipe, docx_path, file_bytes, filename, run_kwargs, runner)
+        except (Exception, StageBudgetExceeded) as e:
+            # StageBudgetExceeded 继承 BaseException，要显式接住交给父进程隔离重排
+            error = _picklable_error(e)
+        if reporter is not None:
+            reporter.task_id = None
+        record = observer.end_document() if observer is not None else None
+        if result is not None and record is not None:
+            result.context.set_metadata(memory_profile=record.to_dict())
+
+        # 结果走 FDRC 编码：切片只传 offset，markdown 只过一次管道；
+        # 编码失败算该文档失败，不能让 worker 进程因此退出
+        payload: Optional[bytes] = None
+        if result is not None:
+            try:
+                payload = encode_result(result)
+            except Exception as e:
+                error = _picklable_error(e)
+        result_q.put(("done", wid, task_id, payload, error, record))
+        done += 1
+
+        reason = _recycle_reason(done, limits)
+        if reason:
+            result_q.put(("exit", wid, reason))
+            break
+
+
+class PreforkWorkerPool:
+    """
+    用法：
+        with PreforkWorkerPool(pipeline_factory=ReportPipeline, max_workers=8,
+                               limits=WorkerLimits(max_documents=200, max_rss_bytes=2 << 30)) as pool:
+            for path, result in pool.iter_run(paths):
+                ...
+        pool.memory_summary()
+
+    start() 在父进程里构建并预热 pipeline、gc.freeze()；worker 在有任务时按需 fork，
+    触发回收条件的 worker 退出后由父进程补 fork。
+    """
+
+    def __init__(
+        self,
+        *,
+        pipeline: Optional[ReportPipeline] = None,
+        pipeline_factory: Optional[Callable[[], ReportPipeline]] = None,
+        max_workers: int = 0,
+        report_types: Optional[Sequence[str]] = None,
+        freeze: bool = True,
+        limits: Optional[WorkerLimits] = None,
+        quarantine: Optional[QuarantinePolicy] = None,
+        checkpoint: Optional[CheckpointPolicy] = None,
+        memory_budget_mb: Optional[int] = None,
+        debug: bool = False,
+    ) -> None:
+        if pipeline is None and pipeline_factory is None:
+            pipeline_factory = ReportPipeline
+        self.pipeline = pipeline
+        self.pipeline_factory = pipeline_factory
+        self.max_workers = max_workers or (multiprocessing.cpu_count() or 1)
+        self.report_types = report_types
+        self.freeze = freeze
+        self.limits = limits or WorkerLimits()
+        self.quarantine = quarantine
+        self.checkpoint = checkpoint
+        self.debug = debug
+        # 池级内存预算（bytes），0 表示不做准入
+        budget_mb = CONFIG.convert_memory_budget_mb if memory_budget_mb is None else memory_budget_mb
+        self.memory_budget_bytes = max(0, int(budget_mb or 0)) * _MB
+
+        self.warm_timings: Dict[str, float] = {}
+        self.memory_records: List[DocumentMemoryRecord] = []
+        self.recycled: Counter = Counter()
+        self.last_estimates: List[CostEstimate] = []
+        self.quarantined: List[QuarantineRecord] = []
+        self.counters: Counter = Counter()
+
+        self._mp: Any = None
+        self._task_q: Any = None
+        self._slow_q: Any = None
+        self._result_q: Any = None
+        self._workers: Dict[int, _WorkerSlot] = {}
+        self._futures: Dict[int, Future] = {}
+        # task_id -> (lane, 任务参数)，隔离时据此重新入队
+        self._tasks: Dict[int, Tuple[Lane, tuple]] = {}
+        self._quarantine_by_task: Dict[int, QuarantineRecord] = {}
+        self._last_deadline_check = 0.0
+        self._last_reap_check = 0.0
+        # 内存准入：等待中的 (task_id, 估算 bytes, payload)，已放行的 task_id -> 估算 bytes
+        self._admission_q: Deque[Tuple[int, int, tuple]] = deque()
+        self._admitted: Dict[int, int] = {}
+        self._admitted_bytes = 0
+        self.admission_stats: Counter = Counter()
+        self._task_ids = itertools.count()
+        self._wids = itertools.count()
+        self._lock = threading.Lock()
+        self._collector: Optional[threading.Thread] = None
+        # 所有 fork 都在 spawner 线程里做、且不持有 _lock；_spawning 是已请求未完成的 fork 数
+        self._spawner: Optional[threading.Thread] = None
+        self._spawn_q: "queue.Queue[Optional[Lane]]" = queue.Queue()
+        self._spawning: Counter = Counter()
+        # worker 已启动但 spawner 还没登记槽位时先到的 start 消息：wid -> task_id
+        self._early_starts: Dict[int, int] = {}
+        self._closing = False
+        self._started = False
+        self._frozen = False
+
+    # -------------------------
+    # lifecycle
+    # -------------------------
+    def start(self) -> "PreforkWorkerPool":
+        global _WARM_PIPELINE
+        if self._started:
+            return self
+
+        if _fork_available():
+            pipe = self.pipeline or self.pipeline_factory()  # type: ignore[misc]
+            self.warm_timings = warm_pipeline(pipe, report_types=self.report_types, debug=self.debug)
+            _WARM_PIPELINE = pipe
+            self._mp = multiprocessing.get_context("fork")
+
+            if self.freeze:
+                # 先回收垃圾再冻结：预热对象移出 GC 代际，子进程的 GC 不再触碰（写）这些页
+                gc.collect()
+                gc.freeze()
+                self._frozen = True
+                if self.debug:
+                    print(f"🧊 [PREFORK] gc.freeze objects={gc.get_freeze_count()}")
+        else:
+            logger.warning("fork start method unavailable; each worker warms its own pipeline")
+            self._mp = multiprocessing.get_context()
+
+        self._task_q = self._mp.Queue()
+        self._slow_q = self._mp.Queue()
+        self._result_q = self._mp.Queue()
+        self._closing = False
+        self._started = True
+        self._spawn_q = queue.Queue()
+        self._spawning = Counter()
+        self._spawner = threading.Thread(target=self._spawn_loop, name="prefork-spawner", daemon=True)
+        self._spawner.start()
+        self._collector = threading.Thread(
+            target=self._collect, name="prefork-collector", daemon=True
+        )
+        self._collector.start()
+        return self
+
+    def close(self, *, wait: bool = True) -> None:
+        global _WARM_PIPELINE
+        if not self._started:
+            return
+        self._closing = True
+        # 先停 spawner：之后不会再有新 worker，下面拿到的就是全部 worker
+        if self._spawner is not None:
+            self._spawn_q.put(None)
+            self._spawner.join()
+            self._spawner = None
+        with self._lock:
+            workers = list(self._workers.values())
+        for slot in workers:
+            self._lane_queue(slot.lane).put(None)
+        if wait:
+            for slot in workers:
+                slot.process.join()
+        else:
+            for slot in workers:
+                slot.process.terminate()
+        if self._collector is not None:
+            self._collector.join(timeout=5)
+            self._collector = None
+
+        with self._lock:
+            for fut in self._futures.values():
+                if not fut.done():
+                    fut.set_exception(RuntimeError("prefork pool closed"))
+            self._futures.clear()
+            self._tasks.clear()
+            self._workers.clear()
+            self._early_starts.clear()
+            self._admission_q.clear()
+            self._admitted.clear()
+            self._admitted_bytes = 0
+
+        if self._frozen:
+            gc.unfreeze()
+            self._frozen = False
+        _WARM_PIPELINE = None
+        self._started = False
+
+    def __enter__(self) -> "PreforkWorkerPool":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # -------------------------
+    # workers
+    # -------------------------
+    def _lane_queue(self, lane: Lane) -> Any:
+        return self._slow_q if lane == "slow" else self._task_q
+
+    def _spawn_loop(self) -> None:
+        """
+        唯一做 fork 的线程。fork 时不持有 _lock，也不在收集线程里 fork：
+        子进程只继承本线程，不会带着被其他线程（收集 / 估算 / 调用方）持有的池锁醒来。
+        """
+        while True:
+            lane = self._spawn_q.get()
+            if lane is None:
+                return
+            try:
+                if not self._closing:
+                    self._spawn_worker(lane)
+            except Exception as e:
+                logger.warning("prefork spawn failed: lane=%s (%r)", lane, e)
+            finally:
+                with self._lock:
+                    self._spawning[lane] -= 1
+
+    def _spawn_worker(self, lane: Lane = "fast") -> None:
+        wid = next(self._wids)
+        pipeline_factory = None if _WARM_PIPELINE is not None else (self.pipeline_factory or ReportPipeline)
+        proc = self._mp.Process(
+            target=_worker_main,
+            args=(
+                wid,
+                self._lane_queue(lane),
+                self._result_q,
+                self.limits,
+                pipeline_factory,
+                self.quarantine is not None,
+                self.checkpoint,
+            ),
+            name=f"prefork-{lane}-worker-{wid}",
+            daemon=True,
+        )
+        proc.start()
+        slot = _WorkerSlot(wid=wid, process=proc, lane=lane)
+        with self._lock:
+            slot.task_id = self._early_starts.pop(wid, None)
+            self._workers[wid] = slot
+        if self.debug:
+            print(f"🍴 [PREFORK] fork {lane} worker #{wid} pid={proc.pid}")
+
+    def _ensure_workers(self) -> None:
+        # 按需 fork：各车道在途任务数超过存活 worker 时补到该车道上限
+        with self._lock:
+            if self._closing:
+                return
+            limits: Dict[Lane, int] = {
+                "fast": self.max_workers,
+                "slow": max(1, self.quarantine.workers) if self.quarantine else 0,
+            }
+            for lane, cap in limits.items():
+                alive = sum(
+                    1 for w in self._workers.values() if w.lane == lane and w.process.is_alive()
+                )
+                pending = sum(1 for ln, _ in self._tasks.values() if ln == lane)
+                if lane == "fast":
+                    # 还在等内存准入的任务不在队列里，不为它们 fork
+                    pending -= len(self._admission_q)
+                for _ in range(max(0, min(cap, pending) - alive - self._spawning[lane])):
+                    self._spawning[lane] += 1
+                    self._spawn_q.put(lane)
+
+    def _collect(self) -> None:
+        while True:
+            try:
+                msg = self._result_q.get(timeout=0.5)
+            except queue.Empty:
+                if self._closing and not any(
+                    w.process.is_alive() for w in list(self._workers.values())
+                ):
+                    return
+                self._enforce_deadlines()
+                self._reap_dead_workers()
+                continue
+            except (EOFError, OSError):
+                return
+
+            # 其他 worker 持续发消息时队列不会空：每轮都检查（限频），被 OOM killer 杀掉的 worker 也能及时补上
+            self._enforce_deadlines()
+            self._reap_dead_workers()
+            kind, wid = msg[0], msg[1]
+            with self._lock:
+                slot = self._workers.get(wid)
+                if slot is None and kind == "start":
+                    self._early_starts[wid] = msg[2]
+                elif kind == "done":
+                    self._early_starts.pop(wid, None)
+
+            if kind == "start":
+                if slot is not None:
+                    slot.task_id = msg[2]
+                    slot.stage = None
+            elif kind == "stage":
+                if slot is not None and slot.task_id == msg[2]:
+                    slot.stage = msg[3]
+                    slot.stage_started = time.monotonic()
+            elif kind == "done":
+                _, _, task_id, payload, error, record = msg
+                result = None
+                if payload is not None:
+                    try:
+                        result = decode_result(payload)
+                    except Exception as e:
+                        # 解码失败只算该文档失败；收集线程不能退出，否则所有 Future 都会挂住
+                        logger.warning("prefork result decode failed: task=%s (%r)", task_id, e)
+                        error = e
+                if slot is not None:
+                    slot.task_id = None
+                    slot.stage = None
+                    slot.done += 1
+                if record is not None:
+                    self.memory_records.append(record)
+                if isinstance(error, StageBudgetExceeded) and self._quarantine_task(task_id, error):
+                    continue
+                self._finish_task(task_id, result, error)
+            elif kind == "exit":
+                reason = msg[2]
+                self.recycled[reason] += 1
+                if slot is not None:
+                    slot.process.join(timeout=5)
+                    with self._lock:
+                        self._workers.pop(wid, None)
+                if self.debug and slot is not None:
+                    print(f"♻️ [PREFORK] recycle worker #{wid} reason={reason} docs={slot.done}")
+                self._ensure_workers()
+
+    def _reap_dead_workers(self) -> None:
+        """
+        worker 被 OOM killer 等异常杀死：在途任务置失败并补 fork。
+        正常退出（exitcode=0，回收）的 worker 由 exit 消息处理；异常退出的等 _DEAD_GRACE，
+        让它死前已写入队列的 done 先被读到。
+        """
+        now = time.monotonic()
+        if now - self._last_reap_check < 0.5:
+            return
+        self._last_reap_check = now
+
+        dead: List[_WorkerSlot] = []
+        with self._lock:
+            for wid, slot in list(self._workers.items()):
+                if slot.process.is_alive():
+                    continue
+                if slot.dead_since is None:
+                    slot.dead_since = now
+                if slot.process.exitcode == 0 and slot.task_id is None:
+                    # 回收退出：补 fork 交给 exit 消息，这里只把槽位移走
+                    self._workers.pop(wid, None)
+                    continue
+                if slot.task_id is not None and slot.killed is None and now - slot.dead_since < _DEAD_GRACE:
+                    continue
+                dead.append(slot)
+                self._workers.pop(wid, None)
+        if not dead:
+            return
+        for slot in dead:
+            if slot.killed is not None:
+                self.recycled["stage_budget"] += 1
+            elif slot.process.exitcode != 0:
+                self.recycled["crashed"] += 1
+            if slot.task_id is None:
+                continue
+            if slot.killed is not None and self._quarantine_task(
+                slot.task_id, slot.killed, killed=True
+            ):
+                continue
+            self._finish_task(
+                slot.task_id,
+                None,
+                slot.killed
+                or RuntimeError(
+                    f"prefork worker #{slot.wid} died (exitcode={slot.process.exitcode})"
+                ),
+            )
+        self._ensure_workers()
+
+    # -------------------------
+    # quarantine
+    # -------------------------
+    def _enforce_deadlines(self) -> None:
+        """兜底：阶段超出预算 + kill_grace 仍未结束（信号打断不了的 C 代码）时杀掉 worker。"""
+        if self.quarantine is None:
+            return
+        now = time.monotonic()
+        if now - self._last_deadline_check < 0.5:
+            return
+        self._last_deadline_check = now
+
+        with self._lock:
+            slots = list(self._workers.values())
+        for slot in slots:
+            if slot.task_id is None or slot.stage is None or slot.killed is not None:
+                continue
+            budget = self.quarantine.budgets_for(slot.lane).get(slot.stage)
+            if not budget:
+                continue
+            elapsed = now - slot.stage_started
+            if elapsed > budget + self.quarantine.kill_grace:
+                slot.killed = StageBudgetExceeded(slot.stage, budget, elapsed)
+                logger.warning(
+                    "killing prefork worker #%d: stage %s ran %.1fs (budget %.1fs)",
+                    slot.wid,
+                    slot.stage,
+                    elapsed,
+                    budget,
+                )
+                slot.process.kill()
+
+    def _quarantine_task(self, task_id: int, error: StageBudgetExceeded, *, killed: bool = False) -> bool:
+        """快车道超时的任务转入隔离车道；已在隔离车道的任务返回 False（按失败处理）。"""
+        with self._lock:
+            entry = self._tasks.get(task_id)
+            if self.quarantine is None or entry is None or entry[0] != "fast":
+                return False
+            payload = entry[1]
+            self._tasks[task_id] = ("slow", payload)
+
+        rec = QuarantineRecord(
+            task_id=task_id,
+            source=str(payload[1] or payload[3] or task_id),
+            stage=error.stage,
+            budget=error.budget,
+            elapsed=error.elapsed,
+            killed=killed,
+        )
+        self.quarantined.append(rec)
+        self._quarantine_by_task[task_id] = rec
+        if self.debug:
+            print(f"🚧 [PREFORK] quarantine {rec.source} stage={rec.stage} elapsed={rec.elapsed:.1f}s")
+
+        self._slow_q.put(payload[:-1] + (self.quarantine.budgets_for("slow"),))
+        self._ensure_workers()
+        return True
+
+    # -------------------------
+    # memory admission
+    # -------------------------
+    def _estimate_memory(self, docx_path: Optional[str], file_bytes: Optional[bytes], filename: Optional[str]) -> int:
+        pipe = self.pipeline or _WARM_PIPELINE
+        if pipe is not None:
+            source: Any = docx_path if docx_path is not None else file_bytes
+            return pipe.converter.estimate_memory(source, filename=filename)
+        if docx_path is not None:
+            try:
+                size: Optional[int] = Path(docx_path).stat().st_size
+            except OSError:
+                size = None
+            return ConversionMemoryModel().estimate(size, Path(docx_path).suffix)
+        return ConversionMemoryModel().estimate(source_size(file_bytes), Path(filename or "").suffix)
+
+    def _dispatch_admitted(self) -> None:
+        """按到达顺序放行：队首估算放得进剩余预算（或当前没有在途文档）才进入任务队列，不让小文档插队。"""
+        with self._lock:
+            while self._admission_q:
+                task_id, cost, payload = self._admission_q[0]
+                if self._admitted and self._admitted_bytes + cost > self.memory_budget_bytes:
+                    self.admission_stats["blocked_checks"] += 1
+                    break
+                self._admission_q.popleft()
+                if task_id not in self._tasks:
+                    continue  # 已取消 / 已关闭
+                self._admitted[task_id] = cost
+                self._admitted_bytes += cost
+                self.admission_stats["admitted"] += 1
+                self.admission_stats["peak_in_flight_bytes"] = max(
+                    self.admission_stats["peak_in_flight_bytes"], self._admitted_bytes
+                )
+                self._task_q.put(payload)
+        self._ensure_workers()
+
+    def _release_admission(self, task_id: int) -> None:
+        with self._lock:
+            cost = self._admitted.pop(task_id, None)
+            if cost is None:
+                return
+            self._admitted_bytes = max(0, self._admitted_bytes - cost)
+        self._dispatch_admitted()
+
+    def _finish_task(self, task_id: int, result: Any, error: Optional[BaseException]) -> None:
+        with self._lock:
+            fut = self._futures.pop(task_id, None)
+            if self._tasks.pop(task_id, None) is None and fut is None:
+                # 已经结束过（例如判定 worker 死亡之后才读到它的 done）
+                return
+        self._release_admission(task_id)
+        rec = self._quarantine_by_task.pop(task_id, None)
+        if rec is not None:
+            rec.outcome = "failed" if error is not None else "ok"
+            rec.slow_lane_seconds = time.monotonic() - rec.quarantined_at
+            if error is not None:
+                rec.error = f"{type(error).__name__}: {error}"
+        self.counters["failed" if error is not None else "completed"] += 1
+        if fut is None or fut.done():
+            return
+        if error is not None:
+            fut.set_exception(error)
+        else:
+            fut.set_result(result)
+
+    # -------------------------
+    # submit
+    # -------------------------
+    def submit(
+        self,
+        *,
+        docx_path: Optional[str | Path] = None,
+        file_bytes: Optional[bytes] = None,
+        filename: Optional[str] = None,
+        **run_kwargs: Any,
+    ) -> Future:
+        """提交一个文档；路径优先（只传路径字符串，避免大 bytes 经 pipe 复制）。"""
+        if docx_path is None and file_bytes is None:
+            raise ValueError("submit requires docx_path or file_bytes")
+        self.start()
+
+        task_id = next(self._task_ids)
+        fut: Future = Future()
+        payload = (
+            task_id,
+            str(docx_path) if docx_path is not None else None,
+            file_bytes,
+            filename,
+            run_kwargs,
+            self.quarantine.budgets_for("fast") if self.quarantine else {},
+        )
+        cost = self._estimate_memory(payload[1], file_bytes, filename) if self.memory_budget_bytes else 0
+        with self._lock:
+            self._futures[task_id] = fut
+            self._tasks[task_id] = ("fast", payload)
+            if self.memory_budget_bytes:
+                self._admission_q.append((task_id, cost, payload))
+        self.counters["submitted"] += 1
+        if self.memory_budget_bytes:
+            self._dispatch_admitted()
+            return fut
+        self._task_q.put(payload)
+        self._ensure_workers()
+        return fut
+
+    def iter_run(
+        self,
+        paths: Iterable[str | Path],
+        *,
+        schedule: Literal["fifo", "lpt"] = "fifo",
+        estimator: Optional[DocumentCostEstimator] = None,
+        **run_kwargs: Any,
+    ) -> Iterator[Tuple[Path, PipelineResult | Exception]]:
+        """
+        按完成顺序产出 (path, PipelineResult 或异常)。
+        schedule="lpt"：代价估算在线程池里并发进行，边估算边派发（见 _iter_run_lpt）；
+        worker 空闲时从共享队列取下一篇（work stealing）。
+        """
+        ordered = [Path(p) for p in paths]
+        if schedule == "lpt":
+            yield from self._iter_run_lpt(ordered, estimator or DocumentCostEstimator(), run_kwargs)
+            return
+
+        futures: Dict[Future, Path] = {
+            self.submit(docx_path=p, **run_kwargs): p for p in ordered
+        }
+        for fut in as_completed(futures):
+            yield self._task_outcome(futures[fut], fut)
+
+    def run_all(self, paths: Iterable[str | Path], **run_kwargs: Any) -> List[Tuple[Path, Any]]:
+        return list(self.iter_run(paths, **run_kwargs))
+
+    @staticmethod
+    def _task_outcome(path: Path, fut: Future) -> Tuple[Path, PipelineResult | Exception]:
+        try:
+            return path, fut.result()
+        except Exception as e:
+            logger.warning("prefork worker failed: %s (%r)", path, e)
+            return path, e
+
+    def _iter_run_lpt(
+        self,
+        paths: List[Path],
+        estimator: DocumentCostEstimator,
+        run_kwargs: Dict[str, Any],
+    ) -> Iterator[Tuple[Path, PipelineResult | Exception]]:
+        """
+        在线 LPT：估算在线程池里并发进行，已估算的文档放进按代价排序的堆；
+        在途任务数保持在 worker 数（+ 隔离车道 worker 数），有空位就派发堆里代价最大的一篇。
+        第一批估算一完成 worker 就开始干活，不用等整批估算（夜间 5k 篇的串行前缀）。
+        """
+        t0 = time.perf_counter()
+        events: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        lookahead = self.max_workers + (max(1, self.quarantine.workers) if self.quarantine else 0)
+        heap: List[Tuple[float, int, CostEstimate]] = []
+        inflight: Dict[Future, Path] = {}
+        estimates: List[CostEstimate] = []
+        seq = itertools.count()
+
+        def _estimate_all() -> None:
+            try:
+                for est in estimator.iter_estimates(paths):
+                    events.put(("estimate", est))
+            finally:
+                events.put(("estimated", None))
+
+        threading.Thread(target=_estimate_all, name="prefork-estimator", daemon=True).start()
+
+        estimating = True
+        while estimating or heap or inflight:
+            kind, item = events.get()
+            if kind == "estimate":
+                estimates.append(item)
+                heapq.heappush(heap, (-item.cost, next(seq), item))
+            elif kind == "estimated":
+                estimating = False
+            else:
+                yield self._task_outcome(inflight.pop(item), item)
+
+            while heap and len(inflight) < lookahead:
+                _, _, est = heapq.heappop(heap)
+                fut = self.submit(docx_path=est.path, **run_kwargs)
+                inflight[fut] = est.path
+                fut.add_done_callback(lambda f: events.put(("done", f)))
+
+        self.last_estimates = estimates
+        if self.debug and estimates:
+            fifo, _ = simulate_makespan([e.cost for e in estimates], self.max_workers)
+            lpt, _ = simulate_makespan([e.cost for e in order_lpt(estimates)], self.max_workers)
+            print(
+                f"📐 [PREFORK] lpt docs={len(paths)} total={time.perf_counter() - t0:.2f}s "
+                f"predicted_makespan fifo={fifo:.1f} lpt={lpt:.1f}"
+            )
+
+    # -------------------------
+    # stats
+    # -------------------------
+    def memory_summary(self, *, top: int = 10) -> Dict[str, Any]:
+        summary = summarize_records(self.memory_records, top=top)
+        summary["recycled"] = dict(self.recycled)
+        return summary
+
+    def batch_metrics(self) -> Dict[str, Any]:
+        """批次统计：提交 / 完成 / 失败数，以及隔离车道的文档明细和按阶段计数。"""
+        outcomes = Counter(r.outcome for r in self.quarantined)
+        metrics: Dict[str, Any] = {
+            "submitted": self.counters["submitted"],
+            "completed": self.counters["completed"],
+            "failed": self.counters["failed"],
+            "recycled": dict(self.recycled),
+            "admission": {
+                "budget_mb": self.memory_budget_bytes // _MB,
+                "in_flight_mb": self._admitted_bytes // _MB,
+                "peak_in_flight_mb": self.admission_stats["peak_in_flight_bytes"] // _MB,
+                "waiting": len(self._admission_q),
+                "admitted": self.admission_stats["admitted"],
+            },
+            "quarantine": {
+                "count": len(self.quarantined),
+                "ok": outcomes["ok"],
+                "failed": outcomes["failed"],
+                "pending": outcomes["pending"],
+                "killed": sum(1 for r in self.quarantined if r.killed),
+                "by_stage": dict(Counter(r.stage for r in self.quarantined)),
+                "documents": [asdict(r) for r in self.quarantined],
+            },
+        }
+        if self.checkpoint is not None:
+            ledger = CheckpointLedger(self.checkpoint.path)
+            try:
+                metrics["checkpoint"] = ledger.summary(self.checkpoint.run_id)
+            finally:
+                ledger.close()
+        return metrics
@@ -2,10 +2,29 @@
 from __future__ import annotations
 
 from dataclasses import replace
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 
 from fd_extractai_report.rules.extracting.schema import ExtractRuleSet, ExtractorSpec, validate_ruleset
-from fd_extractai_report.rules.extracting.default_rulesets import DEFAULT_RULESETS
+
+_DEFAULT_RULESETS: Optional[Dict[str, ExtractRuleSet]] = None
+
+
+def _default_rulesets() -> Dict[str, ExtractRuleSet]:
+    # default_rulesets 会 import 全部 examples（构造大量 ExampleData），首次取 ruleset 时才加载
+    global _DEFAULT_RULESETS
+    if _DEFAULT_RULESETS is None:
+        from fd_extractai_report.rules.extracting.default_rulesets import DEFAULT_RULESETS
+
+        _DEFAULT_RULESETS = DEFAULT_RULESETS
+    return _DEFAULT_RULESETS
+
+
+def __getattr__(name: str) -> Any:
+    # 兼容旧的 `from registry import DEFAULT_RULESETS`
+    if name == "DEFAULT_RULESETS":
+        return _default_rulesets()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def merge_ruleset(base: ExtractRuleSet, override: ExtractRuleSet) -> ExtractRuleSet:
     # 1) ruleset-level 覆盖
@@ -44,7 +63,7 @@ def merge_ruleset(base: ExtractRuleSet, override: ExtractRuleSet) -> ExtractRule
     return rs
 
 def get_ruleset(report_type: str, *, override: Optional[ExtractRuleSet] = None) -> ExtractRuleSet:
-    base = DEFAULT_RULESETS.get(report_type)
+    base = _default_rulesets().get(report_type)
     if not base:
         raise KeyError(f"No ExtractRuleSet for report_type={report_type}")
 
@@ -2,13 +2,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Mapping, Optional, Sequence, Union, Literal
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Sequence, Union, Literal
 
-from langextract.core import data
+if TYPE_CHECKING:
+    from langextract.core import data
 
 ExampleSpec = Union[
-    Sequence[data.ExampleData],
-    Mapping[str, Sequence[data.ExampleData]],  # {"house":[...], "fallback":[...]}
+    Sequence["data.ExampleData"],
+    Mapping[str, Sequence["data.ExampleData"]],  # {"house":[...], "fallback":[...]}
 ]
 
 MissingPolicy = Literal["empty", "full", "raise"]
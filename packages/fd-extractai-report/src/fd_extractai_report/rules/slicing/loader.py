@@ -1,12 +1,31 @@
 from __future__ import annotations
 
 import json
+import logging
 from typing import Any, Dict, Optional
 
+from fd_extractai_report.rules.slicing.regex_lint import lint_ruleset
 from fd_extractai_report.rules.slicing.schema import SliceRuleSet, SliceStep
 
+logger = logging.getLogger(__name__)
 
-def ruleset_from_dict(d: Dict[str, Any]) -> SliceRuleSet:
+
+def check_patterns(rs: SliceRuleSet, *, strict: bool = False) -> None:
+    """
+    正则静态检查（见 regex_lint）：默认只打 warning；strict=True 时有问题直接抛 ValueError，
+    适合在规则发布前的校验脚本里用。
+    """
+    issues = lint_ruleset(rs)
+    if not issues:
+        return
+    if strict:
+        msg = "\n".join(f"- {i}" for i in issues)
+        raise ValueError(f"Slicing ruleset has risky patterns: {rs.name}\n{msg}")
+    for issue in issues:
+        logger.warning("slicing ruleset %s: %s", rs.name, issue)
+
+
+def ruleset_from_dict(d: Dict[str, Any], *, strict_patterns: bool = False) -> SliceRuleSet:
     steps = []
     for sd in d.get("steps", []) or []:
         steps.append(
@@ -25,19 +44,20 @@ def ruleset_from_dict(d: Dict[str, Any]) -> SliceRuleSet:
         defaults=dict(d.get("defaults", {}) or {}),
         steps=steps,
     )
+    check_patterns(rs, strict=strict_patterns)
     return rs
 
 
-def ruleset_from_json_text(text: str) -> SliceRuleSet:
-    return ruleset_from_dict(json.loads(text))
+def ruleset_from_json_text(text: str, *, strict_patterns: bool = False) -> SliceRuleSet:
+    return ruleset_from_dict(json.loads(text), strict_patterns=strict_patterns)
 
 
-def ruleset_from_json_file(path: str) -> SliceRuleSet:
+def ruleset_from_json_file(path: str, *, strict_patterns: bool = False) -> SliceRuleSet:
     with open(path, "r", encoding="utf-8") as f:
-        return ruleset_from_json_text(f.read())
+        return ruleset_from_json_text(f.read(), strict_patterns=strict_patterns)
 
 
-def ruleset_from_yaml_text(text: str) -> SliceRuleSet:
+def ruleset_from_yaml_text(text: str, *, strict_patterns: bool = False) -> SliceRuleSet:
     """
     可选：需要 PyYAML（yaml）依赖。没有安装就抛出清晰错误。
     """
@@ -49,9 +69,9 @@ def ruleset_from_yaml_text(text: str) -> SliceRuleSet:
     data = yaml.safe_load(text) or {}
     if not isinstance(data, dict):
         raise ValueError("YAML ruleset root must be a mapping/dict.")
-    return ruleset_from_dict(data)
+    return ruleset_from_dict(data, strict_patterns=strict_patterns)
 
 
-def ruleset_from_yaml_file(path: str) -> SliceRuleSet:
+def ruleset_from_yaml_file(path: str, *, strict_patterns: bool = False) -> SliceRuleSet:
     with open(path, "r", encoding="utf-8") as f:
-        return ruleset_from_yaml_text(f.read())
\ No newline at end of file
+        return ruleset_from_yaml_text(f.read(), strict_patterns=strict_patterns)
\ No newline at end of file
@@ -0,0 +1,157 @@
+"""
+切片正则的静态检查：ruleset 加载时找出容易灾难性回溯的写法，运行前就提示。
+
+检查项（基于 re 的语法树，不执行匹配）：
+- nested_quantifier：无上限重复里再套可变长的无上限重复，如 (a+)+、(\\s*\\S+)*
+- dotstar_in_alternation：分支里有 .* / .+，如 (甲.*乙|丙)
+- leading_dotstar：模式以 .* / .+ 开头，search / finditer 在不命中的长行上是平方级
+- invalid：编译失败（运行时会被静默跳过）
+
+只做提示：命中不代表一定会卡死，也不保证没命中的就安全；运行时由 step 时间预算兜底。
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Iterator, List, Tuple
+
+try:
+    from re import _parser as _sre_parse  # type: ignore[attr-defined]  # 3.11+
+    from re import _constants as _sre_const  # type: ignore[attr-defined]
+except ImportError:  # pragma: no cover - 3.10 及以下
+    import sre_constants as _sre_const  # type: ignore[no-redef]
+    import sre_parse as _sre_parse  # type: ignore[no-redef]
+
+from fd_extractai_report.rules.slicing.schema import (
+    MODE_BY_REGEX_BETWEEN,
+    MODE_BY_REGEX_BLOCK,
+    MODE_BY_SEGMENT_TABLES,
+    MODE_BY_WINDOW_AFTER,
+    SliceRuleSet,
+    SliceStep,
+)
+
+_MAXREPEAT = _sre_const.MAXREPEAT
+_REPEATS = {_sre_const.MAX_REPEAT, _sre_const.MIN_REPEAT}
+# 原子组 / 占有量词内部不会回溯
+_ATOMIC = {getattr(_sre_const, "ATOMIC_GROUP", None), getattr(_sre_const, "POSSESSIVE_REPEAT", None)} - {None}
+
+
+@dataclass(frozen=True)
+class PatternIssue:
+    step: str
+    field: str  # targets / ends / skip_if_line_matches
+    pattern: str
+    kind: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"steps({self.step}).{self.field} {self.kind}: {self.pattern!r} ({self.message})"
+
+
+# -------------------------
+# 语法树遍历
+# -------------------------
+def _children(op: Any, av: Any) -> Iterator[Any]:
+    """op 节点下的子模式（SubPattern）。"""
+    if op in _REPEATS:
+        yield av[2]
+    elif op is _sre_const.SUBPATTERN:
+        yield av[-1]
+    elif op is _sre_const.BRANCH:
+        yield from av[1]
+    elif op in (_sre_const.ASSERT, _sre_const.ASSERT_NOT):
+        yield av[1]
+    elif op is _sre_const.GROUPREF_EXISTS:
+        yield av[1]
+        if av[2] is not None:
+            yield av[2]
+
+
+def _walk(sub: Any) -> Iterator[Tuple[Any, Any]]:
+    for op, av in sub:
+        yield op, av
+        if op in _ATOMIC:
+            continue
+        for child in _children(op, av):
+            yield from _walk(child)
+
+
+def _is_unbounded_repeat(op: Any, av: Any) -> bool:
+    return op in _REPEATS and av[1] == _MAXREPEAT
+
+
+def _is_dotstar(op: Any, av: Any) -> bool:
+    if not _is_unbounded_repeat(op, av):
+        return False
+    body = list(av[2])
+    return len(body) == 1 and body[0][0] is _sre_const.ANY
+
+
+def lint_pattern(pattern: str, flags: int = 0) -> List[Tuple[str, str]]:
+    """返回 [(kind, message), ...]；空列表表示没发现问题。"""
+    try:
+        tree = _sre_parse.parse(pattern, flags)
+    except re.error as e:
+        return [("invalid", str(e))]
+
+    issues: List[Tuple[str, str]] = []
+    seen = set()
+
+    def _add(kind: str, message: str) -> None:
+        if kind not in seen:
+            seen.add(kind)
+            issues.append((kind, message))
+
+    nodes = list(tree)
+    if nodes and _is_dotstar(*nodes[0]):
+        _add("leading_dotstar", "starts with .* / .+; unmatched long lines cost O(n^2)")
+
+    for op, av in _walk(tree):
+        if _is_unbounded_repeat(op, av) and any(
+            _is_unbounded_repeat(iop, iav) and iav[0] != iav[1] for iop, iav in _walk(av[2])
+        ):
+            _add("nested_quantifier", "unbounded repeat nested in an unbounded repeat")
+        if op is _sre_const.BRANCH and any(
+            _is_dotstar(iop, iav) for alt in av[1] for iop, iav in _walk(alt)
+        ):
+            _add("dotstar_in_alternation", ".* / .+ inside an alternation branch")
+    return issues
+
+
+# -------------------------
+# ruleset
+# -------------------------
+def step_patterns(step: SliceStep, defaults: Any = None) -> Iterator[Tuple[str, str]]:
+    """step 中按正则使用的字段：(field, pattern)；与 RuleEngineSlicer 各 mode 的编译规则一致。"""
+    p = {**(defaults or {}), **(step.params or {})}
+    targets = [t for t in (step.targets or []) if isinstance(t, str) and t.strip()]
+
+    if step.mode in (MODE_BY_REGEX_BLOCK, MODE_BY_SEGMENT_TABLES):
+        for t in targets:
+            yield "targets", t
+    elif step.mode == MODE_BY_WINDOW_AFTER:
+        if p.get("anchor_regex", False):
+            for t in targets:
+                yield "targets", t
+    elif step.mode == MODE_BY_REGEX_BETWEEN:
+        # loose_space 时起止锚点按字面量处理
+        if not p.get("loose_space", False):
+            for t in targets:
+                yield "targets", t
+            for t in p.get("ends") or []:
+                if isinstance(t, str) and t.strip():
+                    yield "ends", t
+        for t in p.get("skip_if_line_matches") or []:
+            if isinstance(t, str) and t.strip():
+                yield "skip_if_line_matches", t
+
+
+def lint_ruleset(rs: SliceRuleSet) -> List[PatternIssue]:
+    out: List[PatternIssue] = []
+    for step in rs.steps or []:
+        for field_name, pattern in step_patterns(step, rs.defaults):
+            for kind, message in lint_pattern(pattern):
+                out.append(PatternIssue(step.key, field_name, pattern, kind, message))
+    return out
@@ -1,10 +1,26 @@
 # app/report/rules/slicing/registry.py
 from __future__ import annotations
 
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from fd_extractai_report.rules.slicing.schema import SliceRuleSet, merge_rulesets
-from fd_extractai_report.rules.slicing.default_rulesets import DEFAULT_RULESETS_BY_TYPE
+
+_DEFAULT_RULESETS_BY_TYPE: Optional[Dict[str, SliceRuleSet]] = None
+
+
+def _default_rulesets() -> Dict[str, SliceRuleSet]:
+    global _DEFAULT_RULESETS_BY_TYPE
+    if _DEFAULT_RULESETS_BY_TYPE is None:
+        from fd_extractai_report.rules.slicing.default_rulesets import DEFAULT_RULESETS_BY_TYPE
+
+        _DEFAULT_RULESETS_BY_TYPE = DEFAULT_RULESETS_BY_TYPE
+    return _DEFAULT_RULESETS_BY_TYPE
+
+
+def __getattr__(name: str) -> Any:
+    if name == "DEFAULT_RULESETS_BY_TYPE":
+        return _default_rulesets()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def validate_ruleset(rs: SliceRuleSet) -> None:
@@ -21,7 +37,7 @@ def merge_ruleset(base: SliceRuleSet, override: SliceRuleSet) -> SliceRuleSet:
 
 
 def get_ruleset(report_type: str, *, override: Optional[SliceRuleSet] = None) -> SliceRuleSet:
-    base = DEFAULT_RULESETS_BY_TYPE.get(report_type)
+    base = _default_rulesets().get(report_type)
     if not base:
         raise KeyError(f"No SliceRuleSet for report_type={report_type}")
 
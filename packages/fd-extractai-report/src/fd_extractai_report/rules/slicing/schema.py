@@ -138,6 +138,14 @@ class SliceRuleSet:
             # ---- mode-specific 校验 ----
             p = s.params or {}
 
+            time_budget = p.get("time_budget")
+            if time_budget is not None and (
+                isinstance(time_budget, bool)
+                or not isinstance(time_budget, (int, float))
+                or time_budget <= 0
+            ):
+                errors.append(f"{step_tag}.params.time_budget must be a number > 0 (seconds)")
+
             if s.mode == MODE_BY_WINDOW_AFTER:
                 # 至少要有 anchor
                 if not _is_non_empty_str_list(s.targets):
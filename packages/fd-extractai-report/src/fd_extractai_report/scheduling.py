@@ -0,0 +1,229 @@
+"""
+批处理调度：先低成本估算每篇文档的处理代价，再按最长处理时间优先（LPT）排队。
+worker 从同一个队列按序取任务，空闲即“偷”下一篇最大的文档（work stealing），
+避免 FIFO 下巨型报告在夜间批次最后独自运行拉长总耗时（makespan）。
+
+代价估算只用廉价特征：
+- 文件大小
+- 页数：PDF 读 catalog 的 /Pages /Count（不遍历页树）；DOCX 读 docProps/app.xml 的 <Pages>（Word 保存时写入）
+- 报告类型：转换文档头部（DOCX 前若干块 / PDF 第一页）做类型识别，换算成启用的抽取器数量
+PDF 的页数和首页文本共用一次打开 / 一次 xref 解析。
+估算是 I/O + pdfminer 的混合负载，iter_estimates 在线程池里并发估算、按完成顺序产出，
+调度方可以边估算边派发（见 PreforkWorkerPool.iter_run），worker 不必等整批估算完。
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import os
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from io import StringIO
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from fd_extractai_report.detectors import BaseDetector, ReportTypeDetector
+
+
+logger = logging.getLogger(__name__)
+
+_DOCX_PAGES_RE = re.compile(rb"<Pages>(\d+)</Pages>")
+
+
+@dataclass(frozen=True)
+class CostModel:
+    """代价 = max(页数 * per_page, MB * per_mb) + 抽取器数 * per_extractor。单位为“估算秒”，只用于排序。"""
+
+    per_page: float = 0.3
+    per_mb: float = 2.0
+    per_extractor: float = 8.0
+    default_extractors: int = 4
+
+
+@dataclass
+class CostEstimate:
+    path: Path
+    size: int = 0
+    pages: Optional[int] = None
+    report_type: Optional[str] = None
+    extractors: Optional[int] = None
+    cost: float = 0.0
+    features: Dict[str, Any] = field(default_factory=dict)
+
+
+def docx_page_count(path: Path) -> Optional[int]:
+    try:
+        with zipfile.ZipFile(path) as zf:
+            m = _DOCX_PAGES_RE.search(zf.read("docProps/app.xml"))
+    except (KeyError, OSError, zipfile.BadZipFile):
+        return None
+    return int(m.group(1)) if m else None
+
+
+def _pdf_probe(path: Path, *, head: bool) -> Tuple[Optional[int], str]:
+    """一次打开 PDF：页数取 catalog 的 /Pages /Count，head=True 时只解析第一页的文本。"""
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+    from pdfminer.pdfparser import PDFParser
+
+    from fd_extractai_report.converters.pdf_parallel import catalog_page_count
+
+    with path.open("rb") as fp:
+        document = PDFDocument(PDFParser(fp))
+        pages = catalog_page_count(document)
+        if not head:
+            return pages, ""
+        out = StringIO()
+        rsrc = PDFResourceManager()
+        device = TextConverter(rsrc, out, laparams=LAParams())
+        try:
+            interpreter = PDFPageInterpreter(rsrc, device)
+            for page in PDFPage.create_pages(document):
+                interpreter.process_page(page)
+                break
+        finally:
+            device.close()
+        return pages, out.getvalue()
+
+
+def pdf_page_count(path: Path) -> Optional[int]:
+    try:
+        return _pdf_probe(path, head=False)[0]
+    except Exception as e:
+        logger.debug("pdf page count failed: %s (%r)", path, e)
+        return None
+
+
+def _head_markdown(path: Path, *, head_blocks: int = 80) -> str:
+    suffix = path.suffix.lower()
+    if suffix == ".docx":
+        from fd_extractai_report.converters.docx_reader import iter_docx_blocks
+
+        blocks: List[str] = []
+        for block in iter_docx_blocks(path):
+            blocks.append(block)
+            if len(blocks) >= head_blocks:
+                break
+        return "\n\n".join(blocks)
+
+    if suffix == ".pdf":
+        return _pdf_probe(path, head=True)[1]
+    return ""
+
+
+def _enabled_extractors(report_type: str) -> Optional[int]:
+    from fd_extractai_report.rules.extracting.registry import get_ruleset
+
+    try:
+        rs = get_ruleset(report_type)
+    except (KeyError, ValueError):
+        return None
+    return sum(1 for e in rs.extractors if e.enabled)
+
+
+class DocumentCostEstimator:
+    def __init__(
+        self,
+        *,
+        model: Optional[CostModel] = None,
+        detector: Optional[BaseDetector] = None,
+        head_detect: bool = True,
+        head_chars: int = 2000,
+        max_workers: int = 0,
+    ) -> None:
+        self.model = model or CostModel()
+        self.detector = detector or ReportTypeDetector()
+        self.head_detect = head_detect
+        self.head_chars = head_chars
+        # 并发估算的线程数；0 表示 min(32, cpu + 4)（与 ThreadPoolExecutor 默认一致）
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+
+    def estimate(self, path: str | Path) -> CostEstimate:
+        p = Path(path)
+        est = CostEstimate(path=p)
+        try:
+            est.size = p.stat().st_size
+        except OSError:
+            return est
+
+        suffix = p.suffix.lower()
+        head = ""
+        if suffix == ".docx":
+            est.pages = docx_page_count(p)
+        elif suffix == ".pdf":
+            try:
+                est.pages, head = _pdf_probe(p, head=self.head_detect)
+            except Exception as e:
+                logger.debug("pdf probe failed: %s (%r)", p, e)
+
+        if self.head_detect:
+            if suffix != ".pdf":
+                try:
+                    head = _head_markdown(p)
+                except Exception as e:
+                    logger.debug("head conversion failed: %s (%r)", p, e)
+            if head.strip():
+                est.report_type = self.detector.detect(head, head_chars=self.head_chars).report_type
+                est.extractors = _enabled_extractors(est.report_type)
+
+        m = self.model
+        # app.xml 的页数可能过期（非 Word 生成的文件常写 1），与按大小的估算取大者
+        base = max((est.pages or 0) * m.per_page, est.size / (1024 * 1024) * m.per_mb)
+        extractors = est.extractors if est.extractors is not None else m.default_extractors
+        est.cost = base + extractors * m.per_extractor
+        est.features = {"base": base, "extractors": extractors}
+        return est
+
+    def _estimate_safe(self, path: str | Path) -> CostEstimate:
+        try:
+            return self.estimate(path)
+        except Exception as e:
+            # 估算失败不影响调度：代价按 0 计，排在最后
+            logger.debug("cost estimate failed: %s (%r)", path, e)
+            return CostEstimate(path=Path(path))
+
+    def iter_estimates(self, paths: Iterable[str | Path]) -> Iterator[CostEstimate]:
+        """线程池并发估算，按完成顺序产出。"""
+        items = list(paths)
+        if self.max_workers <= 1 or len(items) <= 1:
+            for p in items:
+                yield self._estimate_safe(p)
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cost-estimate") as pool:
+            futures = [pool.submit(self._estimate_safe, p) for p in items]
+            for fut in as_completed(futures):
+                yield fut.result()
+
+    def estimate_many(self, paths: Iterable[str | Path]) -> List[CostEstimate]:
+        """并发估算，结果保持输入顺序。"""
+        items = list(paths)
+        if self.max_workers <= 1 or len(items) <= 1:
+            return [self._estimate_safe(p) for p in items]
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cost-estimate") as pool:
+            return list(pool.map(self._estimate_safe, items))
+
+
+def order_lpt(estimates: Sequence[CostEstimate]) -> List[CostEstimate]:
+    """最长处理时间优先；代价相同时保持原顺序。"""
+    return sorted(estimates, key=lambda e: -e.cost)
+
+
+def simulate_makespan(costs: Sequence[float], workers: int) -> Tuple[float, List[float]]:
+    """
+    按给定顺序模拟“空闲 worker 取下一个任务”的调度，返回 (makespan, 各 worker 负载)。
+    用于比较 FIFO 与 LPT 排序的预计总耗时。
+    """
+    n = max(1, int(workers or 1))
+    heap: List[Tuple[float, int]] = [(0.0, i) for i in range(n)]
+    loads = [0.0] * n
+    for c in costs:
+        load, i = heapq.heappop(heap)
+        loads[i] = load + c
+        heapq.heappush(heap, (loads[i], i))
+    return max(loads), loads
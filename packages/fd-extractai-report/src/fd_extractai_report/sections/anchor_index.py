@@ -0,0 +1,181 @@
+"""
+文档级锚点索引：一次 slice() 内，所有 step 共用同一份“锚点 X 出现在哪”的答案。
+
+- 字面量锚点（by_window_after / by_table_after 的标题）：各 mode 只用首次出现位置，记录 text.find 的结果
+- 正则锚点（by_regex_between 起止、by_segment_tables、anchor_regex）：记录全文 finditer 的命中
+- 构建：RuleEngineSlicer.slice() 用 AnchorIndex(full) 按需建索引，锚点首次查询时扫描并缓存，
+  扫描算在第一个用到它的 step 里（受 step 时间预算约束）；
+  AnchorIndex.build(full, literals, patterns) 可对 ruleset 中作用于全文的锚点预先各扫一遍
+
+查询与直接扫描逐字节等价：
+- base 就是全文（同一个 str 对象）时直接用索引；finditer(pos) 取 start >= pos 的命中，
+  若有命中跨过 pos（全文扫描会吞掉 pos 附近的匹配）则退回直接扫描
+- base 是 within 切片（全文的子串）时，正则的 ^ / $ / 环视在边界处语义不同，
+  按 (锚点, base) 缓存直接扫描的结果，同一切片上的多个 step 只扫一次
+
+loose_space 锚点（LoosePattern）在归一化视图上查找；视图按 base 文本缓存，每篇文档 / 每个切片只算一次。
+
+不合并成一个大 alternation：那样无法报告相互重叠的锚点（如“估价结果”与“估价结果报告”）。
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fd_extractai_report.text.normalized import LoosePattern, NormalizedText
+
+
+_PatternKey = Tuple[str, int]
+
+# (锚点, 耗时秒, 命中数, 实际扫描字符数)；命中缓存的查询扫描字符数为 0
+AnchorObserver = Callable[[str, float, int, int], None]
+
+
+def _pattern_key(pat: Any) -> _PatternKey:
+    return pat.pattern, pat.flags
+
+
+class AnchorIndex:
+    """
+    full=None 时不建索引，所有查询直接扫描传入的 text（用于对照测试 / 关闭索引）；
+    loose_space 的归一化视图仍按文本缓存，一次 slice() 内每个 base 只归一化一次。
+    """
+
+    def __init__(self, full: Optional[str] = None) -> None:
+        self.full = full
+        self._literals: Dict[str, int] = {}
+        self._scoped_literals: Dict[Tuple[str, str], int] = {}
+        self._matches: Dict[_PatternKey, Tuple[List[Any], List[int]]] = {}
+        self._scoped: Dict[Tuple[_PatternKey, str], List[Any]] = {}
+        self._views: Dict[str, NormalizedText] = {}
+        self.stats = {"indexed": 0, "index_hits": 0, "scans": 0, "scanned_chars": 0}
+        # 切片画像：由 RuleEngineSlicer 在每个 step 执行期间挂上
+        self.observer: Optional[AnchorObserver] = None
+
+    @classmethod
+    def build(
+        cls,
+        full: str,
+        literals: Iterable[str] = (),
+        patterns: Iterable[Any] = (),
+    ) -> "AnchorIndex":
+        index = cls(full)
+        for s in literals:
+            index._literal_first(s)
+        for pat in patterns:
+            index._full_matches(pat)
+        return index
+
+    # -------------------------
+    # build
+    # -------------------------
+    def _literal_first(self, s: str) -> int:
+        pos = self._literals.get(s)
+        if pos is None:
+            pos = (self.full or "").find(s)
+            self._literals[s] = pos
+            self.stats["indexed"] += 1
+            self.stats["scanned_chars"] += len(self.full or "")
+        return pos
+
+    def normalized(self, text: str) -> NormalizedText:
+        """text 的归一化视图，按文本缓存；不建索引（full=None）时也缓存，视图不是命中结果，不影响对照。"""
+        view = self._views.get(text)
+        if view is None:
+            view = NormalizedText(text)
+            self._views[text] = view
+        return view
+
+    def _scan(self, pat: Any, text: str, pos: int = 0) -> List[Any]:
+        self.stats["scanned_chars"] += max(0, len(text) - pos)
+        if isinstance(pat, LoosePattern):
+            return pat.finditer(text, pos, view=self.normalized(text))
+        return list(pat.finditer(text, pos))
+
+    def _full_matches(self, pat: Any) -> Tuple[List[Any], List[int]]:
+        key = _pattern_key(pat)
+        entry = self._matches.get(key)
+        if entry is None:
+            matches = self._scan(pat, self.full or "")
+            entry = (matches, [m.start() for m in matches])
+            self._matches[key] = entry
+            self.stats["indexed"] += 1
+        return entry
+
+    # -------------------------
+    # queries
+    # -------------------------
+    def find(self, s: str, text: str) -> int:
+        """等价于 text.find(s)。"""
+        if self.observer is None:
+            return self._find(s, text)
+        scanned = self.stats["scanned_chars"]
+        t0 = perf_counter()
+        pos = self._find(s, text)
+        self.observer(s, perf_counter() - t0, int(pos >= 0), self.stats["scanned_chars"] - scanned)
+        return pos
+
+    def _find(self, s: str, text: str) -> int:
+        if self.full is not None and text is self.full:
+            self.stats["index_hits"] += 1
+            return self._literal_first(s)
+        key = (s, text)
+        pos = self._scoped_literals.get(key)
+        if pos is None:
+            self.stats["scans"] += 1
+            self.stats["scanned_chars"] += len(text)
+            pos = text.find(s)
+            if self.full is not None:
+                self._scoped_literals[key] = pos
+        else:
+            self.stats["index_hits"] += 1
+        return pos
+
+    def finditer(self, pat: Any, text: str, pos: int = 0) -> List[Any]:
+        """等价于 list(pat.finditer(text, pos))；pat 为 re.Pattern 或 LoosePattern。"""
+        if self.observer is None:
+            return self._finditer(pat, text, pos)
+        scanned = self.stats["scanned_chars"]
+        t0 = perf_counter()
+        matches = self._finditer(pat, text, pos)
+        self.observer(pat.pattern, perf_counter() - t0, len(matches), self.stats["scanned_chars"] - scanned)
+        return matches
+
+    def _finditer(self, pat: Any, text: str, pos: int = 0) -> List[Any]:
+        if self.full is None:
+            self.stats["scans"] += 1
+            return self._scan(pat, text, pos)
+
+        if text is self.full:
+            matches, starts = self._full_matches(pat)
+            if not pos:
+                self.stats["index_hits"] += 1
+                return matches
+            i = bisect_left(starts, pos)
+            if i == 0 or matches[i - 1].end() <= pos:
+                self.stats["index_hits"] += 1
+                return matches[i:]
+            # 有命中跨过 pos：从 pos 起扫描的结果可能不同
+            self.stats["scans"] += 1
+            return self._scan(pat, text, pos)
+
+        if pos:
+            self.stats["scans"] += 1
+            return self._scan(pat, text, pos)
+        key = (_pattern_key(pat), text)
+        cached = self._scoped.get(key)
+        if cached is None:
+            self.stats["scans"] += 1
+            cached = self._scan(pat, text)
+            self._scoped[key] = cached
+        else:
+            self.stats["index_hits"] += 1
+        return cached
+
+    def search(self, pat: Any, text: str) -> Optional[Any]:
+        """等价于 pat.search(text)（finditer 的第一个命中就是 search 的结果）。"""
+        matches = self.finditer(pat, text)
+        return matches[0] if matches else None
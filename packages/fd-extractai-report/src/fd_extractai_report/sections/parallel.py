@@ -0,0 +1,335 @@
+"""
+RuleEngineSlicer 的多进程执行：1~2M 字符的大文档上，正则密集的 step 在 GIL 下要跑数秒纯 CPU。
+
+- markdown 以 UTF-8 写入 multiprocessing.shared_memory，worker 每个文档只解码一次，不随任务 pickle
+- 任务粒度是 (step, base_text)；base_text 能在 markdown 里找到时只传 (offset, length)
+- worker 只回传切片相对 base_text 的 (offset, length) 与 metadata，父进程按 base_text 还原正文
+- 调度按 within 依赖分波：step 只依赖排在它前面、key 等于其 within 的 step；
+  同一波内的任务并行，结果按 (step 顺序, base 顺序) 写回 context，与串行执行完全一致
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+
+from fd_extractai_report.context import ReportContext, ReportSection
+from fd_extractai_report.rules.slicing.schema import SliceRuleSet, SliceStep
+from fd_extractai_report.sections.anchor_index import AnchorIndex
+from fd_extractai_report.sections.rule_stats import DocumentHits
+from fd_extractai_report.sections.slice_profile import SliceProfiler
+
+if TYPE_CHECKING:
+    from fd_extractai_report.sections.rule_engine_slicer import RuleEngineSlicer
+
+
+logger = logging.getLogger(__name__)
+
+# base_text 的引用：(offset, length) 指向共享 markdown，或直接内联的正文
+BaseRef = Union[Tuple[int, int], str]
+
+_EXECUTORS: Dict[int, ProcessPoolExecutor] = {}
+_EXECUTORS_LOCK = threading.Lock()
+
+# worker 侧：最近一次附加的共享 markdown（shm 名, 解码后的 str, 该文档的锚点索引）
+_WORKER_MARKDOWN: Tuple[Optional[str], str, Optional[AnchorIndex]] = (None, "", None)
+
+
+def _reset_executors_after_fork() -> None:
+    # 子进程不能复用父进程的进程池（管道与管理线程都不属于它）
+    global _EXECUTORS_LOCK, _WORKER_MARKDOWN
+    _EXECUTORS_LOCK = threading.Lock()
+    _EXECUTORS.clear()
+    _WORKER_MARKDOWN = (None, "", None)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_executors_after_fork)
+
+
+@dataclass(frozen=True)
+class ParallelSlicing:
+    """
+    workers：进程数，<=1 时不并行
+    min_chars：markdown 短于该长度时走串行（进程间往返的开销比正则本身还大）
+    daemonic 进程（如 prefork worker）不能再创建子进程，总是走串行
+    """
+
+    workers: int = 4
+    min_chars: int = 200_000
+
+    def enabled_for(self, markdown: str) -> bool:
+        return (
+            self.workers > 1
+            and len(markdown or "") >= self.min_chars
+            and not multiprocessing.current_process().daemon
+        )
+
+
+def get_slice_executor(workers: int) -> ProcessPoolExecutor:
+    """进程内按 workers 共享的进程池，首次使用时创建。"""
+    with _EXECUTORS_LOCK:
+        ex = _EXECUTORS.get(workers)
+        if ex is None:
+            # 先拉起 resource tracker，worker 继承同一个 tracker：
+            # worker 附加 shm 时的登记不会在 worker 退出时把段提前 unlink
+            resource_tracker.ensure_running()
+            ex = ProcessPoolExecutor(max_workers=workers)
+            _EXECUTORS[workers] = ex
+        return ex
+
+
+def shutdown_slice_executors() -> None:
+    with _EXECUTORS_LOCK:
+        executors = list(_EXECUTORS.values())
+        _EXECUTORS.clear()
+    for ex in executors:
+        ex.shutdown(wait=True, cancel_futures=True)
+
+
+class SharedMarkdown:
+    """把 markdown 放进共享内存；with 结束时释放。"""
+
+    def __init__(self, markdown: str) -> None:
+        raw = (markdown or "").encode("utf-8")
+        self.size = len(raw)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, self.size))
+        self._shm.buf[: self.size] = raw
+        self.name = self._shm.name
+
+    def close(self) -> None:
+        if self._shm is None:
+            return
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+        self._shm = None
+
+    def __enter__(self) -> "SharedMarkdown":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+# ============================================================
+# worker
+# ============================================================
+
+
+def _attach_markdown(name: str, size: int) -> Tuple[str, AnchorIndex]:
+    """返回 (markdown, 锚点索引)；索引在同一 worker 的同一文档内跨任务共享，按需补扫。"""
+    global _WORKER_MARKDOWN
+    cached_name, text, anchors = _WORKER_MARKDOWN
+    if cached_name == name and anchors is not None:
+        return text, anchors
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        text = bytes(shm.buf[:size]).decode("utf-8")
+    finally:
+        shm.close()
+    anchors = AnchorIndex(text)
+    _WORKER_MARKDOWN = (name, text, anchors)
+    return text, anchors
+
+
+def _locate_rows(sections: List[ReportSection], base: str) -> List[list]:
+    """[[key, title, offset, length 或正文, metadata], ...]，offset 相对 base；找不到时 offset=-1 并内联正文。"""
+    rows: List[list] = []
+    cursor = 0
+    for s in sections:
+        text = s.text or ""
+        pos = base.find(text, cursor) if text else -1
+        if pos < 0 and text:
+            pos = base.find(text)
+        if pos >= 0:
+            cursor = pos
+            rows.append([s.key, s.title, pos, len(text), s.metadata])
+        else:
+            rows.append([s.key, s.title, -1, text, s.metadata])
+    return rows
+
+
+def _run_step_task(
+    shm_name: str,
+    shm_size: int,
+    ruleset: SliceRuleSet,
+    step: SliceStep,
+    base_ref: BaseRef,
+    base_scope: str,
+    base_idx: int,
+    debug: bool,
+    step_budget: Optional[float] = None,
+    profile: bool = False,
+    rule_stats: bool = False,
+) -> Dict[str, Any]:
+    """
+    返回 {"rows": 切片行, "timeouts": 超时记录, "profile": 画像, "hits": 锚点命中}：
+    超时记录由父进程写回 ctx.metadata["slice_timeouts"]；画像（profile=True）合并进 slicer.profiler；
+    锚点命中（rule_stats=True）合并进本篇文档的 DocumentHits。
+    """
+    from fd_extractai_report.sections.rule_engine_slicer import RuleEngineSlicer, SliceRun
+
+    markdown, anchors = _attach_markdown(shm_name, shm_size)
+    if isinstance(base_ref, str):
+        base = base_ref
+    else:
+        offset, length = base_ref
+        # 整篇时切片返回同一个 str 对象，锚点索引据此直接命中
+        base = markdown[offset : offset + length]
+
+    profiler = SliceProfiler() if profile else None
+    slicer = RuleEngineSlicer(ruleset, debug=debug, step_budget=step_budget, profiler=profiler)
+    run = SliceRun(
+        context=ReportContext(),
+        ruleset=ruleset,
+        anchors=anchors,
+        hits=DocumentHits() if rule_stats else None,
+    )
+    sections = list(
+        slicer._run_step(run, step, base, base_scope=base_scope, base_idx=base_idx)
+    )
+    return {
+        "rows": _locate_rows(sections, base),
+        "timeouts": run.context.metadata.get("slice_timeouts", []),
+        "profile": profiler.to_dict() if profiler is not None else None,
+        "hits": run.hits,
+    }
+
+
+def _rows_to_sections(rows: List[list], base: str) -> List[ReportSection]:
+    out: List[ReportSection] = []
+    for key, title, offset, length_or_text, metadata in rows:
+        text = base[offset : offset + length_or_text] if offset >= 0 else length_or_text
+        out.append(ReportSection(key=key, title=title, text=text, metadata=metadata or {}))
+    return out
+
+
+# ============================================================
+# parent：分波调度
+# ============================================================
+
+
+def step_waves(steps: List[SliceStep]) -> List[List[int]]:
+    """按 within 依赖给 step 分波：wave(j) = 1 + max(wave(i) | i < j 且 steps[i].key == steps[j].within)。"""
+    levels: List[int] = []
+    for j, step in enumerate(steps):
+        level = 0
+        if step.within:
+            for i in range(j):
+                if steps[i].key == step.within:
+                    level = max(level, levels[i] + 1)
+        levels.append(level)
+    waves: List[List[int]] = [[] for _ in range(max(levels) + 1)] if levels else []
+    for j, level in enumerate(levels):
+        waves[level].append(j)
+    return waves
+
+
+def _base_texts(
+    slicer: "RuleEngineSlicer",
+    ctx: ReportContext,
+    full: str,
+    steps: List[SliceStep],
+    j: int,
+    existing: Dict[str, List[ReportSection]],
+    produced: Dict[int, List[ReportSection]],
+) -> List[str]:
+    """与 RuleEngineSlicer._resolve_base_texts 同义，但只看排在 step j 之前的产出（不受同波后续 step 影响）。"""
+    step = steps[j]
+    if not step.within:
+        return [full]
+
+    src = list(existing.get(step.within) or [])
+    for i in range(j):
+        src.extend(s for s in produced.get(i, []) if (s.key or "").strip() == step.within)
+    if not src:
+        if step.missing == "raise":
+            raise KeyError(f"within slice '{step.within}' missing for step '{step.key}'")
+        if step.missing == "full":
+            slicer._dbg(ctx, f"   🔁 within '{step.within}' missing -> fallback to __full__")
+            return [full]
+        return []
+    return [s.text for s in src if s and s.text]
+
+
+def run_steps_parallel(
+    slicer: "RuleEngineSlicer",
+    ctx: ReportContext,
+    ruleset: SliceRuleSet,
+    full: str,
+    parallel: ParallelSlicing,
+    executor: Optional[Executor] = None,
+    hits: Optional[DocumentHits] = None,
+) -> List[Tuple[int, List[ReportSection]]]:
+    """
+    返回 [(step 序号, 该 step 产出的切片), ...]，按 step 顺序排列；
+    调用方负责按序 add_slice，保证与串行结果一致。
+    hits 不为空时，worker 记录的锚点命中在全部完成后合并进去。
+    """
+    steps = list(ruleset.steps)
+    existing = {k: list(v or []) for k, v in (ctx.slices or {}).items()}
+    produced: Dict[int, List[ReportSection]] = {}
+    debug = slicer.debug or bool((ctx.metadata or {}).get("debug_slice"))
+    ex = executor or get_slice_executor(parallel.workers)
+
+    timed_out: List[dict] = []
+    profiles: List[Dict[str, Any]] = []
+    doc_hits: List[DocumentHits] = []
+    with SharedMarkdown(full) as shm:
+        for wave in step_waves(steps):
+            jobs: List[Tuple[int, str, Any]] = []
+            for j in wave:
+                step = steps[j]
+                bases = _base_texts(slicer, ctx, full, steps, j, existing, produced)
+                produced[j] = []
+                for bi, base in enumerate(bases):
+                    if not base.strip():
+                        continue
+                    if base is full:
+                        ref: BaseRef = (0, len(full))
+                    else:
+                        pos = full.find(base)
+                        ref = (pos, len(base)) if pos >= 0 else base
+                    # offset 是字符下标：worker 解码整段后再切，和父进程的 str 下标一致
+                    fut = ex.submit(
+                        _run_step_task,
+                        shm.name,
+                        shm.size,
+                        ruleset,
+                        step,
+                        ref,
+                        step.within or "__full__",
+                        bi,
+                        debug,
+                        slicer.step_budget,
+                        slicer.profiler is not None,
+                        hits is not None,
+                    )
+                    jobs.append((j, base, fut))
+            for j, base, fut in jobs:
+                out = fut.result()
+                produced[j].extend(_rows_to_sections(out["rows"], base))
+                timed_out.extend(out["timeouts"])
+                if out["profile"]:
+                    profiles.append(out["profile"])
+                if out["hits"] is not None:
+                    doc_hits.append(out["hits"])
+            slicer._dbg(ctx, f"   ⚡ [parallel] wave steps={[steps[j].key for j in wave]} tasks={len(jobs)}")
+
+    # 全部 wave 成功后才写回：中途失败退回串行时 context 保持原样
+    if timed_out:
+        ctx.metadata.setdefault("slice_timeouts", []).extend(timed_out)
+    for profile in profiles:
+        slicer.profiler.merge(profile)
+    for h in doc_hits:
+        hits.merge(h)
+    return [(j, produced.get(j, [])) for j in range(len(steps))]
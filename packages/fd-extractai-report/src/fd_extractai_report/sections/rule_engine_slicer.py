@@ -1,28 +1,88 @@
 from __future__ import annotations
 
+import logging
 import re
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from time import perf_counter
 from typing import Any, Dict, Iterable, List, Pattern, Tuple, Optional
 
 from fd_extractai_report.context import ReportContext, ReportSection
+from fd_extractai_report.sections.anchor_index import AnchorIndex
 from fd_extractai_report.sections.base import SectionSlicer
+from fd_extractai_report.sections.parallel import ParallelSlicing, run_steps_parallel
+from fd_extractai_report.sections.rule_stats import DocumentHits, RuleHitStats
+from fd_extractai_report.sections.slice_profile import SliceProfiler
+from fd_extractai_report.sections.step_guard import SliceStepTimeout, step_deadline
 from fd_extractai_report.rules.slicing.schema import SliceRuleSet, SliceStep
 from fd_extractai_report.rules.slicing.registry import get_ruleset
 
+from fd_extractai_report.text.normalized import LoosePattern
 from fd_extractai_report.text.mdkit import (
     bucket_by_targets,
     sectionize,
     find_blocks_by_pattern,
 )
 
+logger = logging.getLogger(__name__)
+
 _MD_TABLE_SEP_RE = re.compile(
         r"^\s*\|?(?:\s*:?-{3,}:?\s*\|)+\s*:?-{3,}:?\s*\|?\s*$"
     )
 
+@dataclass
+class SliceRun:
+    """
+    一次 slice() 调用的全部状态；slicer 实例本身只读，可被多个线程同时使用。
+    - context：写回切片的目标
+    - ruleset：本次生效的 ruleset（override / 构造参数 / 按报告类型解析）
+    """
+
+    context: ReportContext
+    ruleset: SliceRuleSet
+    # 文档级锚点索引：各 step 查询同一锚点时共用一次扫描
+    anchors: AnchorIndex = field(default_factory=AnchorIndex)
+    # 规则命中统计（rule_stats 开启时）：本篇文档各 step 的锚点命中 / 选中情况
+    hits: Optional[DocumentHits] = None
+
+
+def _loose_space_pattern(s: str) -> str:
+    out = []
+    for ch in s:
+        if ch.strip():
+            out.append(re.escape(ch))
+            out.append(r"\s*")
+        else:
+            out.append(r"\s*")
+    return "".join(out)
+
+
+def _compile_between_patterns(arr: Iterable[str], loose_space: bool) -> List[Any]:
+    """
+    by_regex_between 的起止锚点编译规则（非法正则跳过）。
+    loose_space 时锚点按字面量处理，返回 LoosePattern：在归一化视图上查找，不再扫 \\s* 正则。
+    """
+    pats: List[Any] = []
+    for s in arr:
+        if loose_space:
+            pats.append(LoosePattern(s, _loose_space_pattern(s)))
+            continue
+        try:
+            pats.append(re.compile(s, re.I | re.M))
+        except re.error:
+            continue
+    return pats
+
+
 class RuleEngineSlicer(SectionSlicer):
     """
     规则切片执行器（强调调试可观测性）：
     - 每个 step 打印：输入范围、命中数量、去重、merge、truncate
     - 可通过构造参数 debug=True 或 ctx.metadata["debug_slice"]=True 开启
+    - parallel=ParallelSlicing(...) 时大文档按 within 依赖分波，在进程池里并行跑 step
+    - 可重入：单次运行的状态都放在 SliceRun 里，不改实例属性
+    - profiler=SliceProfiler() 时按 step / 锚点 / base 文本记录耗时与命中（见 slice_profile）
+    - rule_stats=RuleHitStats() 时统计各锚点被选中 / 仅命中 / 未命中的文档数（见 rule_stats）
     """
 
     def __init__(
@@ -33,9 +93,22 @@ class RuleEngineSlicer(SectionSlicer):
         debug: bool = False,
         preview_chars: int = 120,
         print_text_preview: bool = False,
+        parallel: Optional[ParallelSlicing] = None,
+        anchor_index: bool = True,
+        step_budget: Optional[float] = None,
+        profiler: Optional[SliceProfiler] = None,
+        rule_stats: Optional[RuleHitStats] = None,
     ) -> None:
         super().__init__(key=key)
         self.ruleset = ruleset
+        self.parallel = parallel
+        self.anchor_index = anchor_index
+        # 单个 step 的默认时间预算（秒）；step / ruleset defaults 里的 params.time_budget 优先
+        self.step_budget = step_budget
+        # 切片画像（可跨文档复用）；None 时不计时，零开销
+        self.profiler = profiler
+        # 语料级规则命中统计（dry-run 用）；每篇文档切完后汇总一次
+        self.rule_stats = rule_stats
         self.debug = debug
         self.preview_chars = preview_chars
         self.print_text_preview = print_text_preview
@@ -104,6 +177,55 @@ class RuleEngineSlicer(SectionSlicer):
         s = (s or "").replace("\n", "\\n")
         return s if len(s) <= self.preview_chars else s[: self.preview_chars] + "..."
 
+    def anchor_specs(self, ruleset: SliceRuleSet) -> Tuple[List[str], List[Any]]:
+        """
+        ruleset 中作用于全文（within 为空，或 within 缺失时回退全文）的锚点：(字面量, 已编译正则)。
+        编译规则与各 mode 的运行时一致，保证索引的 key 能被查询命中。
+        """
+        literals: Dict[str, None] = {}
+        patterns: Dict[Tuple[str, int], Any] = {}
+        for step in ruleset.steps:
+            if step.within and step.missing != "full":
+                continue
+            p = {**(ruleset.defaults or {}), **(step.params or {})}
+            targets = [t for t in (step.targets or []) if isinstance(t, str) and t.strip()]
+            compiled: List[Any] = []
+            if step.mode == "by_table_after":
+                literals.update(dict.fromkeys(step.targets or []))
+            elif step.mode == "by_window_after":
+                if p.get("anchor_regex", False):
+                    for t in targets:
+                        try:
+                            compiled.append(re.compile(t, re.I))
+                        except re.error:
+                            continue
+                else:
+                    literals.update(dict.fromkeys(targets))
+            elif step.mode == "by_regex_between":
+                loose_space = bool(p.get("loose_space", False))
+                ends = [t for t in (p.get("ends") or []) if isinstance(t, str) and t.strip()]
+                compiled = _compile_between_patterns(targets, loose_space)
+                compiled += _compile_between_patterns(ends, loose_space)
+            elif step.mode == "by_segment_tables":
+                for t in step.targets or []:
+                    if isinstance(t, re.Pattern):
+                        compiled.append(t)
+                    elif isinstance(t, str) and t.strip():
+                        try:
+                            compiled.append(re.compile(t, re.I | re.M))
+                        except re.error:
+                            continue
+            for pat in compiled:
+                patterns.setdefault((pat.pattern, pat.flags), pat)
+        return list(literals), list(patterns.values())
+
+    def build_anchor_index(self, full: str, ruleset: SliceRuleSet) -> AnchorIndex:
+        """预先扫完 ruleset 的全部全文锚点（不受 step 时间预算约束；slice() 本身按需建索引）。"""
+        if not self.anchor_index:
+            return AnchorIndex()
+        literals, patterns = self.anchor_specs(ruleset)
+        return AnchorIndex.build(full, literals, patterns)
+
     def _resolve_ruleset(self, context: ReportContext) -> SliceRuleSet:
         if self.ruleset is not None:
             self._dbg(
@@ -131,19 +253,44 @@ class RuleEngineSlicer(SectionSlicer):
             self._dbg(context, "❌ [RuleEngine] active_ruleset is None")
             return
 
-        original_ruleset = self.ruleset
-        self.ruleset = active_ruleset
         full = context.ensure_markdown()
+        if self.profiler is not None:
+            self.profiler.record_document()
+        use_parallel = self.parallel is not None and self.parallel.enabled_for(full)
+        run = SliceRun(
+            context=context,
+            ruleset=active_ruleset,
+            # 按需建索引：每个锚点在第一个用到它的 step 里扫描（受该 step 的时间预算约束），
+            # 之后的 step 直接命中；并行时各 worker 自建，父进程只在退回串行时才会用到
+            anchors=AnchorIndex(full) if self.anchor_index else AnchorIndex(),
+            hits=DocumentHits() if self.rule_stats is not None else None,
+        )
 
         self._dbg(
             context,
-            f"🧩 [RuleEngine] ruleset={self.ruleset.name} steps={len(self.ruleset.steps)}",
+            f"🧩 [RuleEngine] ruleset={run.ruleset.name} steps={len(run.ruleset.steps)}",
         )
 
-        for si, step in enumerate(self.ruleset.steps, start=1):
+        parallel_done = False
+        if use_parallel:
+            try:
+                per_step = run_steps_parallel(
+                    self, context, run.ruleset, full, self.parallel, hits=run.hits
+                )
+            except (BrokenProcessPool, OSError) as e:
+                # 进程池 / 共享内存不可用时退回串行，此时 context 尚未写入任何切片
+                logger.warning("parallel slicing unavailable, fallback to serial (%r)", e)
+            else:
+                parallel_done = True
+                for _, secs in per_step:
+                    for s in secs:
+                        context.add_slice(s)
+                        yield s
+
+        for si, step in enumerate([] if parallel_done else run.ruleset.steps, start=1):
             self._dbg(
                 context,
-                f"➡️  [Step {si}/{len(self.ruleset.steps)}] key={step.key} mode={step.mode} "
+                f"➡️  [Step {si}/{len(run.ruleset.steps)}] key={step.key} mode={step.mode} "
                 f"within={step.within or '__full__'} missing={step.missing}",
             )
 
@@ -174,7 +321,7 @@ class RuleEngineSlicer(SectionSlicer):
 
                 secs = list(
                     self._run_step(
-                        context,
+                        run,
                         step,
                         base,
                         base_scope=step.within or "__full__",
@@ -214,9 +361,9 @@ class RuleEngineSlicer(SectionSlicer):
         after = {
             k: len(v or []) for k, v in (getattr(context, "slices", None) or {}).items()
         }
-        self._dbg(context, f"🏁 [RuleEngine] leave slices_after={after}")
-
-        self.ruleset = original_ruleset
+        self._dbg(context, f"🏁 [RuleEngine] leave slices_after={after} anchors={run.anchors.stats}")
+        if self.rule_stats is not None and run.hits is not None:
+            self.rule_stats.record_document(run.ruleset, run.hits)
 
     def _resolve_base_texts(
         self, ctx: ReportContext, full: str, step: SliceStep
@@ -241,16 +388,120 @@ class RuleEngineSlicer(SectionSlicer):
         self._dbg(ctx, f"   🔎 input_scope={step.within} slices={len(src)}")
         return [s.text for s in src if s and s.text]
 
+    def _step_budget(self, p: Dict[str, Any]) -> Optional[float]:
+        budget = p.get("time_budget")
+        if budget is None:
+            return self.step_budget
+        try:
+            return float(budget)
+        except (TypeError, ValueError):
+            return self.step_budget
+
+    @staticmethod
+    def _pattern_observer(prof: SliceProfiler, run: SliceRun, step: SliceStep) -> Any:
+        ruleset = run.ruleset.name
+
+        def _observe(pattern: str, seconds: float, hits: int, scanned_chars: int) -> None:
+            prof.record_pattern(
+                ruleset, step.key, pattern, seconds=seconds, hits=hits, scanned_chars=scanned_chars
+            )
+
+        return _observe
+
+    @staticmethod
+    def _selected_targets(
+        step: SliceStep, p: Dict[str, Any], produced: List[ReportSection]
+    ) -> Iterable[Tuple[str, str]]:
+        """从各 mode 的原始切片 metadata（merge / dedup 之前）还原产出所用的锚点：(field, target)。"""
+        if step.mode == "by_regex_between":
+            loose_space = bool(p.get("loose_space", False))
+
+            def _by_pat(arr: Any) -> Dict[str, str]:
+                out: Dict[str, str] = {}
+                for t in arr or []:
+                    if isinstance(t, str) and t.strip():
+                        out.setdefault(_loose_space_pattern(t) if loose_space else t, t)
+                return out
+
+            starts, ends = _by_pat(step.targets), _by_pat(p.get("ends"))
+            for sec in produced:
+                md = sec.metadata or {}
+                for field_name, hit, by_pat in (("targets", md.get("start"), starts), ("ends", md.get("end"), ends)):
+                    target = by_pat.get((hit or {}).get("pat"))
+                    if target is not None:
+                        yield field_name, target
+            return
+
+        md_key = {
+            "by_window_after": "anchor",
+            "by_table_after": "heading",
+            "by_segment_tables": "pattern",
+            "by_regex_block": "pattern",
+        }.get(step.mode)
+        if md_key is None:
+            return
+        for sec in produced:
+            target = (sec.metadata or {}).get(md_key)
+            if isinstance(target, str):
+                yield "targets", target
+
+    def _note_matched(self, run: SliceRun, step: SliceStep, field_name: str, target: str) -> None:
+        if run.hits is not None:
+            run.hits.note_matched(step.key, field_name, target)
+
+    def _record_timeout(
+        self, run: SliceRun, step: SliceStep, e: SliceStepTimeout, base_scope: str, base_idx: int
+    ) -> None:
+        """超时的 step 不产出切片，记到 ctx.metadata["slice_timeouts"]，其余 step 照常执行。"""
+        logger.warning("slicing ruleset %s: %s", run.ruleset.name, e)
+        self._dbg(run.context, f"   ⏱️ step={step.key} timeout budget={e.budget:.2f}s elapsed={e.elapsed:.2f}s")
+        run.context.metadata.setdefault("slice_timeouts", []).append(
+            {
+                "step": step.key,
+                "mode": step.mode,
+                "ruleset": run.ruleset.name,
+                "base_scope": base_scope,
+                "base_idx": base_idx,
+                "budget": e.budget,
+                "elapsed": round(e.elapsed, 3),
+            }
+        )
+
+    def _dispatch(
+        self,
+        run: SliceRun,
+        step: SliceStep,
+        text: str,
+        p: Dict[str, Any],
+        base_scope: str,
+        base_idx: int,
+    ) -> Optional[List[ReportSection]]:
+        """按 mode 执行；未知 mode 返回 None。"""
+        if step.mode == "by_heading":
+            return self._by_heading(run, step, text, base_scope, base_idx)
+        if step.mode == "by_regex_block":
+            return self._by_regex_block(run, step, text, base_scope, base_idx)
+        if step.mode == "by_table_after":
+            return self._by_table_after(run, step, text, p, base_scope, base_idx)
+        if step.mode == "by_window_after":
+            return self._by_window_after(run, step, text, p, base_scope, base_idx)
+        if step.mode == "by_regex_between":
+            return self._by_regex_between(run, step, text, p, base_scope, base_idx)
+        if step.mode == "by_segment_tables":
+            return self._by_segment_tables(run, step, text, p, base_scope, base_idx)
+        return None
+
     def _run_step(
         self,
-        ctx: ReportContext,
+        run: SliceRun,
         step: SliceStep,
         text: str,
         *,
         base_scope: str,
         base_idx: int,
     ) -> Iterable[ReportSection]:
-        p = {**(self.ruleset.defaults or {}), **(step.params or {})}
+        ctx = run.context
+        p = {**(run.ruleset.defaults or {}), **(step.params or {})}
 
         merge = bool(p.get("merge", False))
         dedup = bool(p.get("dedup", True))
@@ -262,22 +513,42 @@ class RuleEngineSlicer(SectionSlicer):
             f"   🧪 run: merge={merge} dedup={dedup} max_sections={max_sections or '∞'} max_chars={max_chars or '∞'} targets={len(step.targets)}",
         )
 
-        produced: List[ReportSection] = []
-        if step.mode == "by_heading":
-            produced = self._by_heading(step, text, base_scope, base_idx)
-        elif step.mode == "by_regex_block":
-            produced = self._by_regex_block(step, text, base_scope, base_idx)
-        elif step.mode == "by_table_after":
-            produced = self._by_table_after(step, text, p, base_scope, base_idx)
-        elif step.mode == "by_window_after":
-            produced = self._by_window_after(step, text, p, base_scope, base_idx)
-        elif step.mode == "by_regex_between":
-            produced = self._by_regex_between(step, text, p, base_scope, base_idx)
-        elif step.mode == "by_segment_tables":
-            produced = self._by_segment_tables(step, text, p, base_scope, base_idx)
-        else:
+        prof = self.profiler
+        if prof is not None:
+            run.anchors.observer = self._pattern_observer(prof, run, step)
+        t0 = perf_counter()
+        result: Optional[List[ReportSection]] = None
+        timed_out = False
+        try:
+            with step_deadline(step.key, self._step_budget(p)):
+                result = self._dispatch(run, step, text, p, base_scope, base_idx)
+        except SliceStepTimeout as e:
+            timed_out = True
+            self._record_timeout(run, step, e, base_scope, base_idx)
+        finally:
+            if prof is not None:
+                run.anchors.observer = None
+                prof.record_step(
+                    run.ruleset.name,
+                    step.key,
+                    step.mode,
+                    base_scope=base_scope,
+                    base_idx=base_idx,
+                    base_chars=len(text),
+                    seconds=perf_counter() - t0,
+                    produced=len(result or []),
+                    timed_out=timed_out,
+                )
+        if timed_out:
+            return
+        if result is None:
             self._dbg(ctx, f"   ❌ unknown mode={step.mode}")
             return
+        produced: List[ReportSection] = result
+        if run.hits is not None:
+            run.hits.note_ran(step.key, len(produced))
+            for field_name, target in self._selected_targets(step, p, produced):
+                run.hits.note_selected(step.key, field_name, target)
 
         self._dbg(ctx, f"   📦 raw_produced={len(produced)}")
 
@@ -353,8 +624,11 @@ class RuleEngineSlicer(SectionSlicer):
                     "base_idx": base_idx,
                     "merged": True,
                     "truncated": truncated,
+                    "closed": all(
+                        bool((s.metadata or {}).get("closed")) for s in produced
+                    ),
                     "step_targets": list(step.targets),
-                    "ruleset": self.ruleset.name,
+                    "ruleset": run.ruleset.name,
                 },
             )
             return
@@ -383,7 +657,7 @@ class RuleEngineSlicer(SectionSlicer):
             yield s
 
     def _by_heading(
-        self, step: SliceStep, text: str, base_scope: str, base_idx: int
+        self, run: SliceRun, step: SliceStep, text: str, base_scope: str, base_idx: int
     ) -> List[ReportSection]:
         sections = sectionize(text)
         grouped = bucket_by_targets(sections, {step.key: step.targets})
@@ -406,19 +680,25 @@ class RuleEngineSlicer(SectionSlicer):
                         "base_scope": base_scope,
                         "base_idx": base_idx,
                         "match_index": i,
-                        "ruleset": self.ruleset.name,
+                        "ruleset": run.ruleset.name,
                     },
                 )
             )
         return out
 
     def _by_regex_block(
-        self, step: SliceStep, text: str, base_scope: str, base_idx: int
+        self, run: SliceRun, step: SliceStep, text: str, base_scope: str, base_idx: int
     ) -> List[ReportSection]:
         out: List[ReportSection] = []
         patterns = [re.compile(t, re.I) for t in (step.targets or [])]
         for pat in patterns:
+            t0 = perf_counter()
             blocks = find_blocks_by_pattern(text, pat)
+            if run.anchors.observer is not None:
+                # 不经过锚点索引的扫描也记到画像里
+                run.anchors.observer(pat.pattern, perf_counter() - t0, len(blocks), len(text))
+            if blocks:
+                self._note_matched(run, step, "targets", pat.pattern)
             for i, b in enumerate(blocks):
                 raw = (b.get("text") or "").strip()
                 if not raw:
@@ -435,7 +715,7 @@ class RuleEngineSlicer(SectionSlicer):
                             "match_index": i,
                             "base_scope": base_scope,
                             "base_idx": base_idx,
-                            "ruleset": self.ruleset.name,
+                            "ruleset": run.ruleset.name,
                         },
                     )
                 )
@@ -443,6 +723,7 @@ class RuleEngineSlicer(SectionSlicer):
 
     def _by_regex_between(
         self,
+        run: SliceRun,
         step: SliceStep,
         text: str,
         p: Dict[str, Any],
@@ -466,29 +747,9 @@ class RuleEngineSlicer(SectionSlicer):
         if not starts or not ends:
             return []
 
-        def _loose_space_pattern(s: str) -> str:
-            out = []
-            for ch in s:
-                if ch.strip():
-                    out.append(re.escape(ch))
-                    out.append(r"\s*")
-                else:
-                    out.append(r"\s*")
-            return "".join(out)
-
-        def _compile_many(arr: List[str]) -> List[re.Pattern]:
-            pats: List[re.Pattern] = []
-            for s in arr:
-                try:
-                    if p.get("loose_space", False):
-                        s = _loose_space_pattern(s)
-                    pats.append(re.compile(s, re.I | re.M))
-                except re.error:
-                    continue
-            return pats
-
-        start_pats = _compile_many(starts)
-        end_pats = _compile_many(ends)
+        loose_space = bool(p.get("loose_space", False))
+        start_pats = _compile_between_patterns(starts, loose_space)
+        end_pats = _compile_between_patterns(ends, loose_space)
         if not start_pats or not end_pats:
             return []
 
@@ -536,9 +797,10 @@ class RuleEngineSlicer(SectionSlicer):
             skipped = 0
 
             for i, pat in enumerate(pats):
+                hits_before = len(hits)
                 # finditer：让每个 pattern 有多个候选（目录一条、正文一条）
                 try:
-                    it = pat.finditer(_text, start_at)
+                    it = run.anchors.finditer(pat, _text, start_at)
                 except TypeError:
                     # 兼容老 python：finditer(text, pos) 不支持时兜底
                     it = pat.finditer(_text[start_at:])
@@ -571,6 +833,8 @@ class RuleEngineSlicer(SectionSlicer):
                 for m in it:
                     if _should_skip_by_line(_text, m):
                         skipped += 1
+                        if self.profiler is not None:
+                            self.profiler.record_skipped(run.ruleset.name, step.key, pat.pattern, 1)
                         if self.debug:
                             print(
                                 f"   ⛔ skip({kind}) pos={m.start()} line={_line_text(_text, m.start())[:120]!r}"
@@ -587,6 +851,10 @@ class RuleEngineSlicer(SectionSlicer):
                             "kind": kind,
                         }
                     )
+                if len(hits) > hits_before:
+                    self._note_matched(
+                        run, step, "targets" if kind == "start" else "ends", getattr(pat, "source", pat.pattern)
+                    )
             return hits, skipped
 
         # 选择命中：priority（pattern 优先）/ earliest（位置优先）
@@ -634,6 +902,13 @@ class RuleEngineSlicer(SectionSlicer):
         if not chunk:
             return []
 
+        # closed：追加更多文本（渐进式转换）也不会改变该切片的起止位置
+        start_final = pick != "priority" or start_hit["idx"] == 0
+        if end_hit is not None:
+            end_final = pick != "priority" or end_hit["idx"] == 0
+        else:
+            end_final = fallback_end_chars > 0 and start_pos + fallback_end_chars <= len(text)
+
         # ✅ 可观测性：给你一个轻量 preview（不污染正文）
         start_line_preview = (start_hit.get("line") or "")[:180]
         end_line_preview = ((end_hit or {}).get("line") or "")[:180]
@@ -647,7 +922,7 @@ class RuleEngineSlicer(SectionSlicer):
                     "mode": step.mode,
                     "base_scope": base_scope,
                     "base_idx": base_idx,
-                    "ruleset": self.ruleset.name,
+                    "ruleset": run.ruleset.name,
                     "pick": pick,
                     "include_start": include_start,
                     "include_end": include_end,
@@ -665,6 +940,7 @@ class RuleEngineSlicer(SectionSlicer):
                     "end_hits": len(end_hits),
                     "start_line_preview": start_line_preview,
                     "end_line_preview": end_line_preview,
+                    "closed": bool(start_final and end_final),
                 },
             )
         ]
@@ -679,9 +955,14 @@ class RuleEngineSlicer(SectionSlicer):
         return pipe_lines >= min_rows
 
     def _grab_table_after_heading(
-        self, text: str, heading: str, *, max_chars: int = 8000
+        self,
+        text: str,
+        heading: str,
+        *,
+        max_chars: int = 8000,
+        anchors: Optional[AnchorIndex] = None,
     ) -> str:
-        pos = text.find(heading)
+        pos = anchors.find(heading, text) if anchors is not None else text.find(heading)
         if pos < 0:
             return ""
         tail = text[pos : pos + max_chars]
@@ -723,6 +1004,7 @@ class RuleEngineSlicer(SectionSlicer):
 
     def _by_table_after(
         self,
+        run: SliceRun,
         step: SliceStep,
         text: str,
         p: Dict[str, Any],
@@ -735,8 +1017,11 @@ class RuleEngineSlicer(SectionSlicer):
         out: List[ReportSection] = []
         for i, heading in enumerate(step.targets):
             grabbed = self._grab_table_after_heading(
-                text, heading, max_chars=max_table_chars
+                text, heading, max_chars=max_table_chars, anchors=run.anchors
             )
+            # 标题命中但后面没有表格时 grabbed 为空，命中与否另查（锚点索引里已缓存）
+            if run.hits is not None and run.anchors.find(heading, text) >= 0:
+                self._note_matched(run, step, "targets", heading)
             if not grabbed:
                 continue
             if not self._looks_like_md_table(grabbed, min_rows=min_table_rows):
@@ -756,7 +1041,7 @@ class RuleEngineSlicer(SectionSlicer):
                         "match_index": i,
                         "base_scope": base_scope,
                         "base_idx": base_idx,
-                        "ruleset": self.ruleset.name,
+                        "ruleset": run.ruleset.name,
                     },
                 )
             )
@@ -764,6 +1049,7 @@ class RuleEngineSlicer(SectionSlicer):
 
     def _by_window_after(
         self,
+        run: SliceRun,
         step: SliceStep,
         text: str,
         p: Dict[str, Any],
@@ -782,16 +1068,18 @@ class RuleEngineSlicer(SectionSlicer):
         if use_regex:
             for t in targets:
                 try:
-                    m = re.search(t, text, flags=re.I)
+                    m = run.anchors.search(re.compile(t, re.I), text)
                 except re.error:
                     m = None
                 if m:
                     hits.append((m.start(), t, {"match": m.group(0)}))
+                    self._note_matched(run, step, "targets", t)
         else:
             for t in targets:
-                pos = text.find(t)
+                pos = run.anchors.find(t, text)
                 if pos >= 0:
                     hits.append((pos, t, {}))
+                    self._note_matched(run, step, "targets", t)
 
         if not hits:
             return []
@@ -807,6 +1095,9 @@ class RuleEngineSlicer(SectionSlicer):
 
         end = min(len(text), pos + window_chars)
         win = text[pos:end]
+        closed = pos + window_chars <= len(text) and (
+            pick != "priority" or anchor == targets[0]
+        )
 
         return [
             ReportSection(
@@ -821,8 +1112,9 @@ class RuleEngineSlicer(SectionSlicer):
                     "window_chars": window_chars,
                     "base_scope": base_scope,
                     "base_idx": base_idx,
-                    "ruleset": self.ruleset.name,
+                    "ruleset": run.ruleset.name,
                     "hit_count": len(hits),
+                    "closed": closed,
                     "hits": [
                         {"pos": h[0], "anchor": h[1], **h[2]} for h in hits[:20]
                     ],  # 防止过大
@@ -900,6 +1192,7 @@ class RuleEngineSlicer(SectionSlicer):
 
     def _by_segment_tables(
         self,
+        run: SliceRun,
         step: SliceStep,
         text: str,
         p: Dict[str, Any],
@@ -929,7 +1222,10 @@ class RuleEngineSlicer(SectionSlicer):
         for pat in patterns:
             hits = 0
 
-            for match in pat.finditer(text):
+            matches = run.anchors.finditer(pat, text)
+            if matches:
+                self._note_matched(run, step, "targets", pat.pattern)
+            for match in matches:
                 if max_hits_per_pattern > 0 and hits >= max_hits_per_pattern:
                     break
 
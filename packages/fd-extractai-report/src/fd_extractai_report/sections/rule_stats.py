@@ -0,0 +1,313 @@
+"""
+语料级规则命中统计（dry-run：只切片、不调用 LLM）：RuleEngineSlicer(rule_stats=RuleHitStats()) 后，
+每篇文档按 step / 锚点记录
+- selected：该锚点就是产出切片所用的那个（by_regex_between 的起 / 止锚点、by_window_after 的锚点；
+  by_table_after / by_segment_tables / by_regex_block 每个锚点各自产出，产出即 selected）
+- matched：有可用命中（不含被 skip_if_line_matches 过滤的），但没被选中
+- never：step 执行了，锚点一次都没命中
+by_heading 按标题归桶，不区分锚点，只统计 step 级的执行 / 产出。
+
+suggestions() 只给在这批语料上“结果不变”的建议：
+- prune_unmatched / prune_shadowed：从未被选中的锚点，删掉不影响任何一篇的切片结果，还省一次扫描
+- dead_step：执行过但从未产出的 step
+- reorder：pick=priority 的 step，按被选中次数把锚点往前排；同一篇里同时命中过的两个锚点保持原相对顺序
+  （它们的先后决定了选谁），因此结果不变
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from fd_extractai_report.rules.slicing.schema import (
+    MODE_BY_REGEX_BETWEEN,
+    MODE_BY_WINDOW_AFTER,
+    SliceRuleSet,
+    SliceStep,
+)
+
+# (field, target)：field 为 targets / ends
+_Key = Tuple[str, str]
+
+
+def step_targets(step: SliceStep, defaults: Any = None) -> List[_Key]:
+    """step 中可单独统计的锚点（去重、保持顺序）；by_heading 返回空。"""
+    if step.mode == "by_heading":
+        return []
+    p = {**(defaults or {}), **(step.params or {})}
+    out: Dict[_Key, None] = {}
+    for t in step.targets or []:
+        if isinstance(t, str) and t.strip():
+            out[("targets", t)] = None
+    if step.mode == MODE_BY_REGEX_BETWEEN:
+        for t in p.get("ends") or []:
+            if isinstance(t, str) and t.strip():
+                out[("ends", t)] = None
+    return list(out)
+
+
+def step_pick(step: SliceStep, defaults: Any = None) -> str:
+    """priority / earliest：多个锚点里选一个；all：每个锚点各自产出。"""
+    p = {**(defaults or {}), **(step.params or {})}
+    if step.mode == MODE_BY_REGEX_BETWEEN:
+        return (p.get("pick") or "earliest").lower()
+    if step.mode == MODE_BY_WINDOW_AFTER:
+        return (p.get("anchor_pick") or "earliest").lower()
+    return "all"
+
+
+@dataclass
+class DocumentHits:
+    """一篇文档的命中记录；可 pickle，并行切片时由 worker 回传后合并。"""
+
+    ran: Set[str] = field(default_factory=set)
+    produced: Set[str] = field(default_factory=set)
+    matched: Dict[str, Set[_Key]] = field(default_factory=dict)
+    selected: Dict[str, Set[_Key]] = field(default_factory=dict)
+
+    def note_ran(self, step: str, produced: int) -> None:
+        self.ran.add(step)
+        if produced:
+            self.produced.add(step)
+
+    def note_matched(self, step: str, field_name: str, target: str) -> None:
+        self.matched.setdefault(step, set()).add((field_name, target))
+
+    def note_selected(self, step: str, field_name: str, target: str) -> None:
+        self.selected.setdefault(step, set()).add((field_name, target))
+
+    def merge(self, other: "DocumentHits") -> None:
+        self.ran |= other.ran
+        self.produced |= other.produced
+        for step, keys in other.matched.items():
+            self.matched.setdefault(step, set()).update(keys)
+        for step, keys in other.selected.items():
+            self.selected.setdefault(step, set()).update(keys)
+
+
+@dataclass
+class TargetHits:
+    ruleset: str
+    step: str
+    field: str
+    index: int
+    target: str
+    documents: int = 0  # step 执行过的文档数
+    selected: int = 0
+    matched: int = 0  # 有命中但没被选中
+
+    @property
+    def never(self) -> int:
+        return self.documents - self.selected - self.matched
+
+
+@dataclass
+class StepHits:
+    ruleset: str
+    step: str
+    mode: str
+    pick: str
+    documents: int = 0
+    produced: int = 0
+
+
+@dataclass
+class RuleSuggestion:
+    kind: str  # prune_unmatched / prune_shadowed / dead_step / reorder
+    ruleset: str
+    step: str
+    field: str = ""
+    target: str = ""
+    detail: str = ""
+    order: Tuple[str, ...] = ()  # reorder 的建议顺序
+
+    def __str__(self) -> str:
+        where = f"{self.ruleset}/{self.step}" + (f".{self.field}" if self.field else "")
+        what = f" {self.target!r}" if self.target else ""
+        return f"[{self.kind}] {where}{what}: {self.detail}"
+
+
+class RuleHitStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.documents = 0
+        self.steps: Dict[Tuple[str, str], StepHits] = {}
+        self.targets: Dict[Tuple[str, str, str, str], TargetHits] = {}
+        # 没被选中时，同一篇里被选中的是谁（prune_shadowed 的说明）
+        self.shadowed_by: Dict[Tuple[str, str, str, str], Counter] = {}
+        # (ruleset, step, field) -> Counter[(a, b)]：同一篇里都命中过的锚点对（a 在原顺序中靠前）
+        self.co_matched: Dict[Tuple[str, str, str], Counter] = {}
+
+    def record_document(self, ruleset: SliceRuleSet, doc: DocumentHits) -> None:
+        rs = ruleset.name
+        with self._lock:
+            self.documents += 1
+            for step in ruleset.steps or []:
+                skey = (rs, step.key)
+                sh = self.steps.get(skey)
+                if sh is None:
+                    sh = self.steps[skey] = StepHits(rs, step.key, step.mode, step_pick(step, ruleset.defaults))
+                if step.key not in doc.ran:
+                    continue
+                sh.documents += 1
+                sh.produced += int(step.key in doc.produced)
+
+                keys = step_targets(step, ruleset.defaults)
+                selected = doc.selected.get(step.key, set())
+                matched = doc.matched.get(step.key, set()) | selected
+                for fname, target in keys:
+                    tkey = (rs, step.key, fname, target)
+                    th = self.targets.get(tkey)
+                    if th is None:
+                        index = [t for f, t in keys if f == fname].index(target)
+                        th = self.targets[tkey] = TargetHits(rs, step.key, fname, index, target)
+                    th.documents += 1
+                    if (fname, target) in selected:
+                        th.selected += 1
+                    elif (fname, target) in matched:
+                        th.matched += 1
+                        winners = [t for f, t in selected if f == fname]
+                        self.shadowed_by.setdefault(tkey, Counter()).update(winners)
+
+                for fname in {f for f, _ in keys}:
+                    hit = [t for f, t in keys if f == fname and (f, t) in matched]
+                    co = self.co_matched.setdefault((rs, step.key, fname), Counter())
+                    for a_i, a in enumerate(hit):
+                        for b in hit[a_i + 1 :]:
+                            co[(a, b)] += 1
+
+    # -------------------------
+    # export
+    # -------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "documents": self.documents,
+                "steps": [asdict(v) for v in self.steps.values()],
+                "targets": [{**asdict(v), "never": v.never} for v in self.targets.values()],
+            }
+
+    def suggestions(self, *, min_documents: int = 1) -> List[RuleSuggestion]:
+        out: List[RuleSuggestion] = []
+        with self._lock:
+            for (rs, step), sh in self.steps.items():
+                if sh.documents < min_documents:
+                    continue
+                if not sh.produced:
+                    out.append(
+                        RuleSuggestion("dead_step", rs, step, detail=f"ran on {sh.documents} docs, never produced a slice")
+                    )
+                    continue
+
+                rows = sorted(
+                    (th for (r, s, _, _), th in self.targets.items() if r == rs and s == step),
+                    key=lambda th: (th.field, th.index),
+                )
+                for fname in sorted({th.field for th in rows}):
+                    group = [th for th in rows if th.field == fname]
+                    for th in group:
+                        if th.selected:
+                            continue
+                        if not th.matched:
+                            out.append(
+                                RuleSuggestion(
+                                    "prune_unmatched", rs, step, fname, th.target,
+                                    f"never matched on {th.documents} docs",
+                                )
+                            )
+                        else:
+                            winners = self.shadowed_by.get((rs, step, fname, th.target)) or Counter()
+                            top = ", ".join(f"{t!r}×{n}" for t, n in winners.most_common(3)) or "none"
+                            out.append(
+                                RuleSuggestion(
+                                    "prune_shadowed", rs, step, fname, th.target,
+                                    f"matched on {th.matched}/{th.documents} docs but never selected (selected instead: {top})",
+                                )
+                            )
+                    if sh.pick == "priority" and len(group) > 1:
+                        order = self._safe_order(group, self.co_matched.get((rs, step, fname)) or Counter())
+                        if order != [th.target for th in group]:
+                            out.append(
+                                RuleSuggestion(
+                                    "reorder", rs, step, fname,
+                                    detail="most-selected first; co-matched pairs keep their relative order",
+                                    order=tuple(order),
+                                )
+                            )
+        return out
+
+    @staticmethod
+    def _safe_order(group: List[TargetHits], co: Counter) -> List[str]:
+        """按被选中次数降序的拓扑排序：同一篇里同时命中过的 (a, b) 必须保持 a 在 b 前。"""
+        remaining = [th.target for th in group]
+        selected = {th.target: th.selected for th in group}
+        out: List[str] = []
+        while remaining:
+            ready = [t for t in remaining if not any(co.get((a, t)) for a in remaining if a != t)]
+            # co 只记录原顺序中 a 在 b 前的对，ready 不会为空
+            best = max(ready, key=lambda t: (selected[t], -remaining.index(t)))
+            out.append(best)
+            remaining.remove(best)
+        return out
+
+    def report(self, *, min_documents: int = 1) -> str:
+        data = self.to_dict()
+        lines = [f"🎯 rule hit stats: documents={data['documents']}"]
+        lines.append(f"{'docs':>5} {'selected':>8} {'matched':>7} {'never':>6}  step.field[i] target")
+        for th in sorted(self.targets.values(), key=lambda t: (t.ruleset, t.step, t.field, t.index)):
+            lines.append(
+                f"{th.documents:>5} {th.selected:>8} {th.matched:>7} {th.never:>6}  "
+                f"{th.ruleset}/{th.step}.{th.field}[{th.index}] {th.target!r}"
+            )
+        suggestions = self.suggestions(min_documents=min_documents)
+        lines.append(f"-- {len(suggestions)} suggestions (min_documents={min_documents})")
+        for s in suggestions:
+            lines.append(str(s))
+            if s.order:
+                lines.append(f"      -> {s.order}")
+        return "\n".join(lines)
+
+
+def apply_suggestions(
+    rs: SliceRuleSet,
+    suggestions: Iterable[RuleSuggestion],
+    *,
+    kinds: Iterable[str] = ("prune_unmatched", "prune_shadowed", "reorder"),
+) -> SliceRuleSet:
+    """
+    按建议生成新的 ruleset（不修改原对象）。dead_step 默认不自动删：后续 step 可能通过 within 依赖它。
+    每个 field 至少保留一个锚点。
+    """
+    wanted = set(kinds)
+    drop: Dict[Tuple[str, str], Set[str]] = {}
+    order: Dict[Tuple[str, str], List[str]] = {}
+    dead: Set[str] = set()
+    for sg in suggestions:
+        if sg.ruleset != rs.name or sg.kind not in wanted:
+            continue
+        if sg.kind == "dead_step":
+            dead.add(sg.step)
+        elif sg.kind == "reorder":
+            order[(sg.step, sg.field)] = list(sg.order)
+        else:
+            drop.setdefault((sg.step, sg.field), set()).add(sg.target)
+
+    def _edit(step_key: str, field_name: str, arr: List[Any]) -> List[Any]:
+        kept = [t for t in arr if t not in drop.get((step_key, field_name), set())] or arr[:1]
+        want = order.get((step_key, field_name))
+        if want:
+            rank = {t: i for i, t in enumerate(want)}
+            kept = sorted(kept, key=lambda t: rank.get(t, len(rank)))
+        return kept
+
+    steps: List[SliceStep] = []
+    for step in rs.steps or []:
+        if step.key in dead:
+            continue
+        params = dict(step.params or {})
+        if step.mode == MODE_BY_REGEX_BETWEEN and isinstance(params.get("ends"), list):
+            params["ends"] = _edit(step.key, "ends", params["ends"])
+        steps.append(replace(step, targets=_edit(step.key, "targets", list(step.targets or [])), params=params))
+    return replace(rs, steps=steps)
@@ -0,0 +1,219 @@
+"""
+切片耗时画像：RuleEngineSlicer(profiler=SliceProfiler()) 后，每次 slice() 按 step / 锚点 / base 文本累计
+- 耗时、命中数、被 skip_if_line_matches 过滤的命中数、实际扫描的字符数（命中锚点索引缓存的查询记 0）
+- 同一个 profiler 可跨整批文档复用（线程安全）；并行切片时 worker 的记录会合并回父进程
+- report() 按耗时排出最贵的锚点 / step，给规则维护者看“该优化哪条”
+
+scanned_chars 是字符数（str 下标），不是 UTF-8 字节数。
+耗时是墙钟时间：多线程共用一个 slicer 时包含 GIL 等待，精确定位时用单线程跑；
+loose_space 锚点第一次查询会把归一化视图的构建时间记在自己头上。
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, List, Tuple
+
+
+@dataclass
+class PatternCost:
+    ruleset: str
+    step: str
+    pattern: str
+    calls: int = 0  # 查询次数（含命中索引缓存）
+    scans: int = 0  # 实际扫描文本的次数
+    seconds: float = 0.0
+    hits: int = 0
+    skipped: int = 0  # 命中后被 skip_if_line_matches 过滤
+    scanned_chars: int = 0
+
+
+@dataclass
+class StepCost:
+    ruleset: str
+    step: str
+    mode: str = ""
+    runs: int = 0  # 执行次数（每个 base 文本一次）
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    produced: int = 0
+    base_chars: int = 0
+    timeouts: int = 0
+
+
+@dataclass
+class BaseCost:
+    ruleset: str
+    step: str
+    base_scope: str
+    base_idx: int
+    runs: int = 0
+    seconds: float = 0.0
+    base_chars: int = 0
+
+
+def _add(dst: Any, src: Dict[str, Any]) -> None:
+    """累加计数字段（有数值默认值的字段；ruleset / step 等 key 字段没有默认值）。"""
+    for f in fields(dst):
+        if f.name not in src or isinstance(f.default, bool) or not isinstance(f.default, (int, float)):
+            continue
+        if f.name == "max_seconds":
+            dst.max_seconds = max(dst.max_seconds, src["max_seconds"])
+        else:
+            setattr(dst, f.name, getattr(dst, f.name) + src[f.name])
+
+
+class SliceProfiler:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.documents = 0
+        self.patterns: Dict[Tuple[str, str, str], PatternCost] = {}
+        self.steps: Dict[Tuple[str, str], StepCost] = {}
+        self.bases: Dict[Tuple[str, str, str, int], BaseCost] = {}
+
+    # -------------------------
+    # record
+    # -------------------------
+    def record_document(self) -> None:
+        with self._lock:
+            self.documents += 1
+
+    def record_pattern(
+        self,
+        ruleset: str,
+        step: str,
+        pattern: str,
+        *,
+        seconds: float,
+        hits: int,
+        scanned_chars: int,
+    ) -> None:
+        with self._lock:
+            key = (ruleset, step, pattern)
+            pc = self.patterns.get(key)
+            if pc is None:
+                pc = self.patterns[key] = PatternCost(ruleset, step, pattern)
+            pc.calls += 1
+            pc.scans += int(scanned_chars > 0)
+            pc.seconds += seconds
+            pc.hits += hits
+            pc.scanned_chars += scanned_chars
+
+    def record_skipped(self, ruleset: str, step: str, pattern: str, n: int) -> None:
+        if n <= 0:
+            return
+        with self._lock:
+            key = (ruleset, step, pattern)
+            pc = self.patterns.get(key)
+            if pc is None:
+                pc = self.patterns[key] = PatternCost(ruleset, step, pattern)
+            pc.skipped += n
+
+    def record_step(
+        self,
+        ruleset: str,
+        step: str,
+        mode: str,
+        *,
+        base_scope: str,
+        base_idx: int,
+        base_chars: int,
+        seconds: float,
+        produced: int,
+        timed_out: bool = False,
+    ) -> None:
+        with self._lock:
+            sc = self.steps.get((ruleset, step))
+            if sc is None:
+                sc = self.steps[(ruleset, step)] = StepCost(ruleset, step, mode)
+            sc.runs += 1
+            sc.seconds += seconds
+            sc.max_seconds = max(sc.max_seconds, seconds)
+            sc.produced += produced
+            sc.base_chars += base_chars
+            sc.timeouts += int(timed_out)
+
+            bkey = (ruleset, step, base_scope, base_idx)
+            bc = self.bases.get(bkey)
+            if bc is None:
+                bc = self.bases[bkey] = BaseCost(ruleset, step, base_scope, base_idx)
+            bc.runs += 1
+            bc.seconds += seconds
+            bc.base_chars += base_chars
+
+    # -------------------------
+    # merge / export
+    # -------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "documents": self.documents,
+                "patterns": [asdict(v) for v in self.patterns.values()],
+                "steps": [asdict(v) for v in self.steps.values()],
+                "bases": [asdict(v) for v in self.bases.values()],
+            }
+
+    def merge(self, data: Dict[str, Any]) -> None:
+        """合并另一个 profiler 的 to_dict()（并行 worker / 多进程批处理）。"""
+        with self._lock:
+            self.documents += int(data.get("documents") or 0)
+            for raw in data.get("patterns") or []:
+                key = (raw["ruleset"], raw["step"], raw["pattern"])
+                _add(self.patterns.setdefault(key, PatternCost(*key)), raw)
+            for raw in data.get("steps") or []:
+                key2 = (raw["ruleset"], raw["step"])
+                sc = self.steps.setdefault(key2, StepCost(*key2, mode=raw.get("mode", "")))
+                _add(sc, raw)
+            for raw in data.get("bases") or []:
+                key4 = (raw["ruleset"], raw["step"], raw["base_scope"], raw["base_idx"])
+                _add(self.bases.setdefault(key4, BaseCost(*key4)), raw)
+
+    def summary(self, *, top: int = 20) -> Dict[str, Any]:
+        """按耗时降序的前 top 个锚点 / step / base，外加总耗时用于算占比。"""
+        data = self.to_dict()
+        total = sum(s["seconds"] for s in data["steps"]) or 0.0
+
+        def _rank(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            rows = sorted(rows, key=lambda r: r["seconds"], reverse=True)[:top]
+            for r in rows:
+                r["share"] = r["seconds"] / total if total else 0.0
+            return rows
+
+        return {
+            "documents": data["documents"],
+            "total_seconds": total,
+            "patterns": _rank(data["patterns"]),
+            "steps": _rank(data["steps"]),
+            "bases": _rank(data["bases"]),
+        }
+
+    def report(self, *, top: int = 20) -> str:
+        s = self.summary(top=top)
+        lines = [f"📊 slicing profile: documents={s['documents']} total={s['total_seconds']:.3f}s"]
+
+        lines.append(f"-- top {len(s['patterns'])} patterns by time")
+        lines.append(f"{'share':>6} {'seconds':>9} {'calls':>6} {'scans':>6} {'hits':>7} {'skipped':>7} {'scanned':>11}  step / pattern")
+        for r in s["patterns"]:
+            lines.append(
+                f"{r['share']:>6.1%} {r['seconds']:>9.4f} {r['calls']:>6} {r['scans']:>6} {r['hits']:>7} "
+                f"{r['skipped']:>7} {r['scanned_chars']:>11}  {r['ruleset']}/{r['step']} {r['pattern']!r}"
+            )
+
+        lines.append(f"-- top {len(s['steps'])} steps by time")
+        lines.append(f"{'share':>6} {'seconds':>9} {'max':>8} {'runs':>6} {'produced':>8} {'timeouts':>8}  step (mode)")
+        for r in s["steps"]:
+            lines.append(
+                f"{r['share']:>6.1%} {r['seconds']:>9.4f} {r['max_seconds']:>8.4f} {r['runs']:>6} {r['produced']:>8} "
+                f"{r['timeouts']:>8}  {r['ruleset']}/{r['step']} ({r['mode']})"
+            )
+
+        lines.append(f"-- top {len(s['bases'])} base texts by time")
+        lines.append(f"{'share':>6} {'seconds':>9} {'runs':>6} {'chars':>11}  step @ base")
+        for r in s["bases"]:
+            lines.append(
+                f"{r['share']:>6.1%} {r['seconds']:>9.4f} {r['runs']:>6} {r['base_chars']:>11}  "
+                f"{r['ruleset']}/{r['step']} @ {r['base_scope']}[{r['base_idx']}]"
+            )
+        return "\n".join(lines)
+
@@ -0,0 +1,70 @@
+"""
+切片 step 的时间预算：单个 step（通常是某个回溯失控的正则）超时只作废这个 step，不拖垮整篇文档。
+
+- 主线程（串行切片、prefork worker、切片进程池 worker）：SIGALRM 到点抛 SliceStepTimeout；
+  re 匹配过程中会检查信号，卡在 C 层的回溯也能被打断
+- 其他线程无法抢占：step 结束后再检查，超时同样作废结果
+- 与 pipeline 的阶段预算（同样用 SIGALRM）嵌套：外层剩余时间更短时不抢定时器，
+  退出时恢复外层的 handler 与剩余时间
+"""
+
+from __future__ import annotations
+
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+
+class SliceStepTimeout(TimeoutError):
+    """切片 step 耗时超过预算（params.time_budget / RuleEngineSlicer.step_budget）。"""
+
+    def __init__(self, step: str, budget: float, elapsed: float) -> None:
+        super().__init__(f"slice step '{step}' exceeded budget {budget:.2f}s (elapsed {elapsed:.2f}s)")
+        self.step = step
+        self.budget = budget
+        self.elapsed = elapsed
+
+    def __reduce__(self) -> Any:
+        return (type(self), (self.step, self.budget, self.elapsed))
+
+
+def _alarm_available() -> bool:
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+@contextmanager
+def step_deadline(step: str, budget: Optional[float]) -> Iterator[None]:
+    if not budget or budget <= 0:
+        yield
+        return
+
+    t0 = time.monotonic()
+    armed = False
+    outer_left = 0.0
+    prev_handler: Any = None
+    if _alarm_available():
+        outer_left = signal.getitimer(signal.ITIMER_REAL)[0]
+        # 外层定时器先到期：交给外层处理，这里只做事后检查
+        armed = not outer_left or outer_left > budget
+    if armed:
+
+        def _on_alarm(signum: int, frame: Any) -> None:
+            raise SliceStepTimeout(step, budget, time.monotonic() - t0)
+
+        prev_handler = signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, budget)
+    try:
+        yield
+    finally:
+        if armed:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, prev_handler)
+            if outer_left:
+                # 外层已过期就让它尽快触发
+                signal.setitimer(signal.ITIMER_REAL, max(outer_left - (time.monotonic() - t0), 1e-6))
+
+    elapsed = time.monotonic() - t0
+    if elapsed > budget:
+        raise SliceStepTimeout(step, budget, elapsed)
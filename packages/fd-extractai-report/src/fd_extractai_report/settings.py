@@ -19,10 +19,24 @@ class LLMConfig:
     api_key: str = ""
     timeout: int = 600
     enable_ocr: bool = False
+    # 按需 OCR：先纯文本转换，只有所需切片缺失时才带 OCR 重新转换
+    ocr_on_demand: bool = False
     ocr_model_id: str = ""
     ocr_base_url: str = ""
     ocr_api_key: str = ""
     ocr_prompt: str = ""
+    # OCR 缓存文件；为空时用 ~/.cache/fd_extractai/ocr.sqlite（跨批次 / 跨进程共享），":memory:" 仅进程内
+    ocr_cache_path: str = ""
+    ocr_cache_max_entries: int = 5000
+    # 进程级 MarkItDown 池的条数上限（LRU 淘汰），按租户 / 请求变化的 OCR 配置不会无限累积实例
+    markitdown_pool_max: int = 8
+    # 并发转换的内存预算（MB），0 表示不做准入控制
+    convert_memory_budget_mb: int = 0
+    # 切片进程数（<=1 不并行）；markdown 短于 slice_parallel_min_chars 时仍走串行
+    slice_workers: int = 0
+    slice_parallel_min_chars: int = 200_000
+    # 单个切片 step 的时间预算（秒），0 表示不限制；超时的 step 不产出切片，记到 ctx.metadata["slice_timeouts"]
+    slice_step_budget: float = 0.0
     options: Dict[str, Any] = field(default_factory=dict)
 
     @classmethod
@@ -33,10 +47,18 @@ class LLMConfig:
             api_key=os.getenv("LLM_API_KEY", ""),
             timeout=int(os.getenv("LLM_TIMEOUT", "600")),
             enable_ocr=_env_bool("LLM_ENABLE_OCR", False),
+            ocr_on_demand=_env_bool("LLM_OCR_ON_DEMAND", False),
             ocr_model_id=os.getenv("LLM_OCR_MODEL_ID", ""),
             ocr_base_url=os.getenv("LLM_OCR_BASE_URL", ""),
             ocr_api_key=os.getenv("LLM_OCR_API_KEY", ""),
             ocr_prompt=os.getenv("LLM_OCR_PROMPT", ""),
+            ocr_cache_path=os.getenv("LLM_OCR_CACHE_PATH", ""),
+            ocr_cache_max_entries=int(os.getenv("LLM_OCR_CACHE_MAX_ENTRIES", "5000")),
+            markitdown_pool_max=int(os.getenv("LLM_MARKITDOWN_POOL_MAX", "8")),
+            convert_memory_budget_mb=int(os.getenv("LLM_CONVERT_MEMORY_BUDGET_MB", "0")),
+            slice_workers=int(os.getenv("LLM_SLICE_WORKERS", "0")),
+            slice_parallel_min_chars=int(os.getenv("LLM_SLICE_PARALLEL_MIN_CHARS", "200000")),
+            slice_step_budget=float(os.getenv("LLM_SLICE_STEP_BUDGET", "0")),
         )
 
     def with_options(self, **kwargs: Any) -> "LLMConfig":
@@ -48,10 +70,18 @@ class LLMConfig:
             api_key=self.api_key,
             timeout=self.timeout,
             enable_ocr=self.enable_ocr,
+            ocr_on_demand=self.ocr_on_demand,
             ocr_model_id=self.ocr_model_id,
             ocr_base_url=self.ocr_base_url,
             ocr_api_key=self.ocr_api_key,
             ocr_prompt=self.ocr_prompt,
+            ocr_cache_path=self.ocr_cache_path,
+            ocr_cache_max_entries=self.ocr_cache_max_entries,
+            markitdown_pool_max=self.markitdown_pool_max,
+            convert_memory_budget_mb=self.convert_memory_budget_mb,
+            slice_workers=self.slice_workers,
+            slice_parallel_min_chars=self.slice_parallel_min_chars,
+            slice_step_budget=self.slice_step_budget,
             options=merged,
         )
 
@@ -2,11 +2,21 @@ from __future__ import annotations
 
 import re
 from collections import defaultdict
-from typing import Any, Dict, List, Pattern
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Pattern
 
-from markdown_it import MarkdownIt
+if TYPE_CHECKING:
+    from markdown_it import MarkdownIt
 
-_md = MarkdownIt()
+_md: Optional["MarkdownIt"] = None
+
+
+def _get_md() -> "MarkdownIt":
+    global _md
+    if _md is None:
+        from markdown_it import MarkdownIt
+
+        _md = MarkdownIt()
+    return _md
 
 
 def normalize_title(title: str) -> str:
@@ -28,7 +38,7 @@ def sectionize(md_text: str) -> List[Dict[str, Any]]:
         }
     ]
     """
-    tokens = _md.parse(md_text)
+    tokens = _get_md().parse(md_text)
     sections: List[Dict[str, Any]] = []
     stack: List[tuple[int, int, str]] = []
 
@@ -134,7 +144,7 @@ def find_blocks_by_pattern(
     命中段落 => 返回该段落
     """
     rx = re.compile(pattern, re.I) if isinstance(pattern, str) else pattern
-    tokens = _md.parse(md_text)
+    tokens = _get_md().parse(md_text)
     lines = md_text.splitlines()
 
     results: List[Dict[str, Any]] = []
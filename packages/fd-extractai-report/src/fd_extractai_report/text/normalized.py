@@ -0,0 +1,161 @@
+"""
+归一化文本视图：去掉全部空白、全角 ASCII 转半角、大小写折叠，并保留回到原文的偏移映射。
+
+用于 by_regex_between 的 loose_space：原来把锚点改写成 `估\\s*价\\s*结\\s*果\\s*` 再扫全文，
+空白很长时回溯严重；现在在视图上做普通的 str.find，命中再映射回原文的精确区间。
+
+与原正则的区间保持一致：
+- 命中末尾吞掉紧随的空白（对应模式末尾的 \\s*）
+- 锚点以空白开头时，命中起点向前吞掉相邻空白（对应模式开头的 \\s*），但不越过扫描起点 / 上一个命中
+- 视图里 　 / \\xa0 等与其他空白一样被去掉；全角标点与半角视为相同（比原正则更宽松，是有意的）
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Optional
+
+# \s 与 str.isspace 一致（含 　 / \xa0）
+_WS_RE = re.compile(r"\s+")
+
+# 全角 ASCII（！..～）-> 半角；正则替换比 str.translate(dict) 逐字查表快得多
+_FULLWIDTH_RE = re.compile("[\uff01-\uff5e]")
+_FULLWIDTH_MAP = {chr(cp): chr(cp - 0xFEE0) for cp in range(0xFF01, 0xFF5F)}
+
+# 与正则的 flags 区分，避免与同名的真正则共用锚点索引的 key
+LOOSE_FLAG = 1 << 30
+
+
+def _half(m: re.Match) -> str:
+    return _FULLWIDTH_MAP[m.group()]
+
+
+def _fold(s: str) -> str:
+    s = _FULLWIDTH_RE.sub(_half, s)
+    low = s.lower()
+    if len(low) == len(s):
+        return low
+    # 少数字符 lower() 后变长（如 "İ"），逐字处理保证与原文一一对应
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in s)
+
+
+def normalize_text(s: str) -> str:
+    """锚点归一化：去空白 + 折叠宽度 / 大小写。"""
+    return _fold(_WS_RE.sub("", s or ""))
+
+
+class NormalizedMatch:
+    """与 re.Match 用法兼容的最小子集：start() / end() / group(0)。"""
+
+    __slots__ = ("string", "_start", "_end")
+
+    def __init__(self, string: str, start: int, end: int) -> None:
+        self.string = string
+        self._start = start
+        self._end = end
+
+    def start(self, group: int = 0) -> int:
+        return self._start
+
+    def end(self, group: int = 0) -> int:
+        return self._end
+
+    def span(self, group: int = 0) -> tuple[int, int]:
+        return self._start, self._end
+
+    def group(self, group: int = 0) -> str:
+        return self.string[self._start : self._end]
+
+    def __repr__(self) -> str:
+        return f"<NormalizedMatch span=({self._start}, {self._end}) match={self.group()!r}>"
+
+
+class NormalizedText:
+    """
+    original：原文
+    text：归一化视图
+    原文下标 = 视图下标 + 在它之前删掉的空白数；删除点按视图下标记在 _keys，累计删除数在 _deleted
+    """
+
+    __slots__ = ("original", "text", "_keys", "_deleted")
+
+    def __init__(self, original: str) -> None:
+        self.original = original or ""
+        # 全部走 C 层迭代：百万字符、十万级空白段时逐段的 Python 循环是主要开销
+        # parts[k] 之后紧跟 runs[k]；第 k 段空白在视图中的位置 = parts[0..k] 的总长
+        parts = _WS_RE.split(self.original)
+        runs = _WS_RE.findall(self.original)
+        self._keys: List[int] = list(accumulate(map(len, parts[:-1])))
+        self._deleted: List[int] = list(accumulate(map(len, runs)))
+        self.text = _fold("".join(parts))
+
+    def to_original(self, i: int) -> int:
+        """视图下标 -> 原文下标。"""
+        k = bisect_right(self._keys, i)
+        return i + (self._deleted[k - 1] if k else 0)
+
+    def to_normalized(self, pos: int) -> int:
+        """原文下标 -> 第一个原文下标 >= pos 的视图字符的下标。"""
+        lo, hi = 0, len(self.text)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.to_original(mid) < pos:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def finditer(self, needle: str, pos: int = 0, *, leading_space: bool = False) -> List[NormalizedMatch]:
+        """
+        needle 为已归一化的锚点；返回原文上的非重叠命中，语义同 loose 正则的 finditer(original, pos)。
+        leading_space：原锚点以空白开头（模式开头有 \\s*）。
+        """
+        out: List[NormalizedMatch] = []
+        if not needle:
+            return out
+        original = self.original
+        n = len(needle)
+        floor = pos
+        i = self.text.find(needle, self.to_normalized(pos) if pos else 0)
+        while i >= 0:
+            start = self.to_original(i)
+            if leading_space:
+                while start > floor and original[start - 1].isspace():
+                    start -= 1
+            end = self.to_original(i + n - 1) + 1
+            ws = _WS_RE.match(original, end)
+            if ws:
+                end = ws.end()
+            out.append(NormalizedMatch(original, start, end))
+            floor = end
+            i = self.text.find(needle, i + n)
+        return out
+
+
+class LoosePattern:
+    """
+    loose_space 锚点：按字面量在归一化视图上查找。
+    pattern 保留原来的 \\s* 改写形式，切片 metadata 里的 "pat" 字段不变。
+    """
+
+    __slots__ = ("source", "needle", "pattern", "flags", "leading_space")
+
+    def __init__(self, source: str, pattern: str) -> None:
+        self.source = source
+        self.needle = normalize_text(source)
+        self.pattern = pattern
+        self.flags = LOOSE_FLAG
+        self.leading_space = bool(source) and source[0].isspace()
+
+    def finditer(self, text: str, pos: int = 0, *, view: Optional[NormalizedText] = None) -> List[NormalizedMatch]:
+        view = view if view is not None and view.original is text else NormalizedText(text)
+        return view.finditer(self.needle, pos, leading_space=self.leading_space)
+
+    def search(self, text: str, pos: int = 0) -> Optional[NormalizedMatch]:
+        matches = self.finditer(text, pos)
+        return matches[0] if matches else None
+
+    def __repr__(self) -> str:
+        return f"LoosePattern({self.source!r})"
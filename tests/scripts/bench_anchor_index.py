@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "packages/fd-extractai-report/src"))
+
+if hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+
+from fd_extractai_report.context import ReportContext
+from fd_extractai_report.rules.slicing.registry import get_ruleset
+from fd_extractai_report.rules.slicing.schema import SliceRuleSet, SliceStep
+from fd_extractai_report.sections.rule_engine_slicer import RuleEngineSlicer
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="RuleEngineSlicer with vs without the document-wide anchor index (output must be identical)."
+    )
+    parser.add_argument("input", type=Path, nargs="?", help="A markdown file; default builds a synthetic report.")
+    parser.add_argument("--report-type", default="", help="Use the registered slicing ruleset of this type.")
+    parser.add_argument("--chars", type=int, default=1_500_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser
+
+
+def synthetic_markdown(chars: int) -> str:
+    para = "估价对象位于某市某区某路某号，建筑面积 123.45 平方米，用途为住宅。估价师依据市场比较法进行测算。\n\n"
+    table = "| 项目 | 内容 |\n| --- | --- |\n| 坐落 | 某路某号 |\n| 面积 | 123.45 |\n| 用途 | 住宅 |\n\n"
+    parts: List[str] = []
+    size = 0
+    i = 0
+    while size < chars:
+        block = (
+            f"## 第{i}章 估价结果报告\n\n" + para * 20 + "### 估价对象基本状况\n\n" + table
+            + "### 估价结果\n\n" + para * 10 + "### 估价的假设和限制条件\n\n" + para * 5
+            + f"## 第{i}章 附件\n\n" + para * 5
+        )
+        parts.append(block)
+        size += len(block)
+        i += 1
+    return "".join(parts)
+
+
+def synthetic_ruleset() -> SliceRuleSet:
+    """同一组起止锚点被多个 step 反复使用，贴近真实 ruleset（封面 / 摘要 / 结果 / 附表都以同几个标题定界）。"""
+    between = {"loose_space": True, "fallback_end_chars": 12000, "skip_if_line_matches": [r"\.{6,}\s*\d+\s*$"]}
+    starts = ["估价结果报告", "估价对象基本状况", "估价结果", "估价的假设和限制条件"]
+    ends = ["附件", "估价的假设和限制条件", "估价对象基本状况"]
+    steps: List[SliceStep] = []
+    for i, start in enumerate(starts):
+        for pick in ("earliest", "priority"):
+            steps.append(
+                SliceStep(
+                    key=f"between_{i}_{pick}",
+                    mode="by_regex_between",
+                    targets=[start, starts[(i + 1) % len(starts)]],
+                    params={**between, "ends": ends, "pick": pick},
+                )
+            )
+        steps.append(SliceStep(key=f"window_{i}", mode="by_window_after", targets=[start, "市场比较法"], params={"window_chars": 3000}))
+        steps.append(SliceStep(key=f"table_{i}", mode="by_table_after", targets=[f"### {start}"]))
+    steps.append(SliceStep(key="tables", mode="by_segment_tables", targets=["估价对象基本状况", "基本状况"], params={"max_hits_per_pattern": 50}))
+    return SliceRuleSet(name="bench_anchor_index", defaults={"dedup": True, "max_chars": 20000}, steps=steps)
+
+
+def _snapshot(ctx: ReportContext) -> str:
+    return json.dumps(
+        {k: [[s.title, s.text, s.metadata] for s in v] for k, v in ctx.slices.items()},
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+    )
+
+
+def _run(slicer: RuleEngineSlicer, markdown: str, repeat: int) -> tuple[float, str]:
+    best = float("inf")
+    snap = ""
+    for _ in range(max(1, repeat)):
+        ctx = ReportContext()
+        ctx.set_markdown(markdown)
+        t0 = time.perf_counter()
+        slicer(ctx)
+        best = min(best, time.perf_counter() - t0)
+        snap = _snapshot(ctx)
+    return best, snap
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    markdown = args.input.read_text(encoding="utf-8") if args.input else synthetic_markdown(args.chars)
+    ruleset = get_ruleset(args.report_type) if args.report_type else synthetic_ruleset()
+
+    plain_cost, plain_snap = _run(RuleEngineSlicer(ruleset, anchor_index=False), markdown, args.repeat)
+    indexed = RuleEngineSlicer(ruleset)
+    index_cost, index_snap = _run(indexed, markdown, args.repeat)
+
+    literals, patterns = indexed.anchor_specs(ruleset)
+    stats = indexed.build_anchor_index(markdown, ruleset).stats
+    print(
+        f"markdown_chars={len(markdown)} steps={len(ruleset.steps)} "
+        f"distinct_anchors={len(literals) + len(patterns)} prebuilt={stats['indexed']}"
+    )
+    print(f"no index   {plain_cost * 1000:.1f}ms")
+    print(f"with index {index_cost * 1000:.1f}ms ({plain_cost / index_cost if index_cost else 0:.2f}x)")
+    print(f"identical={plain_snap == index_snap}")
+    return 0 if plain_snap == index_snap else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
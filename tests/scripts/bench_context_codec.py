@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import argparse
+import json
+import pickle
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "packages/fd-extractai-report/src"))
+
+if hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+
+from fd_extractai_report.codec import decode_context, encode_context
+from fd_extractai_report.context import ReportContext, ReportSection
+from fd_extractai_report.pipeline import ReportPipeline
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Compare ReportContext serialization: json(indent=2) vs pickle vs FDRC binary codec."
+    )
+    parser.add_argument("input", type=Path, nargs="?", help="A report file or a directory of .docx/.pdf files.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        default=0,
+        help="Skip conversion; build a context with N regex_between-style slices over a generated markdown.",
+    )
+    return parser
+
+
+def synthetic_context(n_slices: int, *, chars_per_slice: int = 3000) -> ReportContext:
+    """生成与 by_regex_between 输出形状相近的 context：切片是 markdown 的子串，metadata 带命中列表。"""
+    paragraph = "估价对象位于某市某区某路某号，建筑面积 123.45 平方米，用途为住宅，权利人为某某。\n\n"
+    blocks = []
+    for i in range(n_slices):
+        body = f"## 第{i}节 估价结果\n\n" + paragraph * (chars_per_slice // len(paragraph))
+        blocks.append(body)
+    markdown = "".join(blocks)
+
+    ctx = ReportContext(markdown_text=markdown)
+    ctx.set_metadata(report_type="house", report_type_confidence=0.92)
+    pos = 0
+    for i, body in enumerate(blocks):
+        hit = {"pattern": "估价结果", "pos": pos, "end": pos + 8, "line": body[:40], "kind": "start"}
+        ctx.add_slice(
+            ReportSection(
+                key=f"section_{i % 8}",
+                title=f"第{i}节 估价结果",
+                text=body,
+                metadata={
+                    "ruleset": "house_default",
+                    "mode": "by_regex_between",
+                    "start": hit,
+                    "end": {**hit, "kind": "end", "pos": pos + len(body)},
+                    "skipped": {"start": [hit] * 3, "end": []},
+                    "start_candidates": 2,
+                    "end_candidates": 3,
+                    "start_line_preview": body[:80],
+                    "end_line_preview": body[-80:],
+                },
+            )
+        )
+        pos += len(body)
+    return ctx
+
+
+def _best(fn: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    best = float("inf")
+    out = None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def _normalized(ctx: ReportContext) -> Any:
+    return json.loads(json.dumps(ctx.to_dict(), ensure_ascii=False, default=str))
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    if args.synthetic:
+        contexts = [(f"synthetic-{args.synthetic}", lambda: synthetic_context(args.synthetic))]
+    else:
+        if args.input is None:
+            print("input is required unless --synthetic is given")
+            return 1
+        root = args.input.resolve()
+        files = sorted(p for p in root.rglob("*") if p.suffix.lower() in (".docx", ".pdf")) if root.is_dir() else [root]
+        if not files:
+            print(f"no report files under {root}")
+            return 1
+        pipe = ReportPipeline()
+        contexts = [
+            (path.name, lambda path=path: pipe.run_until(docx_path=path, until="slice"))
+            for path in files
+        ]
+
+    totals: Dict[str, list] = {}
+    for name, build in contexts:
+        try:
+            ctx = build()
+        except Exception as exc:
+            print(f"{name}: failed {exc!r}")
+            continue
+
+        codecs: Dict[str, Callable[[], bytes]] = {
+            "json_indent": lambda: json.dumps(ctx.to_dict(), ensure_ascii=False, indent=2, default=str).encode("utf-8"),
+            "pickle": lambda: pickle.dumps(ctx, protocol=pickle.HIGHEST_PROTOCOL),
+            "fdrc": lambda: encode_context(ctx),
+            "fdrc_zlib": lambda: encode_context(ctx, compress=True),
+        }
+        line = [f"{name}: slices={sum(ctx.slice_counts().values())}"]
+        for name, fn in codecs.items():
+            cost, data = _best(fn, args.repeat)
+            totals.setdefault(name, [0, 0.0])
+            totals[name][0] += len(data)
+            totals[name][1] += cost
+            line.append(f"{name}={len(data) / 1024:.1f}KB/{cost * 1000:.2f}ms")
+
+        # 比较 JSON 归一化后的结果（codec 保留 tuple，json 会转成 list）
+        back = decode_context(encode_context(ctx, compress=True))
+        same = _normalized(back) == _normalized(ctx)
+        line.append(f"roundtrip={'ok' if same else 'DIFF'}")
+        print(" ".join(line))
+
+    base_size, base_cost = totals.get("json_indent", [0, 0.0])
+    for name, (size, cost) in totals.items():
+        print(
+            f"{name:12s} size={size / 1024:.1f}KB ({base_size / size if size else 0:.1f}x smaller) "
+            f"encode={cost * 1000:.2f}ms ({base_cost / cost if cost else 0:.1f}x faster)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import argparse
+import difflib
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "packages/fd-extractai-report/src"))
+
+if hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+
+from fd_extractai_report.converters.markdown_converter import (
+    MarkdownConvertOptions,
+    MarkdownFileConverter,
+)
+from fd_extractai_report.settings import LLMConfig
+
+
+_NORMALIZE_RE = re.compile(r"[\s|#*\-_:]+")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Compare native DOCX fast path against MarkItDown (text parity + throughput)."
+    )
+    parser.add_argument(
+        "input",
+        type=Path,
+        nargs="?",
+        help="A .docx file or a directory containing .docx files; a generated sample DOCX is always checked too.",
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--min-similarity", type=float, default=0.95)
+    return parser
+
+
+def _normalize(text: str) -> str:
+    # 忽略 markdown 标记和空白差异，只比较正文字符
+    return _NORMALIZE_RE.sub("", text or "")
+
+
+# 生成样例里必须出现在两种后端输出中的正文
+_SAMPLE_TEXTS = ["估价结果报告", "本报告估价对象为住宅用房", "权利人", "张三", "坐落", "某市某路1号", "用途", "住宅", "合并单元格说明"]
+
+
+def _sample_docx(path: Path) -> Path:
+    """标题 + 段落 + 含横向 / 纵向合并单元格的表格。"""
+    from docx import Document
+
+    doc = Document()
+    doc.add_heading("估价结果报告", level=1)
+    doc.add_paragraph("本报告估价对象为住宅用房，价值时点为2024年1月1日。")
+    table = doc.add_table(rows=4, cols=3)
+    rows = [["权利人", "张三", ""], ["坐落", "某市某路1号", ""], ["用途", "住宅", "成套"], ["", "合并单元格说明", ""]]
+    for r, row in enumerate(rows):
+        for c, text in enumerate(row):
+            if text:
+                table.cell(r, c).text = text
+    table.cell(0, 1).merge(table.cell(0, 2))  # 横向合并
+    table.cell(1, 1).merge(table.cell(1, 2))
+    table.cell(2, 0).merge(table.cell(3, 0))  # 纵向合并
+    table.cell(3, 1).merge(table.cell(3, 2))
+    doc.add_paragraph("以上内容仅供测试。")
+    doc.save(path)
+    return path
+
+
+def _timed(converter: MarkdownFileConverter, path: Path, repeat: int) -> tuple[float, str]:
+    best = float("inf")
+    text = ""
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        text = converter.convert(path)
+        best = min(best, time.perf_counter() - t0)
+    return best, text
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    tmpdir = tempfile.TemporaryDirectory()
+    sample = _sample_docx(Path(tmpdir.name) / "generated_sample.docx")
+    files: List[Path] = [sample]
+    if args.input is not None:
+        root = args.input.resolve()
+        found = sorted(root.rglob("*.docx")) if root.is_dir() else [root]
+        found = [f for f in found if not f.name.startswith("~$")]
+        if not found:
+            print(f"no .docx found under {root}")
+            return 1
+        files.extend(found)
+
+    llm_config = LLMConfig.from_env()
+    markitdown = MarkdownFileConverter(
+        MarkdownConvertOptions(enable_ocr=False, docx_backend="markitdown"), llm_config=llm_config
+    )
+    native = MarkdownFileConverter(
+        MarkdownConvertOptions(enable_ocr=False, docx_backend="native"), llm_config=llm_config
+    )
+
+    total_md = total_native = 0.0
+    below = failed = 0
+    for path in files:
+        try:
+            cost_md, text_md = _timed(markitdown, path, args.repeat)
+            cost_native, text_native = _timed(native, path, args.repeat)
+        except Exception as exc:
+            print(f"{path.name}: failed {exc!r}")
+            failed += 1
+            continue
+
+        if path == sample:
+            missing = [t for t in _SAMPLE_TEXTS if t not in text_md or t not in text_native]
+            if missing or "# 估价结果报告" not in text_native:
+                print(f"{path.name}: missing {missing} (native heading={'# 估价结果报告' in text_native})")
+                print(f"--- markitdown\n{text_md}\n--- native\n{text_native}")
+                failed += 1
+
+        ratio = difflib.SequenceMatcher(
+            None, _normalize(text_md), _normalize(text_native), autojunk=False
+        ).ratio()
+        total_md += cost_md
+        total_native += cost_native
+        flag = "" if ratio >= args.min_similarity else "  <-- below threshold"
+        below += int(ratio < args.min_similarity)
+        print(
+            f"{path.name}: similarity={ratio:.4f} "
+            f"markitdown={cost_md:.3f}s native={cost_native:.3f}s{flag}"
+        )
+
+    speedup = total_md / total_native if total_native else 0.0
+    print(
+        f"files={len(files)} below_threshold={below} failed={failed} "
+        f"markitdown={total_md:.2f}s native={total_native:.2f}s speedup={speedup:.1f}x"
+    )
+    tmpdir.cleanup()
+    return 1 if below or failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+
+ROOT = Path(__file__).resolve().parents[2]
+SRC = ROOT / "packages/fd-extractai-report/src"
+
+if hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+
+DEFAULT_TARGETS = [
+    "fd_extractai_report",
+    "fd_extractai_report.pipeline",
+    "fd_extractai_report.converters",
+    "fd_extractai_report.archive_ingest",
+]
+
+# 这些模块不应该在 import 阶段被加载（首次使用时才加载）
+LAZY_MODULES = [
+    "markitdown",
+    "langextract",
+    "markdown_it",
+    "fd_extractai_report.examples.report_examples",
+    "fd_extractai_report.rules.extracting.default_rulesets",
+]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Per-module import time breakdown (python -X importtime) for cold start."
+    )
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS)
+    parser.add_argument("--top", type=int, default=15, help="Show the N slowest modules (cumulative).")
+    parser.add_argument(
+        "--construct",
+        action="store_true",
+        help="Also time ReportPipeline() construction in the same cold process.",
+    )
+    return parser
+
+
+def _run_importtime(code: str) -> Tuple[List[Tuple[int, int, str]], str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC), env.get("PYTHONPATH", "")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    rows: List[Tuple[int, int, str]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cum_us, name = line.split(":", 1)[1].split("|", 2)
+            rows.append((int(self_us), int(cum_us), name.rstrip()))
+        except ValueError:
+            continue
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "import failed")
+    return rows, proc.stdout
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+
+    for target in args.targets:
+        probe = (
+            "import sys, time\n"
+            f"import {target}\n"
+            f"print('LAZY', ','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))\n"
+        )
+        if args.construct:
+            probe += (
+                "t0 = time.perf_counter()\n"
+                "from fd_extractai_report.pipeline import ReportPipeline\n"
+                "ReportPipeline()\n"
+                "print('CONSTRUCT', time.perf_counter() - t0)\n"
+            )
+        try:
+            rows, stdout = _run_importtime(probe)
+        except RuntimeError as exc:
+            print(f"{target}: failed {exc}")
+            continue
+
+        own = [r for r in rows if r[2].strip() == target]
+        total_us = own[-1][1] if own else sum(r[0] for r in rows)
+        print("=" * 72)
+        print(f"{target}: cumulative={total_us / 1000:.1f}ms modules={len(rows)}")
+
+        for self_us, cum_us, name in sorted(rows, key=lambda r: r[1], reverse=True)[: args.top]:
+            print(f"  {cum_us / 1000:9.1f}ms  self={self_us / 1000:7.1f}ms  {name.strip()}")
+
+        for line in stdout.splitlines():
+            if line.startswith("LAZY"):
+                loaded = line[len("LAZY"):].strip()
+                print(f"  eagerly loaded heavy modules: {loaded or '-'}")
+            elif line.startswith("CONSTRUCT"):
+                print(f"  ReportPipeline() construct: {float(line.split()[1]) * 1000:.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
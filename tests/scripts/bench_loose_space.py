@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "packages/fd-extractai-report/src"))
+
+if hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+
+from fd_extractai_report.sections.rule_engine_slicer import _loose_space_pattern
+from fd_extractai_report.text.normalized import LoosePattern, NormalizedText
+
+
+ANCHORS = [
+    "估价结果报告",
+    "估价对象基本状况",
+    "估价结果",
+    "估价的假设和限制条件",
+    "附件",
+    " 估价方法",
+    "致估价委托人函",
+    "注册房地产估价师",
+]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="loose_space anchors: \\s*-rewritten regex vs the normalized-text view (spans must be identical)."
+    )
+    parser.add_argument("input", type=Path, nargs="?", help="A markdown file; default runs two synthetic shapes.")
+    parser.add_argument("--chars", type=int, default=1_500_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser
+
+
+def report_like(chars: int) -> str:
+    para = "估价对象位于某市某区某路某号，建筑面积 123.45 平方米，用途为住宅。估价师依据市场比较法进行测算。\n\n"
+    block = "## 估价结果报告\n\n" + para * 20 + "### 估价对象基本状况\n\n" + para * 5 + "### 估价结果\n\n" + para * 10
+    return (block * (chars // len(block) + 1))[:chars]
+
+
+def ocr_like(chars: int) -> str:
+    """OCR / 扫描件常见形态：字间插空格、整行用大段空白对齐，锚点首字高频出现。"""
+    line = "估 价 " + " " * 400 + "对 象" + "　" * 200 + "估" + " " * 300 + "价 结 果\n" + "  \n" * 30
+    return (line * (chars // len(line) + 1))[:chars]
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench(name: str, text: str, repeat: int) -> bool:
+    regexes = [re.compile(_loose_space_pattern(a), re.IGNORECASE | re.MULTILINE) for a in ANCHORS]
+    loose = [LoosePattern(a, _loose_space_pattern(a)) for a in ANCHORS]
+
+    def run_regex() -> List[List[tuple]]:
+        return [[m.span() for m in rx.finditer(text)] for rx in regexes]
+
+    def run_view() -> List[List[tuple]]:
+        view = NormalizedText(text)
+        return [[m.span() for m in lp.finditer(text, view=view)] for lp in loose]
+
+    same = run_regex() == run_view()
+    regex_cost = _best(run_regex, repeat)
+    build_cost = _best(lambda: NormalizedText(text), repeat)
+    view_cost = _best(run_view, repeat)
+    print(f"[{name}] chars={len(text)} anchors={len(ANCHORS)} hits={sum(map(len, run_view()))}")
+    print(f"   regex \\s*   {regex_cost * 1000:.1f}ms")
+    print(f"   view        {view_cost * 1000:.1f}ms (build {build_cost * 1000:.1f}ms, {regex_cost / view_cost if view_cost else 0:.2f}x)")
+    print(f"   identical={same}")
+    return same
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    if args.input:
+        ok = bench(args.input.name, args.input.read_text(encoding="utf-8"), args.repeat)
+    else:
+        ok = bench("report", report_like(args.chars), args.repeat)
+        ok = bench("ocr", ocr_like(args.chars), args.repeat) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
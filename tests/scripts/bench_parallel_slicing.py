@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, List
+
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "packages/fd-extractai-report/src"))
+
+if hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+
+from fd_extractai_report.context import ReportContext
+from fd_extractai_report.rules.slicing.schema import SliceRuleSet, SliceStep
+from fd_extractai_report.sections.parallel import ParallelSlicing, shutdown_slice_executors
+from fd_extractai_report.sections.rule_engine_slicer import RuleEngineSlicer
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Compare serial vs multi-process RuleEngineSlicer on a large markdown (output must be identical)."
+    )
+    parser.add_argument("input", type=Path, nargs="?", help="A markdown file; default builds a synthetic report.")
+    parser.add_argument("--chars", type=int, default=1_500_000, help="Synthetic markdown size.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser
+
+
+def synthetic_markdown(chars: int) -> str:
+    """章节标题 + 正文段落 + 表格循环拼接，接近长篇估价报告的结构。"""
+    para = "估价对象位于某市某区某路某号，建筑面积 123.45 平方米，用途为住宅。估价师依据市场比较法进行测算。\n\n"
+    table = "| 项目 | 内容 |\n| --- | --- |\n| 坐落 | 某路某号 |\n| 面积 | 123.45 |\n| 用途 | 住宅 |\n\n"
+    parts: List[str] = []
+    size = 0
+    i = 0
+    while size < chars:
+        block = (
+            f"## 第{i}章 估价结果报告\n\n" + para * 20 + "### 估价对象基本状况\n\n" + table
+            + "### 估价结果\n\n" + para * 10 + f"## 第{i}章 附件\n\n" + para * 5
+        )
+        parts.append(block)
+        size += len(block)
+        i += 1
+    return "".join(parts)
+
+
+def synthetic_ruleset() -> SliceRuleSet:
+    between = {
+        "loose_space": True,
+        "pick": "earliest",
+        "include_start": True,
+        "include_end": False,
+        "fallback_end_chars": 12000,
+        "skip_if_line_matches": [r"\.{6,}\s*\d+\s*$"],
+    }
+    return SliceRuleSet(
+        name="bench_parallel",
+        defaults={"dedup": True, "max_chars": 20000},
+        steps=[
+            SliceStep(key="cover", mode="by_regex_between", targets=["估价结果报告"], params={**between, "ends": ["估价对象基本状况"]}),
+            SliceStep(key="result", mode="by_regex_between", targets=["估价结果$"], params={**between, "ends": ["附件"]}),
+            SliceStep(key="object_tables", mode="by_segment_tables", targets=[r"估价对象基本状况"], params={"max_hits_per_pattern": 200}),
+            SliceStep(key="method", mode="by_window_after", targets=["市场比较法"], params={"window_chars": 4000}),
+            SliceStep(key="annex", mode="by_regex_block", targets=[r"附\s*件"]),
+            SliceStep(key="result_tables", mode="by_segment_tables", targets=[r"基本状况"], within="cover", missing="full"),
+        ],
+    )
+
+
+def _snapshot(ctx: ReportContext) -> Any:
+    return json.dumps(
+        {k: [[s.title, s.text, s.metadata] for s in v] for k, v in ctx.slices.items()},
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+    )
+
+
+def _run(slicer: RuleEngineSlicer, markdown: str, repeat: int) -> tuple[float, str]:
+    best = float("inf")
+    snap = ""
+    for _ in range(max(1, repeat)):
+        ctx = ReportContext()
+        ctx.set_markdown(markdown)
+        t0 = time.perf_counter()
+        slicer(ctx)
+        best = min(best, time.perf_counter() - t0)
+        snap = _snapshot(ctx)
+    return best, snap
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    markdown = args.input.read_text(encoding="utf-8") if args.input else synthetic_markdown(args.chars)
+    ruleset = synthetic_ruleset()
+
+    serial = RuleEngineSlicer(ruleset)
+    parallel = RuleEngineSlicer(ruleset, parallel=ParallelSlicing(workers=args.workers, min_chars=0))
+
+    # 预热进程池，避免把 fork 开销算进第一轮
+    _run(parallel, markdown[:10000], 1)
+
+    serial_cost, serial_snap = _run(serial, markdown, args.repeat)
+    parallel_cost, parallel_snap = _run(parallel, markdown, args.repeat)
+    shutdown_slice_executors()
+
+    print(f"markdown_chars={len(markdown)} steps={len(ruleset.steps)} workers={args.workers}")
+    print(f"serial   {serial_cost * 1000:.1f}ms")
+    print(f"parallel {parallel_cost * 1000:.1f}ms ({serial_cost / parallel_cost if parallel_cost else 0:.2f}x)")
+    print(f"identical={serial_snap == parallel_snap}")
+    return 0 if serial_snap == parallel_snap else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "packages/fd-extractai-report/src"))
+
+if hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+
+from fd_extractai_report.converters.markdown_converter import (
+    MarkdownConvertOptions,
+    MarkdownFileConverter,
+)
+from fd_extractai_report.converters.pdf_parallel import PDF_TEXT_BACKENDS
+from fd_extractai_report.settings import LLMConfig
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark PDF text backends (serial MarkItDown vs page-parallel).")
+    parser.add_argument("input", type=Path, help="Input PDF path.")
+    parser.add_argument(
+        "--backends",
+        default=",".join(PDF_TEXT_BACKENDS),
+        help="Comma separated backend names for the page-parallel path.",
+    )
+    parser.add_argument("--pages-per-chunk", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1)
+    return parser
+
+
+def _timed(converter: MarkdownFileConverter, path: Path, repeat: int) -> tuple[float, str]:
+    best = float("inf")
+    text = ""
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        text = converter.convert(path)
+        best = min(best, time.perf_counter() - t0)
+    return best, text
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    path = args.input.resolve()
+    llm_config = LLMConfig.from_env()
+
+    baseline = MarkdownFileConverter(
+        MarkdownConvertOptions(enable_ocr=False), llm_config=llm_config
+    )
+    cost, base_text = _timed(baseline, path, args.repeat)
+    print(f"serial markitdown   cost={cost:.2f}s chars={len(base_text)}")
+
+    for name in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        options = MarkdownConvertOptions(
+            enable_ocr=False,
+            pdf_parallel=True,
+            pdf_backend=name,
+            pdf_pages_per_chunk=args.pages_per_chunk,
+            pdf_max_workers=args.workers,
+            pdf_parallel_min_pages=0,
+        )
+        converter = MarkdownFileConverter(options, llm_config=llm_config)
+        try:
+            cost, text = _timed(converter, path, args.repeat)
+        except Exception as exc:
+            print(f"parallel {name:<10} failed: {exc!r}")
+            continue
+        print(f"parallel {name:<10} cost={cost:.2f}s chars={len(text)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import argparse
+import json
+import signal
+import sys
+import time
+from pathlib import Path
+from typing import Any, List
+
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "packages/fd-extractai-report/src"))
+
+if hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+
+from fd_extractai_report.context import ReportContext
+from fd_extractai_report.pipeline import _stage_deadline
+from fd_extractai_report.rules.slicing.loader import ruleset_from_yaml_text
+from fd_extractai_report.sections.parallel import ParallelSlicing, shutdown_slice_executors
+from fd_extractai_report.sections.rule_engine_slicer import RuleEngineSlicer
+
+
+RULESET_YAML = """
+name: guard_check
+defaults:
+  dedup: true
+steps:
+  - key: result
+    mode: by_regex_between
+    targets: ["估价结果"]
+    params: {ends: ["附件"], loose_space: true, fallback_end_chars: 2000}
+  - key: runaway
+    mode: by_segment_tables
+    targets: ["(a+)+$"]
+    params: {time_budget: %(budget)s}
+  - key: tables
+    mode: by_segment_tables
+    targets: ["估价对象基本状况"]
+  - key: method
+    mode: by_window_after
+    targets: ["市场比较法"]
+    params: {window_chars: 500}
+"""
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="A step with a catastrophic regex times out alone; the other steps' slices are unchanged."
+    )
+    parser.add_argument("--budget", type=float, default=0.5)
+    parser.add_argument("--paras", type=int, default=2000)
+    return parser
+
+
+def make_document(paras: int) -> str:
+    para = "估价对象位于某市某区某路某号，建筑面积 123.45 平方米。估价师依据市场比较法进行测算。\n\n"
+    table = "| 项目 | 内容 |\n| --- | --- |\n| 坐落 | 某路某号 |\n| 用途 | 住宅 |\n\n"
+    # 30 个 a 加一个不匹配的结尾：(a+)+$ 需要约 2^30 步回溯
+    return (
+        "## 估价结果\n\n" + para * paras + "### 估价对象基本状况\n\n" + table
+        + "a" * 30 + "!\n\n" + "## 附件\n\n" + para * 3
+    )
+
+
+def _snapshot(ctx: ReportContext, skip: str) -> str:
+    return json.dumps(
+        {k: [[s.title, s.text, s.metadata] for s in v] for k, v in ctx.slices.items() if k != skip},
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+    )
+
+
+def _slice(slicer: RuleEngineSlicer, markdown: str) -> tuple[ReportContext, float]:
+    ctx = ReportContext()
+    ctx.set_markdown(markdown)
+    t0 = time.perf_counter()
+    list(slicer.slice(ctx))
+    return ctx, time.perf_counter() - t0
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    ok = True
+
+    ruleset = ruleset_from_yaml_text(RULESET_YAML % {"budget": args.budget})
+    try:
+        ruleset_from_yaml_text(RULESET_YAML % {"budget": args.budget}, strict_patterns=True)
+        print("❌ strict_patterns accepted (a+)+$")
+        ok = False
+    except ValueError as e:
+        print(f"strict_patterns rejected: {str(e).splitlines()[1]}")
+
+    markdown = make_document(args.paras)
+    # 对照组：去掉失控 step 的同一 ruleset
+    clean = ruleset_from_yaml_text(RULESET_YAML % {"budget": args.budget})
+    clean.steps = [s for s in clean.steps if s.key != "runaway"]
+    expected = _snapshot(_slice(RuleEngineSlicer(clean), markdown)[0], "runaway")
+
+    runs: List[tuple[str, Any]] = [
+        ("serial", lambda: _slice(RuleEngineSlicer(ruleset), markdown)),
+        ("parallel", lambda: _slice(RuleEngineSlicer(ruleset, parallel=ParallelSlicing(workers=2, min_chars=0)), markdown)),
+    ]
+
+    def _nested() -> tuple[ReportContext, float]:
+        # 外层是 pipeline 的阶段预算（同样用 SIGALRM）：step 预算结束后外层定时器要恢复
+        with _stage_deadline("slice", 60.0, preempt=True):
+            out = _slice(RuleEngineSlicer(ruleset), markdown)
+            left = signal.getitimer(signal.ITIMER_REAL)[0]
+        print(f"   outer stage timer restored: {left:.1f}s left")
+        return out
+
+    runs.append(("nested in stage budget", _nested))
+
+    for name, fn in runs:
+        ctx, cost = fn()
+        timeouts = ctx.metadata.get("slice_timeouts") or []
+        same = _snapshot(ctx, "runaway") == expected
+        good = same and [t["step"] for t in timeouts] == ["runaway"] and not ctx.slices.get("runaway")
+        ok = ok and good
+        print(f"{name}: cost={cost:.2f}s timeouts={timeouts} other_steps_identical={same} {'✅' if good else '❌'}")
+
+    shutdown_slice_executors()
+    print("OK" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "packages/fd-extractai-report/src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+if hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+
+from bench_anchor_index import synthetic_markdown, synthetic_ruleset
+
+from fd_extractai_report.context import ReportContext
+from fd_extractai_report.rules.slicing.loader import ruleset_from_json_file, ruleset_from_yaml_file
+from fd_extractai_report.rules.slicing.registry import get_ruleset
+from fd_extractai_report.rules.slicing.schema import SliceRuleSet
+from fd_extractai_report.sections.rule_engine_slicer import RuleEngineSlicer
+from fd_extractai_report.sections.slice_profile import SliceProfiler
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Slice a corpus of markdown files with one shared SliceProfiler and print the most expensive "
+        "patterns / steps / base texts."
+    )
+    parser.add_argument("inputs", type=Path, nargs="*", help="Markdown files or directories (*.md); default builds a synthetic corpus.")
+    parser.add_argument("--report-type", default="", help="Use the registered slicing ruleset of this type.")
+    parser.add_argument("--ruleset", type=Path, help="A JSON / YAML slicing ruleset file.")
+    parser.add_argument("--docs", type=int, default=8, help="Synthetic corpus size.")
+    parser.add_argument("--chars", type=int, default=300_000, help="Synthetic document size.")
+    parser.add_argument("--threads", type=int, default=4, help="Documents sliced concurrently through one slicer.")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", type=Path, help="Also write the full profile (to_dict) here.")
+    return parser
+
+
+def _corpus(args: argparse.Namespace) -> List[str]:
+    if not args.inputs:
+        return [synthetic_markdown(args.chars + i * 997) for i in range(args.docs)]
+    files: List[Path] = []
+    for p in args.inputs:
+        files.extend(sorted(p.rglob("*.md")) if p.is_dir() else [p])
+    return [f.read_text(encoding="utf-8") for f in files]
+
+
+def _ruleset(args: argparse.Namespace) -> Optional[SliceRuleSet]:
+    if args.ruleset:
+        if args.ruleset.suffix in (".yaml", ".yml"):
+            return ruleset_from_yaml_file(str(args.ruleset))
+        return ruleset_from_json_file(str(args.ruleset))
+    if args.report_type:
+        return get_ruleset(args.report_type)
+    return synthetic_ruleset()
+
+
+def _slice_all(slicer: RuleEngineSlicer, docs: List[str], threads: int) -> tuple[float, List[str]]:
+    def _one(markdown: str) -> str:
+        ctx = ReportContext()
+        ctx.set_markdown(markdown)
+        list(slicer.slice(ctx))
+        return json.dumps(
+            {k: [[s.title, s.text, s.metadata] for s in v] for k, v in ctx.slices.items()},
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str,
+        )
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, threads)) as pool:
+        snaps = list(pool.map(_one, docs))
+    return time.perf_counter() - t0, snaps
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    docs = _corpus(args)
+    ruleset = _ruleset(args)
+
+    plain_cost, plain = _slice_all(RuleEngineSlicer(ruleset), docs, args.threads)
+    profiler = SliceProfiler()
+    prof_cost, profiled = _slice_all(RuleEngineSlicer(ruleset, profiler=profiler), docs, args.threads)
+
+    print(profiler.report(top=args.top))
+    print(
+        f"docs={len(docs)} threads={args.threads} plain={plain_cost:.2f}s profiled={prof_cost:.2f}s "
+        f"identical={plain == profiled}"
+    )
+    if args.json:
+        args.json.write_text(json.dumps(profiler.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"profile written to {args.json}")
+    return 0 if plain == profiled else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
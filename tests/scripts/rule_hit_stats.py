@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "packages/fd-extractai-report/src"))
+
+if hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+
+from fd_extractai_report.pipeline import ReportPipeline
+from fd_extractai_report.rules.slicing.loader import ruleset_from_json_file, ruleset_from_yaml_file
+from fd_extractai_report.rules.slicing.schema import SliceRuleSet, SliceStep
+from fd_extractai_report.sections.parallel import ParallelSlicing
+from fd_extractai_report.sections.rule_engine_slicer import RuleEngineSlicer
+from fd_extractai_report.sections.rule_stats import RuleHitStats, apply_suggestions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Corpus dry-run (load + detect + slice, no LLM): per step / target how often it was selected, "
+        "merely matched or never matched, plus prune / reorder suggestions verified to keep every slice unchanged."
+    )
+    parser.add_argument("inputs", type=Path, nargs="*", help="Markdown (*.md) or .docx files / directories; default builds a synthetic corpus.")
+    parser.add_argument("--ruleset", type=Path, help="A JSON / YAML slicing ruleset; default resolves by detected report type.")
+    parser.add_argument("--docs", type=int, default=40, help="Synthetic corpus size.")
+    parser.add_argument("--min-documents", type=int, default=1, help="Only suggest for steps that ran on at least this many docs.")
+    parser.add_argument("--workers", type=int, default=2, help="Also dry-run with ParallelSlicing(workers, min_chars=0); stats must match serial.")
+    parser.add_argument("--json", type=Path, help="Also write stats + suggestions here.")
+    return parser
+
+
+# -------------------------
+# synthetic corpus
+# -------------------------
+def synthetic_ruleset() -> SliceRuleSet:
+    between = {"loose_space": True, "fallback_end_chars": 3000, "skip_if_line_matches": [r"\.{6,}\s*\d+\s*$"]}
+    return SliceRuleSet(
+        name="hit_stats_demo",
+        defaults={"dedup": True},
+        steps=[
+            SliceStep(
+                key="summary",
+                mode="by_regex_between",
+                targets=["估价报告摘要", "估价结果报告", "房地产估价报告", "致估价委托人函"],
+                params={**between, "ends": ["估价对象基本状况", "估价的假设和限制条件", "附件"], "pick": "earliest"},
+            ),
+            SliceStep(
+                key="result",
+                mode="by_regex_between",
+                targets=["估价结论", "评估结果", "估价结果"],
+                params={**between, "ends": ["估价的假设和限制条件", "附件"], "pick": "priority"},
+            ),
+            SliceStep(
+                key="method",
+                mode="by_window_after",
+                targets=["假设开发法", "成本法", "收益法", "市场比较法"],
+                params={"window_chars": 300, "anchor_pick": "priority"},
+            ),
+            SliceStep(key="object_tables", mode="by_segment_tables", targets=["估价对象基本状况", "权属状况", "区位状况"]),
+            SliceStep(key="appraiser_table", mode="by_table_after", targets=["### 注册房地产估价师"]),
+        ],
+    )
+
+
+def synthetic_document(i: int) -> str:
+    rnd = random.Random(i)
+    para = f"文档{i} 估价对象位于某路{i}号，建筑面积 {100 + i}.5 平方米。\n\n"
+    table = f"| 项目 | 内容 |\n| --- | --- |\n| 编号 | {i} |\n| 用途 | 住宅 |\n\n"
+    title = rnd.choice(["估价结果报告", "估价结果报告", "房地产估价报告"])
+    result = rnd.choice(["估价结果", "估价结果", "评估结果"])
+    methods = rnd.sample(["市场比较法", "收益法", "成本法"], k=rnd.randint(1, 2))
+    toc = f"{title}......1\n{result}......5\n\n" if rnd.random() < 0.5 else ""
+    return (
+        f"# {title}\n\n" + toc + para * 5
+        + "## 估价对象基本状况\n\n" + table
+        + f"## {result}\n\n" + para * 3 + "".join(f"本次采用{m}测算。\n\n" for m in methods)
+        + "## 估价的假设和限制条件\n\n" + para * 2
+        + "## 附件\n\n" + para
+    )
+
+
+# -------------------------
+# dry run
+# -------------------------
+def _sources(args: argparse.Namespace) -> List[Tuple[str, Optional[Path], Optional[str]]]:
+    """(名称, docx 路径, markdown)。"""
+    if not args.inputs:
+        return [(f"synthetic_{i}", None, synthetic_document(i)) for i in range(args.docs)]
+    files: List[Path] = []
+    for p in args.inputs:
+        files.extend(sorted(x for x in p.rglob("*") if x.suffix in (".md", ".docx")) if p.is_dir() else [p])
+    return [
+        (f.name, None, f.read_text(encoding="utf-8")) if f.suffix == ".md" else (f.name, f, None)
+        for f in files
+    ]
+
+
+def _dry_run(
+    sources: List[Tuple[str, Optional[Path], Optional[str]]],
+    ruleset: Optional[SliceRuleSet],
+    stats: Optional[RuleHitStats] = None,
+    parallel: Optional[ParallelSlicing] = None,
+) -> List[str]:
+    """load + detect + slice；extractor_runner=None，不调用 LLM。返回每篇的切片快照（key / title / text）。"""
+    slicer = RuleEngineSlicer(ruleset, rule_stats=stats, parallel=parallel)
+    pipe = ReportPipeline(slicers=[slicer], extractor_runner=None)
+    snaps: List[str] = []
+    for name, docx_path, markdown in sources:
+        try:
+            result = pipe.run(docx_path=docx_path, markdown_text=markdown, debug=False)
+        except Exception as e:  # 单篇失败不影响整批统计
+            print(f"   ⚠️ {name}: {type(e).__name__}: {e}")
+            snaps.append("")
+            continue
+        slices = result.context.slices
+        snaps.append(
+            json.dumps({k: [[s.title, s.text] for s in v] for k, v in slices.items()}, ensure_ascii=False, sort_keys=True)
+        )
+    return snaps
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    sources = _sources(args)
+    if args.ruleset:
+        loader = ruleset_from_yaml_file if args.ruleset.suffix in (".yaml", ".yml") else ruleset_from_json_file
+        ruleset: Optional[SliceRuleSet] = loader(str(args.ruleset))
+    else:
+        ruleset = None if args.inputs else synthetic_ruleset()
+
+    stats = RuleHitStats()
+    before = _dry_run(sources, ruleset, stats)
+    print(stats.report(min_documents=args.min_documents))
+    suggestions = stats.suggestions(min_documents=args.min_documents)
+
+    ok = True
+    if args.workers > 1:
+        # 并行切片：worker 回传的命中记录合并后，统计必须和串行一致
+        par_stats = RuleHitStats()
+        par = _dry_run(sources, ruleset, par_stats, ParallelSlicing(workers=args.workers, min_chars=0))
+        same = par == before and par_stats.to_dict() == stats.to_dict()
+        print(f"parallel workers={args.workers}: slices and stats identical={same}")
+        ok = ok and same
+
+    if ruleset is not None and suggestions:
+        # 按建议改写 ruleset 后重跑：每篇的切片（key / title / text）必须不变
+        pruned = apply_suggestions(ruleset, suggestions)
+        after = _dry_run(sources, pruned)
+        ok = ok and before == after
+        n_before = sum(len(s.targets) + len(s.params.get("ends") or []) for s in ruleset.steps)
+        n_after = sum(len(s.targets) + len(s.params.get("ends") or []) for s in pruned.steps)
+        print(f"applied suggestions: anchors {n_before} -> {n_after}, slices unchanged={before == after}")
+
+    if args.json:
+        payload = {**stats.to_dict(), "suggestions": [vars(s) for s in suggestions]}
+        args.json.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"stats written to {args.json}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
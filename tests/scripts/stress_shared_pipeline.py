@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "packages/fd-extractai-report/src"))
+
+if hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+
+from fd_extractai_report.context import ReportContext
+from fd_extractai_report.pipeline import ReportPipeline
+from fd_extractai_report.rules.slicing.schema import SliceRuleSet, SliceStep
+from fd_extractai_report.sections.rule_engine_slicer import RuleEngineSlicer
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Run N documents concurrently through ONE shared RuleEngineSlicer / ReportPipeline and "
+        "check every result equals the serial result."
+    )
+    parser.add_argument("--docs", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument(
+        "--switch-interval",
+        type=float,
+        default=1e-5,
+        help="sys.setswitchinterval during the run; tiny values force threads to interleave mid-slice.",
+    )
+    return parser
+
+
+def make_document(i: int) -> str:
+    """每篇文档的章节名、编号各不相同，串用了别的文档的 ruleset 或 context 就会切错。"""
+    para = f"文档{i} 估价对象位于某路{i}号，建筑面积 {100 + i}.5 平方米。\n\n"
+    table = f"| 项目 | 内容 |\n| --- | --- |\n| 编号 | {i} |\n| 面积 | {100 + i}.5 |\n| 用途 | 住宅 |\n\n"
+    return (
+        f"# 报告{i}\n\n"
+        + f"## 第{i}部分 估价结果\n\n" + para * (50 + i % 7) + table
+        + f"## 第{i}部分 附件\n\n" + para * 3
+    )
+
+
+def make_ruleset(i: int) -> SliceRuleSet:
+    return SliceRuleSet(
+        name=f"stress_{i}",
+        defaults={"dedup": True},
+        steps=[
+            SliceStep(
+                key="result",
+                mode="by_regex_between",
+                targets=[f"第{i}部分 估价结果"],
+                params={"ends": [f"第{i}部分 附件"], "loose_space": True, "fallback_end_chars": 2000},
+            ),
+            SliceStep(key="tables", mode="by_segment_tables", targets=["估价结果"], within="result"),
+            SliceStep(key="annex", mode="by_window_after", targets=[f"第{i}部分 附件"], params={"window_chars": 200}),
+        ],
+    )
+
+
+def _snapshot(ctx: ReportContext) -> str:
+    return json.dumps(
+        {k: [[s.title, s.text, s.metadata] for s in v] for k, v in ctx.slices.items()},
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+    )
+
+
+def _slice_once(slicer: RuleEngineSlicer, i: int) -> str:
+    # 每篇文档用自己的 override ruleset：旧实现会把它临时写到 slicer.ruleset 上
+    ctx = ReportContext()
+    ctx.set_markdown(make_document(i))
+    list(slicer.slice(ctx, override=make_ruleset(i)))
+    return _snapshot(ctx)
+
+
+def _pipeline_once(pipe: ReportPipeline, i: int) -> str:
+    result = pipe.run(markdown_text=make_document(i), debug=False)
+    return _snapshot(result.context)
+
+
+def _stress(name: str, fn: Any, docs: int, threads: int, rounds: int) -> bool:
+    expected: Dict[int, str] = {i: fn(i) for i in range(docs)}
+    mismatches: List[Tuple[int, int]] = []
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for r in range(rounds):
+            # 打乱顺序，让不同文档交错执行
+            order = list(range(docs))[r::rounds] + [i for i in range(docs) if i % rounds != r]
+            for i, got in zip(order, pool.map(fn, order)):
+                if got != expected[i]:
+                    mismatches.append((r, i))
+    cost = time.perf_counter() - t0
+    print(f"{name}: docs={docs} threads={threads} rounds={rounds} cost={cost:.2f}s mismatches={len(mismatches)}")
+    for r, i in mismatches[:5]:
+        print(f"   ❌ round={r} doc={i}")
+    return not mismatches
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    sys.setswitchinterval(args.switch_interval)
+
+    shared_slicer = RuleEngineSlicer()
+    ok = _stress(
+        "shared RuleEngineSlicer(override per doc)",
+        lambda i: _slice_once(shared_slicer, i),
+        args.docs,
+        args.threads,
+        args.rounds,
+    )
+
+    # 一个 pipeline 服务所有文档：类型识别 + 切片（不调用 LLM）
+    class _PerDocSlicer(RuleEngineSlicer):
+        def slice(self, context: ReportContext, *, override: Any = None):
+            i = int((context.markdown_text or "").split("报告", 1)[1].split("\n", 1)[0])
+            return super().slice(context, override=override or make_ruleset(i))
+
+    pipe = ReportPipeline(slicers=[_PerDocSlicer()], extractor_runner=None)
+    ok = _stress(
+        "shared ReportPipeline.run",
+        lambda i: _pipeline_once(pipe, i),
+        args.docs,
+        args.threads,
+        args.rounds,
+    ) and ok
+
+    print("OK" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())